@@ -0,0 +1,168 @@
+# analysis.py
+
+import time
+from contextlib import contextmanager
+
+from deck_manager import WILDCARD
+
+
+# Defaults for one /analyze request; lookahead stops at whichever runs out first
+MAX_EVALUATIONS = 20000  # a full lookahead on the default 5x5 board is ~14k
+TIME_BUDGET = 0.25  # seconds
+
+PHASES = range(8)
+
+
+@contextmanager
+def trial(node, value):
+    """Place `value` on an empty node for the duration of the block, then take it back."""
+    node.value = value
+    try:
+        yield node
+    finally:
+        node.value = None
+
+
+def claim_swing(player, events, claimed_cards):
+    """
+    Change in end-of-game card bonus for `player` if these events were
+    applied: +1 for each unowned card claimed, +2 for each one taken from
+    the opponent (it also stops counting for them).
+    """
+    return names_swing(player, {name for event in events for name in event["claimed"]}, claimed_cards)
+
+
+def names_swing(player, names, claimed_cards):
+    """claim_swing for the set of card names the events would claim."""
+    swing = 0
+    for name in names:
+        owner = claimed_cards.get(name)
+        if owner is None:
+            swing += 1
+        elif owner != player:
+            swing += 2
+    return swing
+
+
+def best_phase(player, node, graph, evaluator, claimed_cards):
+    """
+    (phase, events) a wildcard on the empty `node` resolves to: the phase
+    worth the most points plus card bonus to `player`, the lowest on ties.
+    """
+    best = None
+    for phase, candidate in evaluator.assess_candidates(player, node, graph).items():
+        value = candidate.points + names_swing(player, set(candidate.claimed), claimed_cards)
+        if best is None or value > best[0]:
+            best = (value, candidate)
+    return best[1].phase, best[1].events()
+
+
+def describe(events):
+    """The pairs and chains a placement creates, in a compact form for clients."""
+    pairs, chains = [], []
+    for event in events:
+        if event["type"] == "lunar_cycle":
+            chains.append(event["structure"])
+        else:
+            pairs.append({"type": event["type"], "pair": event["structure"]["pair"], "points": event["points"]})
+    return pairs, chains
+
+
+class Budget:
+    def __init__(self, max_evaluations=MAX_EVALUATIONS, time_budget=TIME_BUDGET):
+        self.remaining = max_evaluations
+        self.deadline = time.perf_counter() + time_budget
+
+    def take(self, evaluations):
+        """Reserve `evaluations` scorer calls, or return False if that would go over budget."""
+        if evaluations > self.remaining or time.perf_counter() > self.deadline:
+            return False
+        self.remaining -= evaluations
+        return True
+
+
+def best_reply(opponent, graph, evaluator, claimed_cards, empty):
+    """Best (value, card, node) the opponent could answer with, holding any phase."""
+    best = (0, None, None)
+    for node in empty:
+        if node.value is not None:
+            continue
+        for card, candidate in evaluator.assess_candidates(opponent, node, graph).items():
+            value = candidate.points + names_swing(opponent, set(candidate.claimed), claimed_cards)
+            if value > best[0]:
+                best = (value, card, node.name)
+    return best
+
+
+def analyze(graph, evaluator, player, hand, claimed_cards, lookahead=True,
+            max_evaluations=MAX_EVALUATIONS, time_budget=TIME_BUDGET):
+    """
+    Rank every (hand card, empty node) placement for `player`.
+
+    Each candidate is scored by immediate points plus the card bonus it
+    would win; a wildcard counts as the phase it would resolve to, given
+    as the candidate's `phase`. With lookahead, the strongest candidates
+    are then checked against the opponent's best reply with any phase
+    (their hand is not used), while the budget lasts. Placements are tried on the live graph
+    and rolled back, so nothing is copied; the caller must not let other
+    moves run in between (true of a single eventlet hub).
+    """
+    started = time.perf_counter()
+    budget = Budget(max_evaluations, time_budget)
+    empty = [node for node in graph.nodes.values() if node.value is None]
+    cards = sorted({card for card in hand if card is not None})
+
+    candidates = []
+    for node in empty:
+        for card in cards:
+            if card == WILDCARD:
+                phase, events = best_phase(player, node, graph, evaluator, claimed_cards)
+            else:
+                phase = card
+                with trial(node, card):
+                    events = evaluator.evaluate(player, node, graph)
+            points = sum(e["points"] for e in events)
+            swing = claim_swing(player, events, claimed_cards)
+            pairs, chains = describe(events)
+            candidates.append({
+                "card": card,
+                "phase": phase,
+                "node": node.name,
+                "points": points,
+                "claim_swing": swing,
+                "score": points + swing,
+                "pairs": pairs,
+                "chains": chains,
+                "events": events,
+            })
+    candidates.sort(key=lambda c: -c["score"])
+
+    complete = True
+    if lookahead:
+        opponent = 3 - player
+        per_candidate = (len(empty) - 1) * len(PHASES)
+        for c in candidates:
+            if not budget.take(per_candidate):
+                complete = False
+                break
+            claimed_after = dict(claimed_cards)
+            for event in c["events"]:
+                for name in event["claimed"]:
+                    claimed_after[name] = player
+            with trial(graph.nodes[c["node"]], c["phase"]):
+                value, card, node_name = best_reply(opponent, graph, evaluator, claimed_after, empty)
+            c["reply"] = {"score": value, "card": card, "node": node_name}
+            c["net"] = c["score"] - value
+
+        # Candidates the budget didn't reach rank after the ones that were checked
+        candidates.sort(key=lambda c: (0, -c["net"]) if "net" in c else (1, -c["score"]))
+
+    for c in candidates:
+        del c["events"]
+    return {
+        "player": player,
+        "candidates": candidates,
+        "lookahead": lookahead,
+        "lookahead_complete": lookahead and complete,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
@@ -1,59 +1,491 @@
-import eventlet
-eventlet.monkey_patch()
-from flask import Flask, jsonify, request, render_template, redirect, url_for
-from flask_socketio import SocketIO, emit, join_room
+if __name__ == "__main__":
+    # Patch before anything else imports socket or threading. Servers with
+    # their own eventlet worker (gunicorn -k eventlet) patch on their own,
+    # and imports for tests and tools stay cheap.
+    import eventlet
+    eventlet.monkey_patch()
+
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+from flask import Blueprint, Flask, Response, current_app, has_app_context, jsonify, request, render_template, redirect, url_for
+from flask_socketio import SocketIO
+from werkzeug.middleware.proxy_fix import ProxyFix
 
-from copy import deepcopy
+import io
+import logging
+import os
 import random
+import secrets
 import string
 
 from graph_logic import Graph
 from score_tracker import ScoreTracker
-from strategies.phase_pair import PhasePair
-from strategies.full_moon_pair import FullMoonPair
-from strategies.lunar_cycle import LunarCycle
-from deck_manager import DeckManager
-
-app = Flask(__name__)
-socketio = SocketIO(app, cors_allowed_origins="*")  # allow any origin for now
+from deck_manager import DeckManager, WILDCARD
+from spectators import SpectatorBroadcaster, spectator_room
+from replay import ReplayStore, new_replay, record_place, record_fill, record_undo, record_redo, export_replays
+from matchmaking import Matchmaker
+from room_sync import RoomSync
+from assets import AssetStore
+from ratings import RatingStore
+from tournament import TournamentManager
+from rate_limit import RateLimiter, retry_after_header
+from board_import import board_size_errors, MAX_COPIES_PER_PHASE
+from scoring_pool import ScoringFailed, ScoringPool, ScoringUnavailable
+from realtime import FlaskSocketIOTransport, ObservedTransport
+from state_view import EncodedJSON, EncodedPayload, PacketJSON, encode, public_state, state_view
+from json_codec import CodecJSONProvider
+from memory_report import ROOM_PARTS, room_memory, rss_bytes
+from ops_stats import OpsStats
+
+# Per-request and per-join detail, off the hot path unless debug logging is turned on
+log = logging.getLogger(__name__)
+
+# Routes are collected on blueprints and registered by create_app()
+bp = Blueprint("game", __name__)
+debug_bp = Blueprint("debug", __name__)
+ops_bp = Blueprint("ops", __name__)
+builder_bp = Blueprint("builder", __name__)
+socketio = SocketIO()
+
+# Moves, joins and emits counted for the /ops dashboard; moves this slow (seconds) are flagged
+ops = OpsStats(slow_move=float(os.environ.get("OPS_SLOW_MOVE", "0.25")))
+
+# Seconds between /ops/stream updates, and how long one stream is held before the browser reconnects
+OPS_INTERVAL = float(os.environ.get("OPS_INTERVAL", "1"))
+OPS_STREAM_MAX = float(os.environ.get("OPS_STREAM_MAX", "300"))
+
+# Game code emits and schedules through this; asgi.py replaces it with the AsyncServer transport
+realtime = ObservedTransport(FlaskSocketIOTransport(socketio), ops.record_emit)
 
 games = {}
 
-# Initialize scoring modules
-phase_pair_module = PhasePair()
-full_moon_pair_module = FullMoonPair()
-lunar_cycle_module = LunarCycle()
+# Bundled, fingerprinted assets from build_assets.py; loaded by create_app()
+assets = None
+
+# Startup timings in seconds, reported by /readyz
+startup = {"app_created": None, "first_request": None}
+
+# Spectator updates are coalesced and sent from a background task
+spectators = SpectatorBroadcaster(realtime, interval=float(os.environ.get("SPECTATOR_INTERVAL", "0.5")))
+spectator_sids = {}  # sid -> room_id
+
+# Recent updates each room keeps, as their encoded events and flags, for clients that reconnect.
+# A client that missed more than this gets a snapshot without the events in between
+ROOM_BACKLOG = int(os.environ.get("ROOM_BACKLOG", "64"))
+
+# Rooms with no connected sockets are dropped after this many idle seconds; finished games sooner
+ROOM_IDLE_TIMEOUT = float(os.environ.get("ROOM_IDLE_TIMEOUT", "3600"))
+FINISHED_ROOM_TIMEOUT = float(os.environ.get("FINISHED_ROOM_TIMEOUT", "600"))
+room_sweep_task = None
+player_sids = {}  # sid -> room_id, for players' sockets
+
+# Longest a ?wait= long-poll on /state, /scores, /hand or /final_scores is held, in seconds
+LONG_POLL_MAX = float(os.environ.get("LONG_POLL_MAX", "30"))
+
+# Finished games, also appended to REPLAY_LOG as JSON-lines when set
+replay_store = ReplayStore(path=os.environ.get("REPLAY_LOG"))
+
+# Lobby queue: matched players get a room dealt by create_room, like /start_game
+matchmaker = Matchmaker(
+    lambda settings: create_room(**settings),
+    queue_timeout=float(os.environ.get("MATCHMAKING_QUEUE_TIMEOUT", "120")),
+    accept_timeout=float(os.environ.get("MATCHMAKING_ACCEPT_TIMEOUT", "15"))
+)
+matchmaking_task = None
+
+# Token buckets per client IP or room: name -> (tokens per second, burst, key)
+RATE_LIMIT_RULES = {
+    "place_ip": (10, 30, "ip"),
+    "place_room": (5, 30, "room"),
+    "undo_ip": (10, 30, "ip"),
+    "start_game_ip": (0.5, 10, "ip"),
+    "new_board_ip": (1, 10, "ip"),
+    "new_board_room": (0.5, 5, "room"),
+    "analyze_ip": (4, 10, "ip"),
+    "fill_board_ip": (0.2, 3, "ip"),
+    "fill_board_room": (0.2, 3, "room"),
+    "lobby_ip": (1, 10, "ip"),
+}
+rate_limiters = {name: RateLimiter(rate, burst) for name, (rate, burst, _) in RATE_LIMIT_RULES.items()}
+
+# Endpoint -> rules checked before it runs; endpoints not listed are not limited
+RATE_LIMITED_ENDPOINTS = {
+    "game.place_value": ("place_ip", "place_room"),
+    "game.undo": ("undo_ip",),
+    "game.redo": ("undo_ip",),
+    "game.start_game": ("start_game_ip",),
+    "game.new_random_board": ("new_board_ip", "new_board_room"),
+    "game.reset_game": ("new_board_ip", "new_board_room"),
+    "socket.new_random_board": ("new_board_room",),  # checked in deal_random_board
+    "game.analyze_moves": ("analyze_ip",),
+    "debug.debug_fill_board": ("fill_board_ip", "fill_board_room"),
+    "game.matchmaking_join": ("lobby_ip",),
+    "game.create_tournament": ("lobby_ip",),
+    "game.create_player": ("lobby_ip",),
+}
+
+# Scoring, board fills and /analyze run in worker processes, off the eventlet hub
+scoring_pool = ScoringPool(
+    processes=int(os.environ.get("SCORING_WORKERS", "2")),
+    timeout=float(os.environ.get("SCORING_TIMEOUT", "2")),
+    max_queue=int(os.environ.get("SCORING_QUEUE_LIMIT", "64"))
+)
+
+# Boards one /start_game may upload; each is also held to the node and degree caps
+MAX_BOARDS_PER_GAME = 50
+
+# Players one /tournament may enter; its first round deals a room per pair in one request
+MAX_TOURNAMENT_PLAYERS = int(os.environ.get("MAX_TOURNAMENT_PLAYERS", "256"))
+
+# Player ids and Elo ratings; the database is opened on first use
+RATINGS_DB = os.environ.get("RATINGS_DB", "ratings.db")
+rating_store = None
+
+# Called as hook(room_id, game, finalize_scores()) when a game in a room ends
+game_over_hooks = []
+
+
+
+
+
+
+def create_app(config=None):
+    """
+    Build the Flask app. Optional subsystems (debug routes, the graph
+    builder) are registered here rather than when the module is imported.
+    """
+    global assets
+    app = Flask(__name__)
+    app.json = CodecJSONProvider(app)
+    app.config.update(
+        DEBUG_ROUTES=os.environ.get("DEBUG_ROUTES", "0") == "1",  # on for the dev server and tests
+        OPS_TOKEN=os.environ.get("OPS_TOKEN"),  # /ops is served only when set, and wants it as ?token=
+        GRAPH_BUILDER=os.environ.get("GRAPH_BUILDER", "1") == "1",
+        RATE_LIMITS=os.environ.get("RATE_LIMITS", "1") == "1",
+        TRUSTED_PROXIES=int(os.environ.get("TRUSTED_PROXIES", "0")),  # X-Forwarded-For hops to trust for client IPs
+        MAX_CONTENT_LENGTH=int(os.environ.get("MAX_REQUEST_BYTES", str(2 * 1024 * 1024)))  # larger bodies get a 413
+    )
+    app.config.update(config or {})
+
+    if app.config["TRUSTED_PROXIES"]:
+        hops = app.config["TRUSTED_PROXIES"]
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops)
+
+    assets = AssetStore(os.path.join(app.static_folder, "dist"))
+    app.register_blueprint(bp)
+    if app.config["DEBUG_ROUTES"]:
+        app.register_blueprint(debug_bp)
+    if app.config["OPS_TOKEN"]:
+        app.register_blueprint(ops_bp)
+    if app.config["GRAPH_BUILDER"]:
+        app.register_blueprint(builder_bp)
+
+    # async_mode=None picks eventlet when it's installed, as before
+    socketio.init_app(app, cors_allowed_origins="*", async_mode=os.environ.get("SOCKETIO_ASYNC_MODE"),  # allow any origin for now
+                      json=PacketJSON)
+
+    startup["app_created"] = round(time.perf_counter() - IMPORT_STARTED, 4)
+    log.debug("App created %ss after import", startup["app_created"])
+    return app
+
+
+_app = None
+
+
+def use_transport(transport):
+    """Send emits and run background tasks through `transport` (see realtime.py)."""
+    global realtime
+    if not isinstance(transport, ObservedTransport):
+        transport = ObservedTransport(transport, ops.record_emit)
+    realtime = transport
+    spectators.socketio = transport
+
 
+def __getattr__(name):
+    """`app.app` is built on first use, for servers and tests that import it."""
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
+def scoring_for_board(board):
+    """The board's scoring evaluator. The rule registry is imported on first use."""
+    from strategies.registry import evaluator_for_board
+    return evaluator_for_board(board)
 
 
+def scoring_rules(game):
+    """The room's scoringRules config, which workers build their evaluator from."""
+    board = game["settings"].get("board")
+    return board.get("scoringRules") if board else None
+
+
+def score_move(room_id, game, player, node_name, value):
+    """Scoring events for placing `value` on `node_name`, computed on a compact copy of the board."""
+    compact = game["graph"].to_compact()
+    compact["values"][compact["names"].index(node_name)] = value
+    return scoring_pool.run("score", compact, scoring_rules(game), player, node_name, key=room_id)
+
+
+def resolve_wildcard(room_id, game, player, node_name):
+    """(phase, events) for a wildcard on `node_name`: every phase scored in one pass, the best one kept."""
+    return scoring_pool.run("wild", game["graph"].to_compact(), scoring_rules(game), player, node_name,
+                            game["score_tracker"].get_all_claimed_cards(), key=room_id)
+
 
 def get_or_create_game(room_id):
     if room_id not in games:
         raise ValueError(f"No game exists for room {room_id}")
-    return games[room_id]
+    game = games[room_id]
+    game["last_active"] = time.monotonic()
+    return game
+
+
+def expire_rooms(now=None):
+    """
+    Drop rooms nobody is connected to that have been idle past their
+    timeout (FINISHED_ROOM_TIMEOUT once the game is over, ROOM_IDLE_TIMEOUT
+    otherwise). Rooms a tournament is waiting on, or the matchmaker has
+    just dealt, are kept: dropping them would stall the tournament or lose
+    the game. Returns the ids of the rooms dropped.
+    """
+    now = time.monotonic() if now is None else now
+    pinned = set(player_sids.values()) | set(spectator_sids.values()) | set(tournaments.rooms) | matchmaker.room_ids()
+    expired = []
+    for room_id, game in list(games.items()):
+        if room_id in pinned:
+            continue
+        timeout = FINISHED_ROOM_TIMEOUT if "final_scores" in game["replay"] else ROOM_IDLE_TIMEOUT
+        if now - game.get("last_active", now) >= timeout:
+            del games[room_id]
+            expired.append(room_id)
+    if expired:
+        log.debug("Expired %d idle room(s); %d left", len(expired), len(games))
+    return expired
+
+
+def expire_idle_rooms():
+    """Background sweep for expire_rooms, started with the first room."""
+    while True:
+        realtime.sleep(60)
+        try:
+            expire_rooms()
+        except Exception as e:
+            print("[Rooms] expire failed:", e)
+
+
+def broadcast_state(room_id, update):
+    """
+    Send the room's public state after a change, with the change's events
+    and flags in `update`, to its players, then queue it for spectators.
+    The state is encoded once here and reused until the next broadcast.
+    """
+    game = games[room_id]
+    game["last_active"] = time.monotonic()
+    public = EncodedPayload(public_state(game))
+    payload = game["sync"].record(EncodedPayload(update, base=public), EncodedPayload(update))
+    payload.text  # encoded now, while the trackers hold the state it announces
+    game["view"] = (game["sync"].version, public)
+    realtime.emit("state_updated", payload, to=room_id)
+    spectators.publish(room_id, payload)
+
+
+def json_response(payload, status=200):
+    """jsonify for payloads built on a state view, whose encoded text is reused."""
+    return current_app.response_class(encode(payload), status=status, mimetype="application/json")
+
+
+def versioned_response(game, build, tag=""):
+    """
+    The response from `build()`, tagged with the room's version. A client
+    that sends that tag back in If-None-Match gets a 304 instead, and with
+    ?wait=<seconds> the 304 is held until the room changes (a long-poll).
+    Every change to a room, hands included, is broadcast and so bumps the
+    version; `tag` only tells apart the views of one version.
+    """
+    sync = game["sync"]
+    wait = min(request.args.get("wait", 0, type=float), LONG_POLL_MAX)
+    if wait > 0 and request.if_none_match.contains(sync.etag(tag)):
+        with realtime.waiting():
+            sync.wait(sync.version, wait)
+
+    etag = sync.etag(tag)
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def debug_requested():
+    """`?debug=true` (play any card, see every hand) is honoured only where the debug routes are served."""
+    return current_app.config["DEBUG_ROUTES"] and request.args.get("debug", "false").lower() == "true"
+
 
+def placed_freely(game):
+    """Whether any card in the game was placed by a debug move or a board fill."""
+    return any("debug" in move[3:] or "fill" in move[3:] for move in game["replay"]["moves"])
 
 
+def get_rating_store():
+    global rating_store
+    if rating_store is None:
+        rating_store = RatingStore(RATINGS_DB)
+    return rating_store
 
-@app.route("/game/<room_id>")
+
+def rate_finished_game(room_id, game, final_scores):
+    """Rate games both seats played under distinct ids, with no debug placements."""
+    seats = game.get("seats", {})
+    if len(set(seats.values())) != 2 or placed_freely(game):
+        return
+    delta = get_rating_store().record_result(game["replay"]["id"], seats[1], seats[2], final_scores["final_scores"])
+    if delta is not None:
+        log.debug("Rated game %s in room %s: player 1 %+g", game["replay"]["id"], room_id, delta)
+    else:
+        log.debug("Game %s in room %s not rated", game["replay"]["id"], room_id)
+
+
+game_over_hooks.append(rate_finished_game)
+
+
+# Tournament series advance from game-over events; rooms are dealt like /start_game
+tournaments = TournamentManager(lambda settings: create_room(**settings))
+
+
+def advance_tournament(room_id, game, final_scores):
+    """
+    Move a tournament room's series on, and tell its players where they
+    play next. A game with debug or filled placements doesn't count; the
+    series deals it again.
+    """
+    replayed = placed_freely(game)
+    if replayed:
+        result = tournaments.replay_game(room_id)
+    else:
+        result = tournaments.game_over(room_id, final_scores["final_scores"])
+    if result is None:
+        return
+    tournament, series = result
+    next_urls = {}
+    for seat, player in (series.seats if replayed else series.games[-1]["seats"]).items():
+        current = tournament.current_room(player)
+        next_urls[str(seat)] = f"/game/{current[0]}?player={current[1]}" if current else None
+    realtime.emit("series_updated", {
+        "tournament_id": tournament.id,
+        "tournament_url": f"/tournament/{tournament.id}",
+        "series": series.to_dict(),
+        "next_urls": next_urls,
+    }, to=room_id)
+
+
+game_over_hooks.append(advance_tournament)
+
+
+def start_replay(game):
+    """Start a new replay record for the game just dealt in this room."""
+    previous = game.get("replay")
+    if previous and previous["moves"] and "final_scores" not in previous:
+        replay_store.add(previous)  # keep games that were abandoned mid-way
+
+    board = game["settings"].get("board")
+    game["replay"] = new_replay(
+        game["graph"],
+        game["deck_manager"],
+        game["starting_player"],
+        board.get("scoringRules") if board else None
+    )
+
+
+
+
+@bp.app_context_processor
+def inject_asset_url():
+    def asset_url(name):
+        return assets.url(name) or url_for("static", filename=name)
+    return {"asset_url": asset_url}
+
+
+@bp.route("/assets/<path:filename>")
+def serve_asset(filename):
+    found = assets.response(filename, request.headers.get("Accept-Encoding", ""))
+    if found is None:
+        return jsonify({"error": "Asset not found"}), 404
+    body, headers = found
+    if request.if_none_match.contains(headers["ETag"].strip('"')):
+        return current_app.response_class(status=304, headers={k: v for k, v in headers.items() if k != "Content-Length"})
+    return current_app.response_class(body, headers=headers)
+
+
+@bp.before_app_request
+def record_first_request():
+    if startup["first_request"] is None:
+        startup["first_request"] = round(time.perf_counter() - IMPORT_STARTED, 4)
+        log.debug("First request %ss after import", startup["first_request"])
+
+
+def rate_limit_wait(endpoint, ip, room_id):
+    """Seconds until `endpoint` may run for this client and room, or 0 if it may now."""
+    rules = RATE_LIMITED_ENDPOINTS.get(endpoint)
+    config = current_app.config if has_app_context() else (_app.config if _app else {})
+    if not rules or not config.get("RATE_LIMITS", True):
+        return 0
+    for name in rules:
+        scope = RATE_LIMIT_RULES[name][2]
+        key = ip if scope == "ip" else room_id
+        if key is None:
+            continue
+        wait = rate_limiters[name].allow(key)
+        if wait:
+            log.debug("Rate limited %s for %s %s (%s)", endpoint, scope, key, name)
+            return wait
+    return 0
+
+
+@bp.before_app_request
+def enforce_rate_limits():
+    """Answer 429 when any of the endpoint's buckets is empty."""
+    wait = rate_limit_wait(request.endpoint, request.remote_addr, (request.view_args or {}).get("room_id"))
+    if not wait:
+        return None
+    response = jsonify({"success": False, "error": "Too many requests", "retry_after": round(wait, 2)})
+    response.status_code = 429
+    response.headers["Retry-After"] = retry_after_header(wait)
+    return response
+
+
+@bp.route("/readyz")
+def readyz():
+    """Readiness probe. Also loads the lazy subsystems so the first game doesn't wait on them."""
+    scoring_for_board(None)
+    scoring_pool.start()
+    return jsonify({"ready": True, "startup": startup, "rooms": len(games)})
+
+
+@bp.route("/game/<room_id>")
 def game_room(room_id):
     return render_template("game.html")
 
-@app.route("/")
+@bp.route("/")
 def landing():
     return render_template("landing.html")
 
 
 
-@app.route("/new-game-id")
+@bp.route("/new-game-id")
 def new_game_id():
     suffix = ''.join(random.choices(string.ascii_letters + string.digits, k=6))
     room_id = f"moon-{suffix}"
     return jsonify({"room_id": room_id})
 
-@app.route("/new_random_board/<room_id>", methods=["POST"])
+@bp.route("/new_random_board/<room_id>", methods=["POST"])
 def new_random_board(room_id):
     player = request.headers.get("X-Player-ID", "")
     if player not in ("player1", "player2"):
@@ -63,6 +495,13 @@ def new_random_board(room_id):
     if not room or not room["settings"].get("boards"):
         return "No boards available", 400
 
+    deal_new_board(room_id)
+    return jsonify(success=True)
+
+
+def deal_new_board(room_id):
+    """Start a fresh game in the room on a different one of its boards, and tell its clients."""
+    room = games[room_id]
     previous = room["settings"].get("board")
     options = [b for b in room["settings"]["boards"] if b != previous]
     board = random.choice(options) if options else previous
@@ -76,55 +515,90 @@ def new_random_board(room_id):
     board_settings = board.get("deckSettings", {})
     deck_manager = DeckManager(
         deck_type=board_settings.get("deckType", room["settings"].get("deckType", "infinite")),
-        copies_per_phase=board_settings.get("copiesPerPhase", room["settings"].get("copiesPerPhase"))
+        copies_per_phase=board_settings.get("copiesPerPhase", room["settings"].get("copiesPerPhase")),
+        wildcards=room["settings"].get("wildcards", 0)
     )
     
     current_player = 1
 
     room["graph"] = graph
     room["score_tracker"] = score_tracker
+    room["scoring"] = scoring_for_board(board)
     room["deck_manager"] = deck_manager
+    room["deck_seed"] = deck_manager.seed
     room["starting_player"] = current_player
     room["current_player"] = current_player
     room["game_history"] = []
     room["redo_stack"] = []
-
-    deck_remaining = len(deck_manager.deck) if deck_manager.deck_type == "finite" else "∞"
-    hand_sizes = {
-        "1": len([c for c in deck_manager.get_hand(1) if c is not None]),
-        "2": len([c for c in deck_manager.get_hand(2) if c is not None])
-    }
+    start_replay(room)
 
     # Emit state to both players
-    socketio.emit("state_updated", {
-        "graph": graph.to_dict(),
-        "scores": score_tracker.get_scores(),
-        "claimed_cards": score_tracker.get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": [],
-            "full_moon_pairs": [],
-            "lunar_cycles": []
-        },
-        "current_player": current_player,
-        "events": ["reset", "random_board"],
-        "game_over": False,
-        "new_game": True,
-        "deck_remaining": deck_remaining,
-        "hand_sizes": hand_sizes
-    }, to=room_id)
-
-    return jsonify(success=True)
-
+    broadcast_state(room_id, {"events": ["reset", "random_board"], "game_over": False, "new_game": True})
+
+
+
+def json_body():
+    """The request's JSON object, or {} when the body is missing, malformed or not an object."""
+    data = request.get_json(silent=True)
+    return data if isinstance(data, dict) else {}
+
+
+def game_settings_error(boards, copies_per_phase, wildcards=None):
+    """First reason uploaded game settings are over the size caps, or None."""
+    if boards is not None:
+        if not isinstance(boards, list):
+            return "boards must be a list"
+        if len(boards) > MAX_BOARDS_PER_GAME:
+            return f"At most {MAX_BOARDS_PER_GAME} boards per game"
+        for i, board in enumerate(boards):
+            errors = board_size_errors(board)
+            if errors:
+                return f"Board {i + 1}: {errors[0]}"
+            if "scoringRules" in board:
+                from strategies.registry import build_rules  # only boards with custom rules need the registry
+                try:
+                    build_rules(board["scoringRules"])
+                except (ValueError, TypeError) as e:
+                    return f"Board {i + 1}: Invalid scoringRules: {e}"
+    if copies_per_phase is not None and (not isinstance(copies_per_phase, int) or isinstance(copies_per_phase, bool)
+                                         or not 0 < copies_per_phase <= MAX_COPIES_PER_PHASE):
+        return f"copiesPerPhase must be an integer from 1 to {MAX_COPIES_PER_PHASE}"
+    if wildcards is not None and (not isinstance(wildcards, int) or isinstance(wildcards, bool)
+                                  or not 0 <= wildcards <= MAX_COPIES_PER_PHASE):
+        return f"wildcards must be an integer from 0 to {MAX_COPIES_PER_PHASE}"
+    return None
+
+
+@bp.route("/start_game", methods=["POST"])
+def start_game():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"success": False, "error": "Expected a JSON object"}), 400
+    error = game_settings_error(data.get("boards"), data.get("copiesPerPhase"), data.get("wildcards"))
+    if error:
+        return jsonify({"success": False, "error": error}), 400
+    room_id = create_room(
+        boards=data.get("boards"),
+        deck_type=data.get("deckType", "infinite"),
+        copies_per_phase=data.get("copiesPerPhase"),
+        wildcards=data.get("wildcards") or 0,
+        room_id=data.get("room_id"),
+        deck_seed=data.get("deckSeed")  # optional, to replay a known deal
+    )
+    return jsonify({"success": True, "room_id": room_id})
 
 
-@app.route("/start_game", methods=["POST"])
-def start_game():
-    data = request.get_json()
-    boards = data.get("boards")
-    room_id = data.get("room_id")
+def create_room(boards=None, deck_type="infinite", copies_per_phase=None, room_id=None, deck_seed=None,
+                wildcards=0):
+    """
+    Deal a new game, in `room_id` if that room exists or in a new room
+    otherwise, and broadcast the reset. Returns the room id.
+    """
+    global room_sweep_task
+    if room_sweep_task is None:
+        room_sweep_task = realtime.start_background_task(expire_idle_rooms)
 
-    deck_type = data.get("deckType", "infinite")
-    copies_per_phase = data.get("copiesPerPhase")
+    global_deck_type, global_copies_per_phase = deck_type, copies_per_phase
 
     # If null or missing, force to None to avoid confusion
     if deck_type != "finite":
@@ -144,8 +618,8 @@ def start_game():
             copies_per_phase = None
         else:
             # fall back to global
-            deck_type = data.get("deckType", "infinite")
-            copies_per_phase = data.get("copiesPerPhase")
+            deck_type = global_deck_type
+            copies_per_phase = global_copies_per_phase
             if deck_type != "finite":
                 copies_per_phase = None
         
@@ -170,14 +644,20 @@ def start_game():
                     graph.connect_nodes(graph.nodes[node_name], graph.nodes[down_name])
     
      
+    scoring = scoring_for_board(chosen_board if boards else None)
+
     # Either reuse existing room or create a new one
     if room_id and room_id in games:
         games[room_id]["graph"] = graph
         games[room_id]["score_tracker"] = ScoreTracker()
+        games[room_id]["scoring"] = scoring
         games[room_id]["deck_manager"] = DeckManager(
             deck_type=deck_type,
-            copies_per_phase=copies_per_phase
+            copies_per_phase=copies_per_phase,
+            seed=deck_seed,
+            wildcards=wildcards
         )
+        games[room_id]["deck_seed"] = games[room_id]["deck_manager"].seed
         games[room_id]["starting_player"] = 1
         games[room_id]["current_player"] = 1
         games[room_id]["game_history"] = []
@@ -188,60 +668,57 @@ def start_game():
             "board": chosen_board if boards else None,
             "boards": boards if boards else [],
             "deckType": deck_type,
-            "copiesPerPhase": copies_per_phase
+            "copiesPerPhase": copies_per_phase,
+            "wildcards": wildcards
         }
         games[room_id]["last_settings"] = dict(games[room_id]["settings"])
     
     else:
         room_id = "moon-" + ''.join(random.choices(string.ascii_letters + string.digits, k=6))
+        deck_manager = DeckManager(
+            deck_type=deck_type,
+            copies_per_phase=copies_per_phase,
+            seed=deck_seed,
+            wildcards=wildcards
+        )
         games[room_id] = {
             "graph": graph,
             "score_tracker": ScoreTracker(),
-            "deck_manager": DeckManager(
-                deck_type=deck_type,
-                copies_per_phase=copies_per_phase
-            ),
+            "scoring": scoring,
+            "deck_manager": deck_manager,
+            "deck_seed": deck_manager.seed,
             "starting_player": 1,
             "current_player": 1,
             "game_history": [],
             "redo_stack": [],
+            "sync": RoomSync(backlog_size=ROOM_BACKLOG, compact=EncodedPayload.encoded),
             "settings": {
                 "board": chosen_board if boards else None,
                 "boards": boards if boards else [],
                 "deckType": deck_type,
-                "copiesPerPhase": copies_per_phase
+                "copiesPerPhase": copies_per_phase,
+                "wildcards": wildcards
             },
             "last_settings": {
                 "board": chosen_board if boards else None,
                 "boards": boards if boards else [],
                 "deckType": deck_type,
-                "copiesPerPhase": copies_per_phase
+                "copiesPerPhase": copies_per_phase,
+                "wildcards": wildcards
             }
         }
 
+    start_replay(games[room_id])
 
     # emit state_updated with a clear reset event
-    socketio.emit("state_updated", {
-        "graph": graph.to_dict(),
-        "scores": games[room_id]["score_tracker"].get_scores(),
-        "claimed_cards": games[room_id]["score_tracker"].get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": [],
-            "full_moon_pairs": [],
-            "lunar_cycles": []
-        },
-        "current_player": games[room_id]["current_player"],
-        "events": ["reset"],
-        "new_game": True,
-        "game_over": False
-    }, to=room_id)
+    broadcast_state(room_id, {"events": ["reset"], "new_game": True, "game_over": False})
 
-    return jsonify({"success": True, "room_id": room_id})
+    return room_id
 
 
 
 
-@app.route("/game_settings_data")
+@bp.route("/game_settings_data")
 def game_settings_data():
     room_id = request.args.get("room")
     if room_id and room_id in games:
@@ -249,61 +726,40 @@ def game_settings_data():
     return jsonify({})
 
 
-@app.route("/game_settings")
+@bp.route("/game_settings")
 def game_settings():
     return render_template("game_settings.html")
 
 
 
-@app.route("/state/<room_id>", methods=["GET"])
+@bp.route("/state/<room_id>", methods=["GET"])
 def get_state(room_id):
     game = get_or_create_game(room_id)
-    graph = game["graph"]
-    score_tracker = game["score_tracker"]
     deck_manager = game["deck_manager"]
-    current_player = game["current_player"]
-
-    deck_remaining = len(deck_manager.deck) if deck_manager.deck_type == "finite" else "∞"
-
 
     player_id = request.headers.get("X-Player-ID")
-    debug = request.args.get("debug", "false").lower() == "true"
+    debug = debug_requested()
 
-    if player_id not in {"player1", "player2"}:
+    if player_id not in {"player1", "player2", "spectator"}:
         return jsonify({"error": "Invalid or missing player ID"}), 400
 
-    player_num = int(player_id[-1])
-    hand = deck_manager.get_hand(player_num)
+    # Spectators see the public state only
+    hand = deck_manager.get_hand(int(player_id[-1])) if player_id != "spectator" else []
 
-    if debug:
+    if debug and player_id != "spectator":
         hand = [0,1,2,3,4,5,6,7]
 
-    hand_sizes = {
-        "1": len([c for c in deck_manager.get_hand(1) if c is not None]),
-        "2": len([c for c in deck_manager.get_hand(2) if c is not None])
-    }
-
-
-    return jsonify({
-        "graph": graph.to_dict(),
-        "scores": score_tracker.get_scores(),
-        "claimed_cards": score_tracker.get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": score_tracker.phase_pairs,
-            "full_moon_pairs": score_tracker.full_moon_pairs,
-            "lunar_cycles": score_tracker.lunar_cycle_connections
-        },
-        "current_player": current_player,
-        "hand": hand,
-        "hand_sizes": hand_sizes,
-        "events": [],
-        "deck_remaining": deck_remaining
-    })
+    # The public part is encoded once per version; only the hand is added per request
+    return versioned_response(game, lambda: json_response(EncodedPayload(
+        {"hand": hand, "events": [], "version": game["sync"].version},
+        base=state_view(game)
+    )), tag=f"-{player_id}" + ("-debug" if debug else ""))
 
 
 
-@app.route("/place/<room_id>", methods=["POST"])
+@bp.route("/place/<room_id>", methods=["POST"])
 def place_value(room_id):
+    started = time.perf_counter()
     game = get_or_create_game(room_id)
     graph = game["graph"]
     score_tracker = game["score_tracker"]
@@ -322,7 +778,12 @@ def place_value(room_id):
     if "player" not in data or "node_name" not in data or "value" not in data:
         return jsonify({"success": False, "error": "Missing required fields in the request."})
 
-    debug = request.args.get("debug", "false").lower() == "true"
+    # In a rated room a claimed seat only plays with its player's seat token
+    seats = game.get("seats", {})
+    if player in seats and get_rating_store().player_for_token(request.headers.get("X-Seat-Token")) != seats[player]:
+        return jsonify({"success": False, "error": "This seat is claimed by another player"}), 403
+
+    debug = debug_requested()
 
     node = graph.nodes.get(node_name)
     if not node:
@@ -331,17 +792,33 @@ def place_value(room_id):
     if node.value is not None:
         return jsonify({"success": False, "error": "Node already occupied"})
 
-    # Save snapshot for undo
-    game_history.append({
-        "graph": deepcopy(graph),
-        "score_tracker": deepcopy(score_tracker),
+    if not debug and value not in deck_manager.get_hand(player):
+        return jsonify({"success": False, "error": "Card not in hand"})
+
+    # Scoring may yield to other requests, so the room must be unchanged when it's back
+    # A wildcard is played from the hand as itself, but placed as the phase it resolves to
+    version = game["sync"].version
+    try:
+        if value == WILDCARD:
+            phase, all_events = resolve_wildcard(room_id, game, player, node_name)
+        else:
+            phase, all_events = value, score_move(room_id, game, player, node_name, value)
+    except ScoringUnavailable as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except ScoringFailed as e:
+        print(f"[Scoring] move in room {room_id} failed:", e)
+        return jsonify({"success": False, "error": "Scoring failed; the card was not played"}), 503
+    if game["sync"].version != version or game["graph"] is not graph:
+        return jsonify({"success": False, "error": "The game changed while scoring; try again"}), 409
+
+    # Snapshot for undo, saved only once the card is known to be playable
+    snapshot = {
+        "values": graph.get_values(),
+        "score_tracker": score_tracker.copy(),
         "player": current_player
-    })
-    redo_stack.clear()
+    }
 
     try:
-        print(f"[DEBUG] Player {player} trying to play {value}")
-        print(f"[DEBUG] Current hand:", deck_manager.get_hand(player))
         if debug:
             slot_index = -1
         else:
@@ -349,17 +826,14 @@ def place_value(room_id):
     except ValueError:
         return jsonify({"success": False, "error": "Card not in hand"})
 
-
-    deck_remaining = len(deck_manager.deck) if deck_manager.deck_type == "finite" else "∞"
-
+    game_history.append(snapshot)
+    redo_stack.clear()
 
 
     # Place the value and update scores
-    node.add_value(value)
-    phase_events = score_tracker.update_score_for_pair(player, phase_pair_module, node)
-    full_moon_events = score_tracker.update_score_for_pair(player, full_moon_pair_module, node)
-    cycle_events = score_tracker.update_score_for_cycle(player, lunar_cycle_module, node, graph)
-    all_events = phase_events + full_moon_events + cycle_events
+    node.add_value(phase)
+    score_tracker.apply_events(all_events)
+    record_place(game["replay"], player, node_name, phase, debug, wildcard=value == WILDCARD)
 
     # Switch player
     game["current_player"] = 3 - current_player
@@ -370,61 +844,47 @@ def place_value(room_id):
                   all(card is None for card in deck_manager.get_hand(2))
     game_over = board_full or hands_empty
     final_scores = score_tracker.finalize_scores() if game_over else {}
-
-    hand_sizes = {
-        "1": len([c for c in deck_manager.get_hand(1) if c is not None]),
-        "2": len([c for c in deck_manager.get_hand(2) if c is not None])
-    }
-
+    if game_over:
+        game["replay"]["final_scores"] = final_scores
+        replay_store.add(game["replay"])
+        for hook in game_over_hooks:
+            try:
+                hook(room_id, game, final_scores)
+            except Exception as e:
+                print(f"[Game over] {hook.__name__} failed for room {room_id}:", e)
 
     # Emit to this room only
-    socketio.emit("state_updated", {
-        "graph": graph.to_dict(),
-        "scores": score_tracker.get_scores(),
-        "claimed_cards": score_tracker.get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": score_tracker.phase_pairs,
-            "full_moon_pairs": score_tracker.full_moon_pairs,
-            "lunar_cycles": score_tracker.lunar_cycle_connections
-        },
-        "current_player": game["current_player"],
+    broadcast_state(room_id, {
         "events": all_events,
         "game_over": game_over,
         "final_scores": final_scores,
-        "deck_remaining": deck_remaining,
-        "hand_sizes": hand_sizes,
+        "replay_id": game["replay"]["id"],
         "last_move": {
             "player": player,
             "node": node_name,
-            "value": value
+            "value": phase,
+            "wildcard": value == WILDCARD
             }
-    }, to=room_id)
+    })
 
-    return jsonify({
+    response = json_response({
         "success": True,
         "events": all_events,
         "game_over": game_over,
+        "value": phase,
         "replaced_slot": slot_index,
-        "state": {
-            "graph": graph.to_dict(),
-            "scores": score_tracker.get_scores(),
-            "claimed_cards": score_tracker.get_all_claimed_cards(),
-            "connections": {
-                "phase_pairs": score_tracker.phase_pairs,
-                "full_moon_pairs": score_tracker.full_moon_pairs,
-                "lunar_cycles": score_tracker.lunar_cycle_connections
-            },
-            "current_player": game["current_player"],
-            "hand": deck_manager.get_hand(player) if not debug else [0,1,2,3,4,5,6,7],
-            "hand_sizes": hand_sizes,
-            "deck_remaining": deck_remaining
-        }
+        "state": EncodedPayload(
+            {"hand": deck_manager.get_hand(player) if not debug else [0,1,2,3,4,5,6,7]},
+            base=state_view(game)
+        )
     })
+    ops.record_move(room_id, game["replay"]["board_id"], len(graph.nodes), time.perf_counter() - started)
+    return response
 
 
 
 
-@app.route("/reset/<room_id>", methods=["POST"])
+@bp.route("/reset/<room_id>", methods=["POST"])
 def reset_game(room_id):
     game = get_or_create_game(room_id)
     graph = game["graph"]
@@ -441,84 +901,93 @@ def reset_game(room_id):
     game_history.clear()
     redo_stack.clear()
     deck_manager.reset()
+    game["deck_seed"] = deck_manager.seed
+    start_replay(game)
 
     # Figure out which player's hand to return
     player_id = request.headers.get("X-Player-ID")
-    debug = request.args.get("debug", "false").lower() == "true"
+    debug = debug_requested()
     player_num = int(player_id[-1]) if player_id and player_id.startswith("player") else 1
     hand = deck_manager.get_hand(player_num)
     if debug:
         hand = [0,1,2,3,4,5,6,7]
 
-    deck_remaining = len(deck_manager.deck) if deck_manager.deck_type == "finite" else "∞"
-
-    hand_sizes = {
-        "1": len([c for c in deck_manager.get_hand(1) if c is not None]),
-        "2": len([c for c in deck_manager.get_hand(2) if c is not None])
-    }
-
-
-
-    # Public state for broadcast (no hand)
-    public_state = {
-        "graph": graph.to_dict(),
-        "scores": score_tracker.get_scores(),
-        "claimed_cards": score_tracker.get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": [],
-            "full_moon_pairs": [],
-            "lunar_cycles": []
-        },
-        "current_player": game["current_player"],
-        "events": [],
-        "game_over": False,
-        "new_game": True,
-        "deck_remaining": deck_remaining
-
-    }
-
     # Emit to this room only
-    public_state["hand_sizes"] = hand_sizes
-    socketio.emit("state_updated", public_state, to=room_id)
-
+    update = {"events": [], "game_over": False, "new_game": True}
+    broadcast_state(room_id, update)
 
     # Return personal state with hand
-    return jsonify({
+    return json_response({
         "success": True,
-        "state": {
-            **public_state,
-            "hand": hand
-        }
+        "state": EncodedPayload({**update, "hand": hand}, base=state_view(game))
     })
 
 
-@app.route("/hand/<room_id>/<int:player_id>", methods=["GET"])
+@bp.route("/analyze/<room_id>", methods=["GET"])
+def analyze_moves(room_id):
+    """Ranked placements for the requesting player's hand. `?lookahead=0` skips the reply search."""
+    game = get_or_create_game(room_id)
+    player_id = request.headers.get("X-Player-ID")
+    if player_id not in {"player1", "player2"}:
+        return jsonify({"error": "Invalid or missing player ID"}), 400
+    player = int(player_id[-1])
+    lookahead = request.args.get("lookahead", "1") != "0"
+
+    # Results only change when the room's state version does
+    version = game["sync"].version
+    cache = game.get("analysis")
+    if cache is None or cache["version"] != version:
+        cache = game["analysis"] = {"version": version, "results": {}}
+
+    key = (player, lookahead)
+    if key not in cache["results"]:
+        try:
+            cache["results"][key] = scoring_pool.run(
+                "analyze",
+                game["graph"].to_compact(),
+                scoring_rules(game),
+                player,
+                game["deck_manager"].get_hand(player),
+                game["score_tracker"].get_all_claimed_cards(),
+                lookahead,
+                key=("analyze", room_id)
+            )
+        except ScoringUnavailable as e:
+            return jsonify({"error": str(e)}), 503
+        except ScoringFailed as e:
+            print(f"[Scoring] analysis in room {room_id} failed:", e)
+            return jsonify({"error": "Analysis failed"}), 503
+    result = cache["results"][key]
+
+    limit = request.args.get("limit", type=int)
+    candidates = result["candidates"][:limit] if limit else result["candidates"]
+    return jsonify({**result, "candidates": candidates, "version": version})
+
+
+@bp.route("/hand/<room_id>/<int:player_id>", methods=["GET"])
 def get_hand(room_id, player_id):
     game = get_or_create_game(room_id)
     deck_manager = game["deck_manager"]
     hand = deck_manager.get_hand(player_id)
-    print(f"[DEBUG] Returned hand for player {player_id} in room {room_id}: {hand}")
-    return jsonify(hand)
+    return versioned_response(game, lambda: jsonify(hand), tag=f"-hand{player_id}")
 
 
 
 
 
-@app.route("/scores/<room_id>", methods=["GET"])
+@bp.route("/scores/<room_id>", methods=["GET"])
 def get_scores(room_id):
     game = get_or_create_game(room_id)
     score_tracker = game["score_tracker"]
-    return jsonify(score_tracker.get_scores())
+    return versioned_response(game, lambda: jsonify(score_tracker.get_scores()), tag="-scores")
 
 
 
-@app.route("/final_scores/<room_id>", methods=["GET"])
+@bp.route("/final_scores/<room_id>", methods=["GET"])
 def final_scores(room_id):
     game = get_or_create_game(room_id)
-    score_tracker = game["score_tracker"]
     try:
-        result = score_tracker.finalize_scores()
-        return jsonify(result)
+        return versioned_response(game, lambda: jsonify(room_final_scores(game)), tag="-final")
     except Exception as e:
         print(f"Error in /final_scores for room {room_id}:", e)
         return jsonify({"error": str(e)}), 500
@@ -526,7 +995,93 @@ def final_scores(room_id):
 
 
 
-@app.route("/debug/<room_id>", methods=["GET"])
+def room_final_scores(game):
+    """finalize_scores() for the room's current version, worked out once per version."""
+    version = game["sync"].version
+    cached = game.get("final_scores")
+    if cached is None or cached[0] != version:
+        cached = game["final_scores"] = (version, game["score_tracker"].finalize_scores())
+    return cached[1]
+
+
+@debug_bp.route("/debug/memory", methods=["GET"])
+def debug_memory():
+    """
+    Estimated bytes held per room, by part (see memory_report.py), largest
+    rooms first; ?top=N limits how many rooms are listed, not the totals.
+    """
+    top = request.args.get("top", 20, type=int)
+    rooms = {room_id: room_memory(game) for room_id, game in games.items()}
+    totals = {part: sum(r[part] for r in rooms.values()) for part in [*ROOM_PARTS, "other", "total"]}
+    largest = sorted(rooms.items(), key=lambda item: item[1]["total"], reverse=True)[:top]
+    return jsonify({
+        "room_count": len(rooms),
+        "totals": totals,
+        "per_room": {part: total // len(rooms) for part, total in totals.items()} if rooms else {},
+        "rooms": dict(largest),
+        "replays": len(replay_store.replays),
+        "rss_bytes": rss_bytes()
+    })
+
+
+@ops_bp.before_request
+def check_ops_token():
+    if not secrets.compare_digest(request.args.get("token", ""), current_app.config["OPS_TOKEN"] or ""):
+        return jsonify({"success": False, "error": "Forbidden"}), 403
+
+
+def ops_snapshot(top=10):
+    """ops.snapshot() (see ops_stats.py) with the rooms, sockets, scoring pool and RSS right now."""
+    connected = set(player_sids.values()) | set(spectator_sids.values())
+    pool = scoring_pool.stats()
+    return {
+        **ops.snapshot(top=top),
+        "rooms": len(games),
+        "rooms_connected": len(connected),
+        "sockets": {"players": len(player_sids), "spectators": len(spectator_sids)},
+        "scoring": {key: pool[key] for key in ("busy", "queued", "timeouts", "rejected")},
+        "rss_bytes": rss_bytes()
+    }
+
+
+@ops_bp.route("/ops", methods=["GET"])
+def ops_page():
+    return render_template("ops.html")
+
+
+@ops_bp.route("/ops/stats", methods=["GET"])
+def ops_stats():
+    return jsonify(ops_snapshot(request.args.get("top", 10, type=int)))
+
+
+@ops_bp.route("/ops/stream", methods=["GET"])
+def ops_stream():
+    """
+    Server-sent events: an ops_snapshot() every OPS_INTERVAL seconds, for
+    OPS_STREAM_MAX seconds, after which the browser reconnects; ?count=N
+    stops after N.
+    """
+    top = request.args.get("top", 10, type=int)
+    count = request.args.get("count", type=int)
+
+    def events():
+        deadline = time.monotonic() + OPS_STREAM_MAX
+        yield f"retry: {int(OPS_INTERVAL * 1000)}\n\n"
+        sent = 0
+        while True:
+            # The body is sent outside the engine lock under ASGI, so the snapshot is taken under it
+            snapshot = realtime.locked(lambda: encode(ops_snapshot(top)))
+            yield f"data: {snapshot}\n\n"
+            sent += 1
+            if sent == count or time.monotonic() >= deadline:
+                return
+            time.sleep(OPS_INTERVAL)  # outside the lock; eventlet patches this
+
+    return Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@debug_bp.route("/debug/<room_id>", methods=["GET"])
 def debug_state(room_id):
     game = get_or_create_game(room_id)
     graph = game["graph"]
@@ -543,7 +1098,7 @@ def debug_state(room_id):
 
 
 
-@app.route("/undo/<room_id>", methods=["POST"])
+@bp.route("/undo/<room_id>", methods=["POST"])
 def undo(room_id):
     game = get_or_create_game(room_id)
     graph = game["graph"]
@@ -557,50 +1112,28 @@ def undo(room_id):
 
     # Save current state to redo stack
     redo_stack.append({
-        "graph": deepcopy(graph),
-        "score_tracker": deepcopy(score_tracker),
+        "values": graph.get_values(),
+        "score_tracker": score_tracker.copy(),
         "player": current_player
     })
 
     # Restore last state
     prev_state = game_history.pop()
-    game["graph"] = prev_state["graph"]
+    graph.set_values(prev_state["values"])
     game["score_tracker"] = prev_state["score_tracker"]
     game["current_player"] = prev_state["player"]
-
-    # Compute deck remaining
-    deck_manager = game["deck_manager"]
-    deck_remaining = len(deck_manager.deck) if deck_manager.deck_type == "finite" else "∞"
-
-    hand_sizes = {
-        "1": len([c for c in deck_manager.get_hand(1) if c is not None]),
-        "2": len([c for c in deck_manager.get_hand(2) if c is not None])
-    }
-    
+    record_undo(game["replay"])
+    game["replay"].pop("final_scores", None)  # the game is no longer over
 
     # Emit updated state
-    socketio.emit("state_updated", {
-        "graph": game["graph"].to_dict(),
-        "scores": game["score_tracker"].get_scores(),
-        "claimed_cards": game["score_tracker"].get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": game["score_tracker"].phase_pairs,
-            "full_moon_pairs": game["score_tracker"].full_moon_pairs,
-            "lunar_cycles": game["score_tracker"].lunar_cycle_connections
-        },
-        "current_player": game["current_player"],
-        "events": [],
-        "is_undo": True,
-        "deck_remaining": deck_remaining,
-        "hand_sizes": hand_sizes
-    }, to=room_id)
+    broadcast_state(room_id, {"events": [], "is_undo": True})
 
     return jsonify({"success": True})
 
 
 
 
-@app.route("/redo/<room_id>", methods=["POST"])
+@bp.route("/redo/<room_id>", methods=["POST"])
 def redo(room_id):
     game = get_or_create_game(room_id)
     graph = game["graph"]
@@ -614,43 +1147,20 @@ def redo(room_id):
 
     # Save current state to undo history
     game_history.append({
-        "graph": deepcopy(graph),
-        "score_tracker": deepcopy(score_tracker),
+        "values": graph.get_values(),
+        "score_tracker": score_tracker.copy(),
         "player": current_player
     })
 
     # Restore the next state
     next_state = redo_stack.pop()
-    game["graph"] = next_state["graph"]
+    graph.set_values(next_state["values"])
     game["score_tracker"] = next_state["score_tracker"]
     game["current_player"] = next_state["player"]
-
-    # Compute deck remaining
-    deck_manager = game["deck_manager"]
-    deck_remaining = len(deck_manager.deck) if deck_manager.deck_type == "finite" else "∞"
-
-    hand_sizes = {
-        "1": len([c for c in deck_manager.get_hand(1) if c is not None]),
-        "2": len([c for c in deck_manager.get_hand(2) if c is not None])
-    }
-    
+    record_redo(game["replay"])
 
     # Emit updated state
-    socketio.emit("state_updated", {
-        "graph": game["graph"].to_dict(),
-        "scores": game["score_tracker"].get_scores(),
-        "claimed_cards": game["score_tracker"].get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": game["score_tracker"].phase_pairs,
-            "full_moon_pairs": game["score_tracker"].full_moon_pairs,
-            "lunar_cycles": game["score_tracker"].lunar_cycle_connections
-        },
-        "current_player": game["current_player"],
-        "events": [],
-        "is_undo": True,
-        "deck_remaining": deck_remaining,
-        "hand_sizes": hand_sizes
-    }, to=room_id)
+    broadcast_state(room_id, {"events": [], "is_undo": True})
 
     return jsonify({"success": True})
 
@@ -658,14 +1168,13 @@ def redo(room_id):
 
 
 
-@app.route("/debug/fill_board/<room_id>", methods=["POST"])
+@debug_bp.route("/debug/fill_board/<room_id>", methods=["POST"])
 def debug_fill_board(room_id):
     from random import randint, shuffle
 
     game = get_or_create_game(room_id)
     graph = game["graph"]
     score_tracker = game["score_tracker"]
-    current_player = game["current_player"]
 
     player = 1
     node_names = list(graph.nodes.keys())
@@ -674,38 +1183,31 @@ def debug_fill_board(room_id):
     # Fill all but exactly 2 nodes
     fill_count = max(0, len(node_names) - 2)
 
-    for i in range(fill_count):
-        node_name = node_names[i]
-        node = graph.nodes[node_name]
-        if node.value is None:
-            phase_value = randint(0, 7)
-            node.add_value(phase_value)
-
-            # simulate scoring for this placement
-            score_tracker.update_score_for_pair(player, phase_pair_module, node)
-            score_tracker.update_score_for_pair(player, full_moon_pair_module, node)
-            score_tracker.update_score_for_cycle(player, lunar_cycle_module, node, graph)
-
+    placements = []
+    for node_name in node_names[:fill_count]:
+        if graph.nodes[node_name].value is None:
+            placements.append((player, node_name, randint(0, 7)))
             player = 3 - player  # alternate players
 
-    # Emit to this room only
-    state = {
-        "graph": graph.to_dict(),
-        "scores": score_tracker.get_scores(),
-        "claimed_cards": score_tracker.get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": score_tracker.phase_pairs,
-            "full_moon_pairs": score_tracker.full_moon_pairs,
-            "lunar_cycles": score_tracker.lunar_cycle_connections
-        },
-        "current_player": current_player,
-        "events": []
-    }
+    # Score every placement in one worker job, then apply them all at once
+    version = game["sync"].version
+    try:
+        results = scoring_pool.run("fill", graph.to_compact(), scoring_rules(game), placements, key=room_id)
+    except ScoringUnavailable as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except ScoringFailed as e:
+        print(f"[Scoring] fill in room {room_id} failed:", e)
+        return jsonify({"success": False, "error": "Scoring failed; the board was not filled"}), 503
+    if game["sync"].version != version or game["graph"] is not graph:
+        return jsonify({"success": False, "error": "The game changed while filling; try again"}), 409
+
+    for (player, node_name, phase_value), events in zip(placements, results):
+        graph.nodes[node_name].add_value(phase_value)
+        record_fill(game["replay"], player, node_name, phase_value)
+        score_tracker.apply_events(events)
 
-    socketio.emit("state_updated", {
-        **state,
-        "debug_fill": True
-    }, to=room_id)
+    # Emit to this room only
+    broadcast_state(room_id, {"events": [], "debug_fill": True})
 
     return jsonify({
         "success": True,
@@ -719,91 +1221,269 @@ def debug_fill_board(room_id):
 
 
 
-@socketio.on("join_room")
-def handle_join(data):
+def join_game(sid, data):
+    """A client joins a room as a player or spectator and is sent what it's missing."""
     room_id = data["room_id"]
-    join_room(room_id)
     get_or_create_game(room_id)
-    print(f"[DEBUG] Client joined room {room_id}")
+    ops.record_join()
+    spectating = data.get("role") == "spectator"
+    if spectating:
+        realtime.enter_room(sid, spectator_room(room_id))
+        if sid not in spectator_sids:
+            spectator_sids[sid] = room_id
+            spectators.add_watcher(room_id)
+    else:
+        realtime.enter_room(sid, room_id)
+        player_sids[sid] = room_id
+    log.debug("Client joined room %s%s", room_id, " as spectator" if spectating else "")
 
+    # A reconnecting client is sent a snapshot with the updates it missed, whose events it plays;
+    # one that is up to date gets nothing, and one too far behind only the snapshot
     game = games[room_id]
-    deck_manager = game["deck_manager"]
-    deck_remaining = len(deck_manager.deck) if deck_manager.deck_type == "finite" else "∞"
+    sync = game["sync"]
+    missed = sync.since(data.get("last_version"))
+    if missed == []:
+        return
+    snapshot = sync.snapshot(lambda: EncodedPayload({"events": []}, base=state_view(game)))
+    if missed:
+        log.debug("Resyncing %s with %d missed update(s)", sid, len(missed))
+        snapshot = EncodedPayload({"missed": EncodedJSON(encode(missed))}, base=snapshot)
+    realtime.emit("state_updated", snapshot, to=sid)
 
-    hand_sizes = {
-        "1": len([c for c in deck_manager.get_hand(1) if c is not None]),
-        "2": len([c for c in deck_manager.get_hand(2) if c is not None])
-    }
 
-    emit("state_updated", {
-        "graph": game["graph"].to_dict(),
-        "scores": game["score_tracker"].get_scores(),
-        "claimed_cards": game["score_tracker"].get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": game["score_tracker"].phase_pairs,
-            "full_moon_pairs": game["score_tracker"].full_moon_pairs,
-            "lunar_cycles": game["score_tracker"].lunar_cycle_connections
-        },
-        "current_player": game["current_player"],
-        "events": [],
-        "deck_remaining": deck_remaining,
-        "hand_sizes": hand_sizes
-    }, to=room_id)
+def leave_game(sid):
+    player_sids.pop(sid, None)
+    room_id = spectator_sids.pop(sid, None)
+    if room_id is not None:
+        spectators.remove_watcher(room_id)
 
 
-@socketio.on("new_random_board")
-def handle_new_random_board(data):
+def deal_random_board(sid, data):
     room_id = data.get("room_id")
     player = data.get("player")
 
     if not room_id or room_id not in games:
-        emit("error", {"message": "Invalid room ID"})
+        realtime.emit("error", {"message": "Invalid room ID"}, to=sid)
         return
 
     if player not in ("player1", "player2"):
-        emit("error", {"message": "Missing or invalid player"})
+        realtime.emit("error", {"message": "Missing or invalid player"}, to=sid)
         return
 
-    room = games[room_id]
-    previous = room["settings"].get("board")
-    options = [b for b in room["settings"].get("boards", []) if b != previous]
-    board = random.choice(options) if options else previous
+    if not games[room_id]["settings"].get("boards"):
+        realtime.emit("error", {"message": "No boards available"}, to=sid)
+        return
 
-    room["settings"]["board"] = board
-    new_state = create_new_game_state(room_id, board)
-    room["state"] = new_state
-
-    # Broadcast updated state to all clients in the room
-    emit("state_updated", {
-        "graph": new_state["graph"].to_dict(),
-        "scores": new_state["score_tracker"].get_scores(),
-        "claimed_cards": new_state["score_tracker"].get_all_claimed_cards(),
-        "connections": {
-            "phase_pairs": [],
-            "full_moon_pairs": [],
-            "lunar_cycles": []
-        },
-        "current_player": new_state["current_player"],
-        "events": ["reset", "random_board"],
-        "game_over": False,
-        "new_game": True,
-        "deck_remaining": new_state["deck_remaining"],
-        "hand_sizes": new_state["hand_sizes"]
-    }, to=room_id)
+    # Socket events skip before_request, so the room's bucket is checked here
+    wait = rate_limit_wait("socket.new_random_board", None, room_id)
+    if wait:
+        realtime.emit("error", {"message": "Too many requests", "retry_after": round(wait, 2)}, to=sid)
+        return
+
+    deal_new_board(room_id)
+
+
+# Socket handlers for the Flask-SocketIO server; asgi.py registers the same functions on its AsyncServer
+@socketio.on("join_room")
+def handle_join(data):
+    join_game(request.sid, data)
+
+
+@socketio.on("disconnect")
+def handle_disconnect(*args):
+    leave_game(request.sid)
+
+
+@socketio.on("new_random_board")
+def handle_new_random_board(data):
+    deal_random_board(request.sid, data)
+
+
+
+
+@bp.route("/replay/<replay_id>", methods=["GET"])
+def get_replay(replay_id):
+    """State of a finished game after `?move=N` moves (default: the end)."""
+    engine = replay_store.engine(replay_id)
+    if engine is None:
+        return jsonify({"error": "Replay not found"}), 404
 
+    move = request.args.get("move", type=int)
+    engine.seek(len(engine.moves) if move is None else move)
+    return jsonify(engine.state())
 
 
+@bp.route("/replay/<replay_id>/export", methods=["GET"])
+def export_replay(replay_id):
+    record = replay_store.get(replay_id)
+    if record is None:
+        return jsonify({"error": "Replay not found"}), 404
+    buf = io.StringIO()
+    export_replays([record], buf)
+    return current_app.response_class(buf.getvalue(), mimetype="application/x-ndjson")
 
-@app.route("/graph_builder")
+
+def expire_matchmaking():
+    """Background sweep so abandoned handshakes resolve even when nobody polls."""
+    while True:
+        realtime.sleep(1)
+        try:
+            matchmaker.expire()
+        except Exception as e:
+            print("[Matchmaking] expire failed:", e)
+
+
+@bp.route("/matchmaking/join", methods=["POST"])
+def matchmaking_join():
+    global matchmaking_task
+    if matchmaking_task is None:
+        matchmaking_task = realtime.start_background_task(expire_matchmaking)
+
+    data = json_body()
+    error = game_settings_error(data.get("boards"), data.get("copiesPerPhase"))
+    if error:
+        return jsonify({"error": error}), 400
+    ticket = matchmaker.join(
+        boards=data.get("boards"),
+        deck_type=data.get("deckType", "infinite"),
+        copies_per_phase=data.get("copiesPerPhase")
+    )
+    return jsonify(ticket.to_dict(matchmaker.clock()))
+
+
+@bp.route("/matchmaking/ticket/<ticket_id>", methods=["GET"])
+def matchmaking_ticket(ticket_id):
+    ticket = matchmaker.get(ticket_id)
+    if ticket is None:
+        return jsonify({"error": "Ticket not found"}), 404
+    return jsonify(ticket.to_dict(matchmaker.clock()))
+
+
+@bp.route("/matchmaking/ticket/<ticket_id>/accept", methods=["POST"])
+def matchmaking_accept(ticket_id):
+    ticket = matchmaker.accept(ticket_id)
+    if ticket is None:
+        return jsonify({"error": "Ticket not found"}), 404
+    if ticket.status not in ("matched", "ready"):
+        return jsonify({"error": f"Ticket is {ticket.status}", **ticket.to_dict(matchmaker.clock())}), 409
+    return jsonify(ticket.to_dict(matchmaker.clock()))
+
+
+@bp.route("/matchmaking/ticket/<ticket_id>/leave", methods=["POST"])
+def matchmaking_leave(ticket_id):
+    ticket = matchmaker.leave(ticket_id)
+    if ticket is None:
+        return jsonify({"error": "Ticket not found"}), 404
+    return jsonify(ticket.to_dict(matchmaker.clock()))
+
+
+@bp.route("/scoring/stats", methods=["GET"])
+def scoring_stats():
+    return jsonify(scoring_pool.stats())
+
+
+@bp.route("/matchmaking/stats", methods=["GET"])
+def matchmaking_stats():
+    return jsonify(matchmaker.stats())
+
+
+@bp.route("/tournament", methods=["POST"])
+def create_tournament():
+    data = json_body()
+    players = data.get("players")
+    if not isinstance(players, list) or not all(isinstance(p, str) and p for p in players):
+        return jsonify({"error": "players must be a list of names"}), 400
+    if len(players) > MAX_TOURNAMENT_PLAYERS:
+        return jsonify({"error": f"At most {MAX_TOURNAMENT_PLAYERS} players per tournament"}), 400
+    error = game_settings_error(data.get("boards"), data.get("copiesPerPhase"))
+    if error:
+        return jsonify({"error": error}), 400
+    try:
+        tournament = tournaments.create(
+            players,
+            format=data.get("format", "swiss"),
+            best_of=int(data.get("bestOf", 3)),
+            boards=data.get("boards"),
+            rounds=data.get("rounds"),
+            deck_type=data.get("deckType", "infinite"),
+            copies_per_phase=data.get("copiesPerPhase")
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(tournament.to_dict()), 201
+
+
+@bp.route("/tournament/<tournament_id>", methods=["GET"])
+def get_tournament(tournament_id):
+    tournament = tournaments.get(tournament_id)
+    if tournament is None:
+        return jsonify({"error": "Tournament not found"}), 404
+    return jsonify(tournament.to_dict())
+
+
+@bp.route("/players", methods=["POST"])
+def create_player():
+    data = json_body()
+    name = data.get("name")
+    if name is not None and (not isinstance(name, str) or len(name) > 40):
+        return jsonify({"error": "Name must be a string of at most 40 characters"}), 400
+    return jsonify(get_rating_store().create_player(name)), 201
+
+
+@bp.route("/players/<player_id>", methods=["GET"])
+def get_player(player_id):
+    player = get_rating_store().get(player_id)
+    if player is None:
+        return jsonify({"error": "Player not found"}), 404
+    return jsonify(player)
+
+
+@bp.route("/leaderboard", methods=["GET"])
+def leaderboard():
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 100)
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    store = get_rating_store()
+    return jsonify({"players": store.leaderboard(limit, offset), "total": len(store.index)})
+
+
+@bp.route("/seat/<room_id>", methods=["POST"])
+def claim_seat(room_id):
+    """
+    Tie the X-Player-ID seat to the persistent player whose secret seat
+    token (from POST /players) is sent, so the game can be rated. A seat
+    held by another player isn't given up, and one that has already moved
+    this game can't be claimed; /place then wants the token as X-Seat-Token.
+    """
+    game = get_or_create_game(room_id)
+    seat = request.headers.get("X-Player-ID")
+    if seat not in {"player1", "player2"}:
+        return jsonify({"error": "Invalid or missing player ID"}), 400
+    player_id = get_rating_store().player_for_token(json_body().get("seat_token"))
+    if player_id is None:
+        return jsonify({"error": "Invalid seat token"}), 403
+
+    seats = game.setdefault("seats", {})
+    if seats.get(int(seat[-1]), player_id) != player_id:
+        return jsonify({"error": "Seat already claimed"}), 409
+    if int(seat[-1]) not in seats and any(move[0] == int(seat[-1]) for move in game["replay"]["moves"]):
+        # Otherwise one client could play a seat unclaimed and claim it at the end
+        return jsonify({"error": "Seat already played this game"}), 409
+    seats[int(seat[-1])] = player_id
+    return jsonify({"success": True, "seats": {str(k): v for k, v in seats.items()}})
+
+
+
+
+@builder_bp.route("/graph_builder")
 def graph_builder():
     return render_template("graph_builder.html")
 
-@app.route("/robots.txt")
+@bp.route("/robots.txt")
 def robots_txt():
-    return app.send_static_file("robots.txt")
+    return current_app.send_static_file("robots.txt")
 
 
-@app.route("/google1fe9a4da69c1cfc8.html")
+@bp.route("/google1fe9a4da69c1cfc8.html")
 def google_site_verification():
     return "google-site-verification: google1fe9a4da69c1cfc8.html"
 
@@ -811,8 +1491,10 @@ def google_site_verification():
 
 
 if __name__ == "__main__":
-    import os
-    port = int(os.environ.get("PORT", 5000))
     debug_mode = os.environ.get("FLASK_DEBUG", "0") == "1"
+    if debug_mode:
+        os.environ.setdefault("DEBUG_ROUTES", "1")
+    app = create_app()
+    port = int(os.environ.get("PORT", 5000))
     socketio.run(app, host="0.0.0.0", port=port, debug=debug_mode)
 
@@ -0,0 +1,80 @@
+# asgi.py
+#
+# The game on asyncio instead of eventlet, with no monkey patching:
+#
+#     uvicorn asgi:app --ws wsproto --port 5000
+#
+# Socket.IO is served by python-socketio's AsyncServer; every other path
+# goes to the same Flask app. Routes and socket events call the same
+# functions as under eventlet, one at a time under the Engine lock.
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# The Flask-SocketIO server in app.py is never used here; keep it from selecting eventlet
+os.environ.setdefault("SOCKETIO_ASYNC_MODE", "threading")
+
+import socketio
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+import app as moon_app
+from realtime import AsyncServerTransport, Engine
+from state_view import PacketJSON
+
+
+# Threads for requests and socket events; most of them only wait for the engine lock
+ASGI_THREADS = int(os.environ.get("ASGI_THREADS", "64"))
+
+
+class _ThreadedWsgiInstance(WsgiToAsgiInstance):
+    # asgiref runs every request on one shared thread by default, so a request
+    # waiting for a scoring worker would hold up all the others
+    run_wsgi_app = sync_to_async(WsgiToAsgiInstance.__dict__["run_wsgi_app"].func, thread_sensitive=False)
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _ThreadedWsgiInstance(self.wsgi_application, self.duplicate_header_limit)(scope, receive, send)
+
+
+engine = Engine()
+sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*", json=PacketJSON)  # allow any origin for now
+transport = AsyncServerTransport(sio, engine)
+
+
+async def call_engine(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, engine.run, fn, *args)
+
+
+@sio.on("join_room")
+async def handle_join(sid, data):
+    await call_engine(moon_app.join_game, sid, data)
+
+
+@sio.on("disconnect")
+async def handle_disconnect(sid, *args):
+    await call_engine(moon_app.leave_game, sid)
+
+
+@sio.on("new_random_board")
+async def handle_new_random_board(sid, data):
+    await call_engine(moon_app.deal_random_board, sid, data)
+
+
+async def on_startup():
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(ASGI_THREADS))
+    asyncio.ensure_future(transport.run())
+    await asyncio.sleep(0)  # let the transport take the loop before any request arrives
+
+
+def create_asgi_app(flask_app=None):
+    """The ASGI app: Socket.IO on /socket.io, everything else to Flask."""
+    flask_app = flask_app or moon_app.app
+    moon_app.use_transport(transport)
+    moon_app.scoring_pool.blocking = engine.released
+    return socketio.ASGIApp(sio, ThreadedWsgiToAsgi(engine.wrap_wsgi(flask_app.wsgi_app)), on_startup=on_startup)
+
+
+app = create_asgi_app()
@@ -0,0 +1,95 @@
+# assets.py
+
+import json
+import mimetypes
+import os
+
+
+# Fingerprinted files never change, so browsers may keep them for a year
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+
+# Preferred encodings, best first, with their file suffixes
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def accepted_encodings(header):
+    """Encodings a client accepts from its Accept-Encoding header, with q > 0."""
+    accepted, rejected = set(), set()
+    wildcard = False
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name == "*":
+            wildcard = q > 0
+        elif q > 0:
+            accepted.add(name)
+        else:
+            rejected.add(name)
+    if wildcard:
+        accepted |= {name for name, _ in ENCODINGS} - rejected
+    return accepted
+
+
+class AssetStore:
+    """
+    Serves the output of build_assets.py from memory. Every file and its
+    precompressed variants are read once at startup, so a request is a
+    dict lookup and an encoding choice, not a filesystem read.
+    """
+
+    def __init__(self, dist_dir):
+        self.dist_dir = dist_dir
+        self.urls = {}   # source name -> /assets/ url
+        self.files = {}  # fingerprinted name -> {encoding: bytes}
+
+        manifest_path = os.path.join(dist_dir, "manifest.json")
+        if not os.path.exists(manifest_path):
+            return  # not built: templates fall back to plain static files
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        for name, filename in manifest["assets"].items():
+            self.urls[name] = f"/assets/{filename}"
+            variants = {}
+            with open(os.path.join(dist_dir, filename), "rb") as f:
+                variants["identity"] = f.read()
+            for encoding, suffix in ENCODINGS:
+                if encoding in manifest["encodings"].get(filename, []):
+                    with open(os.path.join(dist_dir, filename + suffix), "rb") as f:
+                        variants[encoding] = f.read()
+            self.files[filename] = variants
+
+    def url(self, name):
+        return self.urls.get(name)
+
+    def response(self, filename, accept_encoding=""):
+        """(body, headers) for a built file, or None if there's no such file."""
+        variants = self.files.get(filename)
+        if variants is None:
+            return None
+
+        accepted = accepted_encodings(accept_encoding)
+        encoding = next((name for name, _ in ENCODINGS if name in variants and name in accepted), "identity")
+        body = variants[encoding]
+
+        headers = {
+            "Content-Type": mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            "Content-Length": str(len(body)),
+            "Cache-Control": IMMUTABLE_CACHE,
+            "ETag": f'"{filename}-{encoding}"',
+        }
+        if len(variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return body, headers
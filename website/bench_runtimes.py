@@ -0,0 +1,282 @@
+# bench_runtimes.py
+#
+# Side-by-side benchmark of the two server runtimes:
+#
+#     eventlet  python app.py                      (Flask-SocketIO, monkey patched)
+#     asgi      uvicorn asgi:app --ws wsproto      (python-socketio AsyncServer)
+#
+# Each runtime is started in its own process and measured the same way:
+#   1. sockets: `rooms * watchers` Socket.IO clients connect over WebSocket at
+#      once and join their room; time until each has its first state_updated.
+#   2. moves: every room plays `moves` moves concurrently over HTTP; time for
+#      the /place response and until every socket in the room has the update.
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from wsproto import ConnectionType, WSConnection
+from wsproto.events import AcceptConnection, CloseConnection, Ping, Request, TextMessage
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+RUNTIMES = {
+    "eventlet": lambda port: [sys.executable, "app.py"],
+    "asgi": lambda port: [sys.executable, "-m", "uvicorn", "asgi:app", "--ws", "wsproto",
+                          "--port", str(port), "--log-level", "warning"],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000, 2)
+
+
+def latency_summary(values):
+    return {"count": len(values), "p50_ms": percentile(values, 0.5), "p99_ms": percentile(values, 0.99),
+            "max_ms": percentile(values, 1.0)}
+
+
+async def http(port, method, path, body=None, headers=None):
+    """One request on its own connection; returns (status, parsed JSON body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(body).encode() if body is not None else b""
+    lines = [f"{method} {path} HTTP/1.1", "Host: 127.0.0.1", "Connection: close",
+             f"Content-Length: {len(data)}", "Content-Type: application/json"]
+    lines += [f"{k}: {v}" for k, v in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + data)
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b"\r\n\r\n")
+    status = int(head.split(b" ", 2)[1])
+    if b"transfer-encoding: chunked" in head.lower():
+        chunks, rest = [], payload
+        while rest:
+            size, _, rest = rest.partition(b"\r\n")
+            size = int(size, 16)
+            if size == 0:
+                break
+            chunks.append(rest[:size])
+            rest = rest[size + 2:]
+        payload = b"".join(chunks)
+    return status, json.loads(payload) if payload else None
+
+
+class WebSocket:
+    """Text-only WebSocket client on wsproto, reading every frame as soon as it arrives."""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ws = WSConnection(ConnectionType.CLIENT)
+        self.messages = asyncio.Queue()
+        self.accepted = asyncio.Event()
+        self.task = None
+
+    @classmethod
+    async def connect(cls, port, path):
+        sock = cls(*await asyncio.open_connection("127.0.0.1", port))
+        sock.writer.write(sock.ws.send(Request(host="127.0.0.1", target=path)))
+        sock.task = asyncio.ensure_future(sock._read())
+        await sock.accepted.wait()
+        return sock
+
+    async def _read(self):
+        parts = []
+        while True:
+            data = await self.reader.read(65536)
+            self.ws.receive_data(data or None)
+            for event in self.ws.events():
+                if isinstance(event, AcceptConnection):
+                    self.accepted.set()
+                elif isinstance(event, TextMessage):
+                    parts.append(event.data)
+                    if event.message_finished:
+                        self.messages.put_nowait("".join(parts))
+                        parts = []
+                elif isinstance(event, Ping):
+                    self.writer.write(self.ws.send(event.response()))
+                elif isinstance(event, CloseConnection):
+                    return
+            if not data:
+                return
+
+    async def receive(self):
+        return await self.messages.get()
+
+    async def send(self, text):
+        self.writer.write(self.ws.send(TextMessage(data=text)))
+
+    async def close(self):
+        self.task.cancel()
+        self.writer.close()
+
+
+class BenchSocket:
+    """A minimal Socket.IO client over WebSocket, enough to join a room and count updates."""
+
+    def __init__(self, port, room_id):
+        self.port = port
+        self.room_id = room_id
+        self.version = 0
+        self.changed = asyncio.Event()
+        self.ws = None
+        self.task = None
+
+    async def join(self):
+        self.ws = await WebSocket.connect(self.port, "/socket.io/?EIO=4&transport=websocket")
+        await self.ws.receive()  # engine.io open packet
+        await self.ws.send("40")
+        while not (await self.ws.receive()).startswith("40"):
+            pass
+        await self.ws.send("42" + json.dumps(["join_room", {"room_id": self.room_id, "role": "player"}]))
+        self.task = asyncio.ensure_future(self._read())
+        await self.changed.wait()  # the room's current state
+
+    async def _read(self):
+        while True:
+            message = await self.ws.receive()
+            if message == "2":
+                await self.ws.send("3")
+            elif message.startswith("42"):
+                event, data = json.loads(message[2:])[:2]
+                if event == "state_updated":
+                    self.version = max(self.version, data.get("version", 0))
+                    self.changed.set()
+
+    async def wait_for(self, version):
+        while self.version < version:
+            self.changed.clear()
+            await self.changed.wait()
+
+    async def close(self):
+        self.task.cancel()
+        await self.ws.close()
+
+
+async def play_room(port, sockets, moves, place_times, fanout_times):
+    room_id = sockets[0].room_id
+    for _ in range(moves):
+        _, state = await http(port, "GET", f"/state/{room_id}", headers={"X-Player-ID": "player1"})
+        player = state["current_player"]
+        _, hand = await http(port, "GET", f"/hand/{room_id}/{player}")
+        empty = [name for name, node in state["graph"]["nodes"].items() if node["value"] is None]
+        cards = [c for c in hand if c is not None]
+        if not empty or not cards:
+            return
+        started = time.perf_counter()
+        status, result = await http(port, "POST", f"/place/{room_id}",
+                                    {"player": player, "node_name": empty[0], "value": cards[0]})
+        place_times.append(time.perf_counter() - started)
+        if status != 200 or not result.get("success"):
+            return
+        await asyncio.gather(*(s.wait_for(state["version"] + 1) for s in sockets))
+        fanout_times.append(time.perf_counter() - started)
+
+
+async def warm_up(port, rooms=4):
+    """A move in a few throwaway rooms, so worker startup isn't counted."""
+    async def one():
+        _, body = await http(port, "POST", "/start_game", {})
+        room_id = body["room_id"]
+        _, state = await http(port, "GET", f"/state/{room_id}", headers={"X-Player-ID": "player1"})
+        node_name = next(name for name, node in state["graph"]["nodes"].items() if node["value"] is None)
+        await http(port, "POST", f"/place/{room_id}", {"player": 1, "node_name": node_name, "value": state["hand"][0]})
+    await asyncio.gather(*(one() for _ in range(rooms)))
+
+
+async def measure(port, rooms, watchers, moves):
+    await warm_up(port)
+    room_ids = []
+    for _ in range(rooms):
+        _, body = await http(port, "POST", "/start_game", {})
+        room_ids.append(body["room_id"])
+
+    join_times = []
+
+    async def join(sock):
+        started = time.perf_counter()
+        await sock.join()
+        join_times.append(time.perf_counter() - started)
+
+    sockets = {room_id: [BenchSocket(port, room_id) for _ in range(watchers)] for room_id in room_ids}
+    started = time.perf_counter()
+    await asyncio.gather(*(join(s) for group in sockets.values() for s in group))
+    all_joined = time.perf_counter() - started
+
+    place_times, fanout_times = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(play_room(port, group, moves, place_times, fanout_times) for group in sockets.values()))
+    elapsed = time.perf_counter() - started
+
+    await asyncio.gather(*(s.close() for group in sockets.values() for s in group), return_exceptions=True)
+    return {
+        "sockets": rooms * watchers,
+        "join": latency_summary(join_times),
+        "all_joined_s": round(all_joined, 3),
+        "place": latency_summary(place_times),
+        "fanout": latency_summary(fanout_times),
+        "moves_per_s": round(len(place_times) / elapsed, 1) if elapsed else None,
+    }
+
+
+def start_server(runtime, port, scoring_workers):
+    env = dict(os.environ, PORT=str(port), RATE_LIMITS="0", RATINGS_DB=":memory:",
+               SCORING_WORKERS=str(scoring_workers))
+    env.pop("REPLAY_LOG", None)
+    server = subprocess.Popen(RUNTIMES[runtime](port), cwd=HERE, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if asyncio.run(http(port, "GET", "/readyz"))[0] == 200:
+                return server
+        except (OSError, ValueError, IndexError):
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"{runtime} server did not start")
+
+
+def run(runtime, rooms, watchers, moves, scoring_workers):
+    port = free_port()
+    server = start_server(runtime, port, scoring_workers)
+    try:
+        return {"runtime": runtime, **asyncio.run(measure(port, rooms, watchers, moves))}
+    finally:
+        server.terminate()
+        server.wait(10)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the eventlet and ASGI servers on sockets and move latency.")
+    parser.add_argument("--runtimes", nargs="+", default=list(RUNTIMES), choices=list(RUNTIMES))
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--watchers", type=int, default=10, help="sockets joined to each room")
+    parser.add_argument("--moves", type=int, default=10, help="moves played in each room")
+    parser.add_argument("--scoring-workers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    for runtime in args.runtimes:
+        report = run(runtime, args.rooms, args.watchers, args.moves, args.scoring_workers)
+        print(json.dumps(report))
+        print(f"[bench_runtimes] {runtime}: {report['sockets']} sockets joined in {report['all_joined_s']}s "
+              f"(p99 {report['join']['p99_ms']} ms); place p50 {report['place']['p50_ms']} / "
+              f"p99 {report['place']['p99_ms']} ms; fan-out p50 {report['fanout']['p50_ms']} / "
+              f"p99 {report['fanout']['p99_ms']} ms; {report['moves_per_s']} moves/s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
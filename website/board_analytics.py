@@ -0,0 +1,195 @@
+# board_analytics.py
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import sys
+from collections import defaultdict
+from itertools import islice
+from multiprocessing import Pool
+
+from board_import import iter_boards, validate_board, normalize_board, board_id
+from simulation import POLICIES, simulate_game
+
+
+# Bump when scoring or simulation changes, so cached reports are recomputed
+ANALYTICS_VERSION = 2
+
+# Games per pool task; small enough to spread one board over every worker
+GAMES_PER_JOB = 8
+
+
+def report_key(compact, games, seed, policy):
+    """Cache key: the board's content hash plus everything that changes the result."""
+    params = json.dumps([ANALYTICS_VERSION, games, seed, policy], separators=(",", ":"))
+    return f"{board_id(compact)}-{hashlib.sha1(params.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _play(job):
+    """Pool task: play a seeded slice of one board's games."""
+    index, compact, seeds, policy = job
+    games = []
+    for i, seed in seeds:
+        result = simulate_game(compact, seed=seed, policy=policy, starting_player=1 + i % 2)
+        games.append((
+            result["starting_player"],
+            result["winner"],
+            result["final_scores"][1],
+            result["final_scores"][2],
+            result["moves"],
+            result["cycles"],
+        ))
+    return index, games
+
+
+def _mean(values):
+    return round(statistics.fmean(values), 4) if values else 0.0
+
+
+def _variance(values):
+    return round(statistics.pvariance(values), 4) if values else 0.0
+
+
+def summarize(games):
+    """Balance and chain metrics over a board's game results."""
+    decided = [g for g in games if g[1]]
+    first_wins = sum(1 for g in decided if g[1] == g[0])
+    first_scores = [g[2] if g[0] == 1 else g[3] for g in games]
+    second_scores = [g[3] if g[0] == 1 else g[2] for g in games]
+    margins = [a - b for a, b in zip(first_scores, second_scores)]
+    cycles = [c for g in games for c in g[5]]  # (chains, total length, longest) per scoring move
+    chains = sum(c[0] for c in cycles)
+    first_win_rate = first_wins / len(decided) if decided else 0.5
+
+    return {
+        "games": len(games),
+        "first_player_win_rate": round(first_win_rate, 4),
+        "draw_rate": round(1 - len(decided) / len(games), 4) if games else 0.0,
+        "balance": round(1 - abs(2 * first_win_rate - 1), 4),
+        "mean_score": {"first": _mean(first_scores), "second": _mean(second_scores)},
+        "score_variance": {"first": _variance(first_scores), "second": _variance(second_scores)},
+        "mean_margin": _mean(margins),
+        "margin_variance": _variance(margins),
+        "mean_moves": _mean([g[4] for g in games]),
+        "lunar_cycles_per_game": round(chains / len(games), 4) if games else 0.0,
+        "mean_lunar_cycle_length": round(sum(c[1] for c in cycles) / chains, 4) if chains else 0.0,
+        "max_lunar_cycle_length": max((c[2] for c in cycles), default=0),
+    }
+
+
+class ReportCache:
+    """One JSON file per report key. Files are written whole, so workers never see a partial one."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        with open(self._path(key), encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, key, report):
+        if not self.directory:
+            return
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(report, f)
+        os.replace(tmp, self._path(key))
+
+
+def analyze_boards(boards, games=100, seed=0, policy="greedy", processes=None,
+                   cache_dir=None, batch_size=64):
+    """
+    Simulate `games` seeded games on each board and yield one report per
+    board, in input order. Seats alternate between games. Boards whose
+    report is already cached for the same parameters are not re-simulated.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy}")
+    processes = processes or os.cpu_count() or 1
+    cache = ReportCache(cache_dir)
+    boards = enumerate(boards)
+
+    with Pool(processes) as pool:
+        while True:
+            batch = list(islice(boards, batch_size))
+            if not batch:
+                return
+
+            reports, jobs = {}, []
+            for index, board in batch:
+                errors = validate_board(board)
+                if errors:
+                    reports[index] = {"index": index, "name": board.get("name"), "ok": False, "errors": errors}
+                    continue
+                compact = normalize_board(board)
+                key = report_key(compact, games, seed, policy)
+                cached = cache.get(key)
+                if cached is not None:
+                    reports[index] = dict(cached, index=index, cached=True)
+                    continue
+                reports[index] = {
+                    "index": index,
+                    "name": board.get("name"),
+                    "ok": True,
+                    "board_id": board_id(compact),
+                    "key": key,
+                    "params": {"games": games, "seed": seed, "policy": policy},
+                    "cached": False,
+                }
+                seeds = [(i, seed + i) for i in range(games)]
+                for start in range(0, games, GAMES_PER_JOB):
+                    jobs.append((index, compact, seeds[start:start + GAMES_PER_JOB], policy))
+
+            results = defaultdict(list)
+            for index, played in pool.imap_unordered(_play, jobs):
+                results[index] += played
+
+            for index, _ in batch:
+                report = reports[index]
+                if report["ok"] and not report["cached"]:
+                    report["metrics"] = summarize(results[index])
+                    cache.put(report["key"], {k: v for k, v in report.items() if k not in ("index", "cached")})
+                yield report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate games on each board and report balance metrics.")
+    parser.add_argument("path", help="JSON array, JSON-lines or single-board JSON file")
+    parser.add_argument("--games", type=int, default=100, help="games per board")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--policy", choices=POLICIES, default="greedy")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--cache-dir", default=".board_analytics", help="per-board report cache ('' to disable)")
+    parser.add_argument("--out", default="-", help="report file as JSON-lines (default: stdout)")
+    args = parser.parse_args(argv)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out != "-" else None
+    simulated = cached = 0
+    try:
+        for report in analyze_boards(iter_boards(args.path), args.games, args.seed, args.policy,
+                                     args.processes, args.cache_dir or None):
+            if report["ok"]:
+                cached += report["cached"]
+                simulated += not report["cached"]
+            line = json.dumps(report)
+            if out:
+                out.write(line + "\n")
+            else:
+                print(line)
+    finally:
+        if out:
+            out.close()
+    print(f"[board_analytics] {simulated} board(s) simulated, {cached} from cache", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
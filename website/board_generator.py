@@ -0,0 +1,268 @@
+# board_generator.py
+
+import argparse
+import json
+import math
+import os
+import random
+from multiprocessing import Pool
+
+from board_import import validate_board
+from simulation import balance_score
+
+
+# Board area of the game page (see #game-board in game.css)
+WIDTH = 800
+HEIGHT = 540
+MARGIN = 40
+
+
+def _fit(points):
+    """Scale raw (x, y) points into the board area, centered, keeping aspect ratio."""
+    xs = [p[0] for p in points]
+    ys = [p[1] for p in points]
+    span_x = (max(xs) - min(xs)) or 1
+    span_y = (max(ys) - min(ys)) or 1
+    scale = min((WIDTH - 2 * MARGIN) / span_x, (HEIGHT - 2 * MARGIN) / span_y, 100)
+    offset_x = (WIDTH - span_x * scale) / 2 - min(xs) * scale
+    offset_y = (HEIGHT - span_y * scale) / 2 - min(ys) * scale
+    return [[round(x * scale + offset_x), round(y * scale + offset_y)] for x, y in points]
+
+
+def _board(points, edges):
+    """Build a board dict in the same format as the graph builder's JSON export."""
+    names = [f"square-{i}" for i in range(len(points))]
+    nodes = {
+        name: {"name": name, "value": None, "neighbors": [], "position": position}
+        for name, position in zip(names, _fit(points))
+    }
+    for a, b in sorted(edges):
+        nodes[names[a]]["neighbors"].append(names[b])
+        nodes[names[b]]["neighbors"].append(names[a])
+    return {"nodes": nodes}
+
+
+def grid(size, rng):
+    points = [(col, row) for row in range(size) for col in range(size)]
+    edges = set()
+    for row in range(size):
+        for col in range(size):
+            i = row * size + col
+            if col < size - 1:
+                edges.add((i, i + 1))
+            if row < size - 1:
+                edges.add((i, i + size))
+    return _board(points, edges)
+
+
+def hex_lattice(size, rng):
+    """Offset rows of hexagonal cells; inner cells have six neighbors."""
+    points = [(col + 0.5 * (row % 2), row * math.sqrt(3) / 2) for row in range(size) for col in range(size)]
+    edges = set()
+    for row in range(size):
+        for col in range(size):
+            i = row * size + col
+            if col < size - 1:
+                edges.add((i, i + 1))
+            if row < size - 1:
+                for c in ((col - 1, col) if row % 2 == 0 else (col, col + 1)):
+                    if 0 <= c < size:
+                        edges.add((i, (row + 1) * size + c))
+    return _board(points, edges)
+
+
+def ring(size, rng):
+    points = [(math.cos(2 * math.pi * i / size), math.sin(2 * math.pi * i / size)) for i in range(size)]
+    edges = {(i, i + 1) for i in range(size - 1)} | {(0, size - 1)}
+    return _board(points, edges)
+
+
+def _segments_cross(p1, p2, p3, p4):
+    def orient(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+
+    d1, d2 = orient(p3, p4, p1), orient(p3, p4, p2)
+    d3, d4 = orient(p1, p2, p3), orient(p1, p2, p4)
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def _is_connected(count, edges):
+    adjacency = {i: [] for i in range(count)}
+    for a, b in edges:
+        adjacency[a].append(b)
+        adjacency[b].append(a)
+    seen = {0}
+    stack = [0]
+    while stack:
+        for j in adjacency[stack.pop()]:
+            if j not in seen:
+                seen.add(j)
+                stack.append(j)
+    return len(seen) == count
+
+
+def random_planar(size, rng, keep=0.65):
+    """
+    Scatter points with a minimum spacing, add the shortest non-crossing
+    edges (a greedy triangulation), then drop edges at random while the
+    board stays connected.
+    """
+    min_dist = 0.7 / math.sqrt(size)
+    points = []
+    misses = 0
+    while len(points) < size:
+        p = (rng.random(), rng.random() * HEIGHT / WIDTH)
+        if all(math.dist(p, q) >= min_dist for q in points):
+            points.append(p)
+            misses = 0
+            continue
+        # A layout too tight to finish loosens its spacing rather than looping forever. _fit draws
+        # these points at 100 px a unit, so 0.02 apart still rounds to distinct positions
+        misses += 1
+        if misses == 1000:
+            min_dist, misses = max(min_dist * 0.9, 0.02), 0
+
+    candidates = sorted(
+        ((i, j) for i in range(size) for j in range(i + 1, size)),
+        key=lambda e: math.dist(points[e[0]], points[e[1]])
+    )
+    edges = []
+    for a, b in candidates:
+        if not any(
+            len({a, b, c, d}) == 4 and _segments_cross(points[a], points[b], points[c], points[d])
+            for c, d in edges
+        ):
+            edges.append((a, b))
+
+    rng.shuffle(edges)
+    kept = set(edges)
+    for edge in edges:
+        if rng.random() > keep:
+            kept.discard(edge)
+            if not _is_connected(size, kept):
+                kept.add(edge)
+    return _board(points, kept)
+
+
+def symmetric(size, rng, fill=0.7):
+    """A mirror-symmetric shape cut out of a size x size grid."""
+    half = (size + 1) // 2
+    axis_col = half - 1
+    target = max(1, round(fill * half * size))
+
+    # Grow a connected blob in the left half, starting on the mirror axis
+    start = (rng.randrange(size), axis_col)
+    cells = {start}
+    frontier = [start]
+    while frontier and len(cells) < target:
+        row, col = cell = rng.choice(frontier)
+        options = [
+            (nr, nc) for nr, nc in ((row - 1, col), (row + 1, col), (row, col - 1), (row, col + 1))
+            if 0 <= nr < size and 0 <= nc < half and (nr, nc) not in cells
+        ]
+        if not options:
+            frontier.remove(cell)
+            continue
+        grown = rng.choice(options)
+        cells.add(grown)
+        frontier.append(grown)
+
+    cells |= {(row, size - 1 - col) for row, col in cells}
+    ordered = sorted(cells)
+    index = {cell: i for i, cell in enumerate(ordered)}
+    edges = set()
+    for (row, col), i in index.items():
+        for neighbor in ((row, col + 1), (row + 1, col)):
+            if neighbor in index:
+                edges.add((i, index[neighbor]))
+    return _board([(col, row) for row, col in ordered], edges)
+
+
+# Shapes whose size is a node count rather than a grid side
+NODE_COUNT_SHAPES = ("ring", "planar")
+
+SHAPES = {
+    "grid": grid,
+    "hex": hex_lattice,
+    "ring": ring,
+    "planar": random_planar,
+    "symmetric": symmetric,
+}
+
+
+def generate_board(shape, size, seed=None, deck_settings=None):
+    """Generate one board. The same (shape, size, seed) always gives the same board."""
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown shape: {shape}")
+    board = SHAPES[shape](size, random.Random(seed))
+    board["name"] = f"{shape}-{size}-{seed}"
+    board["generator"] = {"shape": shape, "size": size, "seed": seed}
+    if deck_settings:
+        board["deckSettings"] = deck_settings
+    return board
+
+
+def generate_specs(shapes, count, min_size, max_size, seed=0):
+    """Deterministic list of generator specs spread over the requested shapes."""
+    rng = random.Random(seed)
+    return [
+        {"shape": shapes[i % len(shapes)], "size": rng.randint(min_size, max_size), "seed": rng.getrandbits(32)}
+        for i in range(count)
+    ]
+
+
+def _generate_one(job):
+    spec, simulations, deck_settings = job
+    shape, size = spec["shape"], spec["size"]
+    if shape in NODE_COUNT_SHAPES:
+        size = size * size  # so a spec size means roughly the same number of nodes for every shape
+    board = generate_board(shape, size, spec["seed"], deck_settings)
+    errors = validate_board(board)
+    if errors:
+        raise ValueError(f"Generated board {board['name']} is invalid: {'; '.join(errors[:3])}")
+    if simulations:
+        board["balance"] = round(balance_score(board, games=simulations, seed=spec["seed"]), 4)
+    return board
+
+
+def generate_batch(specs, processes=None, simulations=0, deck_settings=None):
+    """Generate boards for a list of specs across a process pool, in order."""
+    processes = processes or os.cpu_count() or 1
+    jobs = [(spec, simulations, deck_settings) for spec in specs]
+    with Pool(processes) as pool:
+        yield from pool.imap(_generate_one, jobs, chunksize=max(1, len(jobs) // (4 * processes)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a library of boards as JSON-lines.")
+    parser.add_argument("--shapes", nargs="+", default=list(SHAPES), choices=list(SHAPES))
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--min-size", type=int, default=3, help="grid side; ring/planar use side * side nodes")
+    parser.add_argument("--max-size", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--simulate", type=int, default=0, help="games per board for the balance score")
+    parser.add_argument("--copies-per-phase", type=int, help="use a finite deck with this many copies")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="-", help="output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    deck_settings = None
+    if args.copies_per_phase:
+        deck_settings = {"deckType": "finite", "copiesPerPhase": args.copies_per_phase}
+
+    specs = generate_specs(args.shapes, args.count, args.min_size, args.max_size, args.seed)
+    out = open(args.out, "w", encoding="utf-8") if args.out != "-" else None
+    try:
+        for board in generate_batch(specs, args.processes, args.simulate, deck_settings):
+            line = json.dumps(board)
+            if out:
+                out.write(line + "\n")
+            else:
+                print(line)
+    finally:
+        if out:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
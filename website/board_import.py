@@ -0,0 +1,309 @@
+# board_import.py
+
+import argparse
+import hashlib
+import json
+import os
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+
+DECK_TYPES = ("finite", "infinite")
+
+READ_CHUNK_SIZE = 1 << 16
+
+# Largest boards the server will deal; chain scoring grows quickly with degree
+MAX_BOARD_NODES = 400
+MAX_NODE_DEGREE = 8
+MAX_COPIES_PER_PHASE = 100
+
+
+def iter_boards(path):
+    """
+    Stream boards from a file without loading it all into memory.
+    Accepts a JSON array of boards, JSON-lines, or a single board object.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf = ""
+        pos = 0
+        in_array = None
+        eof = False
+
+        while True:
+            # Skip whitespace and array punctuation between values
+            while pos < len(buf) and (buf[pos].isspace() or (in_array and buf[pos] in ",]")):
+                pos += 1
+
+            if pos == len(buf):
+                if eof:
+                    return
+                buf, pos = f.read(READ_CHUNK_SIZE), 0
+                eof = not buf
+                continue
+
+            if in_array is None:
+                in_array = buf[pos] == "["
+                if in_array:
+                    pos += 1
+                    continue
+
+            try:
+                board, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                chunk = f.read(READ_CHUNK_SIZE)
+                eof = not chunk
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+
+            yield board
+            pos = end
+
+
+def validate_board(board):
+    """
+    Return a list of human-readable problems with a board dict.
+    An empty list means the board can be played.
+    """
+    if not isinstance(board, dict) or not isinstance(board.get("nodes"), dict):
+        return ["Board must be an object with a 'nodes' object"]
+
+    nodes = board["nodes"]
+    if not nodes:
+        return ["Board has no nodes"]
+    size_errors = _size_cap_errors(nodes)  # deckSettings are checked with the other problems below
+    if size_errors:
+        return size_errors
+
+    errors = []
+    edges = set()
+    positions = {}
+
+    for name, node_data in nodes.items():
+        if not isinstance(node_data, dict):
+            errors.append(f"Node {name} must be an object")
+            continue
+
+        position = node_data.get("position")
+        if (not isinstance(position, (list, tuple)) or len(position) != 2
+                or not all(isinstance(c, (int, float)) for c in position)):
+            errors.append(f"Node {name} has an invalid position: {position!r}")
+        else:
+            key = tuple(position)
+            if key in positions:
+                errors.append(f"Nodes {positions[key]} and {name} share position {list(key)}")
+            else:
+                positions[key] = name
+
+        neighbors = node_data.get("neighbors", [])
+        if not isinstance(neighbors, list):
+            errors.append(f"Node {name} has invalid neighbors: {neighbors!r}")
+            continue
+
+        for neighbor_name in neighbors:
+            if neighbor_name == name:
+                errors.append(f"Node {name} is its own neighbor")
+            elif neighbor_name not in nodes:
+                errors.append(f"Node {name} has dangling neighbor {neighbor_name}")
+            else:
+                edges.add((name, neighbor_name))
+
+    for a, b in edges:
+        if (b, a) not in edges:
+            errors.append(f"Edge {a} -> {b} is not symmetric")
+
+    if not errors:
+        unreachable = len(nodes) - len(_reachable(nodes, edges))
+        if unreachable:
+            errors.append(f"Board is not connected: {unreachable} node(s) unreachable")
+
+    errors += _validate_deck_settings(board.get("deckSettings"))
+
+    if "scoringRules" in board:
+        from strategies.registry import build_rules  # only boards with custom rules need the registry
+        try:
+            build_rules(board["scoringRules"])
+        except (ValueError, TypeError) as e:
+            errors.append(f"Invalid scoringRules: {e}")
+
+    return errors
+
+
+def board_size_errors(board):
+    """
+    Cheap checks that a board is within the node and degree caps. Unlike
+    validate_board, this accepts any position format the builder exports.
+    """
+    if not isinstance(board, dict) or not isinstance(board.get("nodes"), dict):
+        return ["Board must be an object with a 'nodes' object"]
+    size_errors = _size_cap_errors(board["nodes"])
+    if size_errors:
+        return size_errors
+    deck_settings = board.get("deckSettings")
+    copies = deck_settings.get("copiesPerPhase") if isinstance(deck_settings, dict) else None
+    if copies is not None and (not _is_int(copies) or not 0 < copies <= MAX_COPIES_PER_PHASE):
+        return [f"deckSettings.copiesPerPhase must be an integer from 1 to {MAX_COPIES_PER_PHASE}"]
+    return []
+
+
+def _size_cap_errors(nodes):
+    if len(nodes) > MAX_BOARD_NODES:
+        return [f"Board has {len(nodes)} nodes; the limit is {MAX_BOARD_NODES}"]
+    for name, node_data in nodes.items():
+        neighbors = node_data.get("neighbors", []) if isinstance(node_data, dict) else []
+        if isinstance(neighbors, list) and len(neighbors) > MAX_NODE_DEGREE:
+            return [f"Node {name} has {len(neighbors)} neighbors; the limit is {MAX_NODE_DEGREE}"]
+    return []
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _reachable(nodes, edges):
+    adjacency = {name: [] for name in nodes}
+    for a, b in edges:
+        adjacency[a].append(b)
+
+    start = next(iter(nodes))
+    seen = {start}
+    queue = deque([start])
+    while queue:
+        for neighbor_name in adjacency[queue.popleft()]:
+            if neighbor_name not in seen:
+                seen.add(neighbor_name)
+                queue.append(neighbor_name)
+    return seen
+
+
+def _validate_deck_settings(deck_settings):
+    if deck_settings is None:
+        return []
+    if not isinstance(deck_settings, dict):
+        return ["deckSettings must be an object"]
+
+    deck_type = deck_settings.get("deckType")
+    if deck_type not in DECK_TYPES:
+        return [f"deckSettings.deckType must be one of {', '.join(DECK_TYPES)}"]
+
+    copies = deck_settings.get("copiesPerPhase")
+    if deck_type == "finite" and (not _is_int(copies) or copies < 1):
+        return ["deckSettings.copiesPerPhase must be a positive integer for a finite deck"]
+    if deck_type == "finite" and copies > MAX_COPIES_PER_PHASE:
+        return [f"deckSettings.copiesPerPhase must be at most {MAX_COPIES_PER_PHASE}"]
+    return []
+
+
+def normalize_board(board):
+    """
+    Convert a validated board dict into the compact topology form used by
+    `Graph.from_compact`, in a single linear pass. Duplicate neighbor entries
+    are dropped and board-level settings are carried over.
+    """
+    names = list(board["nodes"])
+    index = {name: i for i, name in enumerate(names)}
+
+    # Same edge order as Graph.from_dict, so both build identical graphs
+    adjacency = [[] for _ in names]
+    connected = set()
+    for i, name in enumerate(names):
+        for neighbor_name in board["nodes"][name].get("neighbors", []):
+            j = index[neighbor_name]
+            edge = (i, j) if i < j else (j, i)
+            if edge not in connected:
+                connected.add(edge)
+                adjacency[i].append(j)
+                adjacency[j].append(i)
+
+    compact = {
+        "names": names,
+        "positions": [list(board["nodes"][name]["position"]) for name in names],
+        "adjacency": adjacency,
+    }
+    for key in ("name", "deckSettings", "scoringRules"):
+        if key in board:
+            compact[key] = board[key]
+    return compact
+
+
+def board_id(compact):
+    """Stable content hash of a board's topology (ignores names and settings order)."""
+    canonical = json.dumps({
+        "positions": compact["positions"],
+        "edges": sorted([i, j] for i, neighbors in enumerate(compact["adjacency"]) for j in neighbors if i < j),
+        "deckSettings": compact.get("deckSettings"),
+        "scoringRules": compact.get("scoringRules"),
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def check_board(item):
+    """Validate and normalize one (index, board) pair. Runs in a worker process."""
+    index, board = item
+    errors = validate_board(board)
+    report = {
+        "index": index,
+        "name": board.get("name") if isinstance(board, dict) else None,
+        "ok": not errors,
+        "errors": errors,
+    }
+    if not errors:
+        compact = normalize_board(board)
+        report["board_id"] = board_id(compact)
+        report["board"] = compact
+    return report
+
+
+def import_boards(path, processes=None, batch_size=2048):
+    """
+    Validate and normalize every board in `path` across a process pool.
+    Yields one report per board, in file order. Boards are read in batches
+    so memory stays bounded however large the file is.
+    """
+    processes = processes or os.cpu_count() or 1
+    boards = enumerate(iter_boards(path))
+    with Pool(processes) as pool:
+        while True:
+            batch = list(islice(boards, batch_size))
+            if not batch:
+                return
+            chunksize = max(1, len(batch) // (4 * processes))
+            yield from pool.imap(check_board, batch, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate and normalize a file of boards.")
+    parser.add_argument("path", help="JSON array, JSON-lines or single-board JSON file")
+    parser.add_argument("--out", help="write normalized boards as JSON-lines here")
+    parser.add_argument("--report", help="write the per-board error report as JSON-lines here")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args(argv)
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    report = open(args.report, "w", encoding="utf-8") if args.report else None
+    total = failed = 0
+    try:
+        for result in import_boards(args.path, processes=args.processes):
+            total += 1
+            if result["ok"]:
+                if out:
+                    out.write(json.dumps({"board_id": result["board_id"], **result["board"]}) + "\n")
+            else:
+                failed += 1
+                print(f"[board {result['index']}] {result['name'] or ''}: {'; '.join(result['errors'])}")
+            if report:
+                report.write(json.dumps({k: v for k, v in result.items() if k != "board"}) + "\n")
+    finally:
+        for f in (out, report):
+            if f:
+                f.close()
+
+    print(f"{total - failed}/{total} boards valid")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,413 @@
+# build_assets.py
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import struct
+import zlib
+
+try:
+    import brotli
+except ImportError:  # Brotli variants are skipped without it
+    brotli = None
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+# ES module entry points, bundled with everything they import
+BUNDLES = ["script.js"]
+# Classic scripts and stylesheets, minified on their own
+SCRIPTS = ["game_settings.js"]
+STYLESHEETS = ["styles/game.css", "styles/game_settings.css", "styles/graph_builder.css"]
+IMAGES = ["images/star.png"]
+
+# Moon phases 0-7 in order, then the error phase; see setPhaseIcon in utils.js
+SPRITE = "images/moon/phases.png"
+SPRITE_FRAMES = [
+    "new_moon.png",
+    "waxing_crescent.png",
+    "first_quarter.png",
+    "waxing_gibbous.png",
+    "full_moon.png",
+    "waning_gibbous.png",
+    "last_quarter.png",
+    "waning_crescent.png",
+    "error_phase.png",
+]
+SPRITE_FRAME_SIZE = 128  # 2x the largest size a phase is drawn at
+
+COMPRESSIBLE = (".js", ".css", ".json", ".svg")
+
+
+# --- PNG -------------------------------------------------------------------
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+
+def read_png(data):
+    """Decode an 8-bit RGBA, non-interlaced PNG into (width, height, rows)."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("Not a PNG file")
+    pos = 8
+    idat = []
+    while pos < len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos + 8])
+        chunk = data[pos + 8:pos + 8 + length]
+        if kind == b"IHDR":
+            width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+            if (depth, color, interlace) != (8, 6, 0):
+                raise ValueError("Only 8-bit RGBA non-interlaced PNGs are supported")
+        elif kind == b"IDAT":
+            idat.append(chunk)
+        pos += 12 + length
+
+    raw = zlib.decompress(b"".join(idat))
+    stride = width * 4
+    rows = []
+    prev = bytearray(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        kind = raw[start]
+        row = bytearray(raw[start + 1:start + 1 + stride])
+        if kind == 1:
+            for i in range(4, stride):
+                row[i] = (row[i] + row[i - 4]) & 0xFF
+        elif kind == 2:
+            row = bytearray((a + b) & 0xFF for a, b in zip(row, prev))
+        elif kind == 3:
+            for i in range(stride):
+                left = row[i - 4] if i >= 4 else 0
+                row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                left = row[i - 4] if i >= 4 else 0
+                up_left = prev[i - 4] if i >= 4 else 0
+                row[i] = (row[i] + _paeth(left, prev[i], up_left)) & 0xFF
+        elif kind != 0:
+            raise ValueError(f"Bad PNG filter type {kind}")
+        rows.append(row)
+        prev = row
+    return width, height, rows
+
+
+def write_png(width, height, rows):
+    """Encode RGBA rows as a PNG, using the Sub filter where it helps."""
+    raw = bytearray()
+    for row in rows:
+        sub = bytes([row[i] if i < 4 else (row[i] - row[i - 4]) & 0xFF for i in range(len(row))])
+        # Pick whichever filter leaves smaller residuals (the usual PNG heuristic)
+        if sum(b if b < 128 else 256 - b for b in sub) < sum(b if b < 128 else 256 - b for b in row):
+            raw += b"\x01" + sub
+        else:
+            raw += b"\x00" + bytes(row)
+
+    def chunk(kind, body):
+        return struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(bytes(raw), 9))
+        + chunk(b"IEND", b"")
+    )
+
+
+def downscale(width, height, rows, size):
+    """Box-filter a square image down to size x size, weighting colors by alpha."""
+    if width != height or width % size:
+        raise ValueError(f"Can't scale a {width}x{height} image to {size}x{size}")
+    factor = width // size
+    out = []
+    for oy in range(size):
+        block = rows[oy * factor:(oy + 1) * factor]
+        row = bytearray(size * 4)
+        for ox in range(size):
+            r = g = b = a = 0
+            for src in block:
+                for i in range(ox * factor * 4, (ox + 1) * factor * 4, 4):
+                    alpha = src[i + 3]
+                    r += src[i] * alpha
+                    g += src[i + 1] * alpha
+                    b += src[i + 2] * alpha
+                    a += alpha
+            if a:
+                row[ox * 4:ox * 4 + 4] = bytes((r // a, g // a, b // a, a // (factor * factor)))
+        out.append(row)
+    return out
+
+
+def build_sprite(paths, size=SPRITE_FRAME_SIZE):
+    """Pack square PNGs side by side into one horizontal strip, size px per frame."""
+    frames = []
+    for path in paths:
+        with open(path, "rb") as f:
+            frames.append(downscale(*read_png(f.read()), size))
+    rows = [b"".join(frame[y] for frame in frames) for y in range(size)]
+    return write_png(size * len(frames), size, rows)
+
+
+# --- JS and CSS ------------------------------------------------------------
+
+IMPORT_RE = re.compile(r'^[ \t]*import\s*\{([^}]*)\}\s*from\s*["\'](\.[^"\']+)["\'];?[ \t]*$', re.M)
+EXPORT_RE = re.compile(r'^(\s*)export\s+(?:(async\s+)?(function\*?|class|const|let|var)\s+([A-Za-z_$][\w$]*))', re.M)
+# A "/" after one of these starts a regex literal rather than a division
+REGEX_PRECEDERS = set("(,=:[!&|?{};+-*%<>~^") | {""}
+
+
+def _module_var(path):
+    return "__" + re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+
+
+def _module_order(entry, static_dir):
+    """Modules reachable from `entry`, dependencies first."""
+    order, visiting, done = [], set(), set()
+
+    def visit(path):
+        if path in done:
+            return
+        if path in visiting:
+            raise ValueError(f"Circular import through {path}")
+        visiting.add(path)
+        with open(os.path.join(static_dir, path), encoding="utf-8") as f:
+            source = f.read()
+        for _, target in IMPORT_RE.findall(source):
+            visit(os.path.normpath(os.path.join(os.path.dirname(path), target)))
+        visiting.discard(path)
+        done.add(path)
+        order.append((path, source))
+
+    visit(entry)
+    return order
+
+
+def bundle_modules(entry, static_dir=STATIC_DIR):
+    """
+    Concatenate an ES module and its imports into a single module. Each
+    source module runs in its own function scope, in dependency order,
+    and hands its exports to the modules that import it.
+    """
+    parts = []
+    for path, source in _module_order(entry, static_dir):
+        if re.search(r"^\s*export\s+(default|\{|\*)", source, re.M) or re.search(r"^\s*import\s+[^{\s(]", source, re.M):
+            raise ValueError(f"{path}: only named imports and exported declarations can be bundled")
+
+        def replace_import(match):
+            names = []
+            for name in match.group(1).split(","):
+                name = name.strip()
+                if name:
+                    names.append(re.sub(r"\s+as\s+", ": ", name))
+            target = os.path.normpath(os.path.join(os.path.dirname(path), match.group(2)))
+            return f"const {{ {', '.join(names)} }} = {_module_var(target)};"
+
+        exports = [m.group(4) for m in EXPORT_RE.finditer(source)]
+        body = IMPORT_RE.sub(replace_import, source)
+        body = EXPORT_RE.sub(lambda m: m.group(1) + (m.group(2) or "") + m.group(3) + " " + m.group(4), body)
+
+        if path == entry:
+            parts.append(f"(() => {{\n{body}\n}})();\n")
+        else:
+            parts.append(f"const {_module_var(path)} = (() => {{\n{body}\nreturn {{ {', '.join(exports)} }};\n}})();\n")
+    return "".join(parts)
+
+
+def minify_js(source):
+    """
+    Conservative minifier: drops comments, indentation and blank lines but
+    never touches string, template or regex contents, and keeps line breaks
+    so automatic semicolon insertion behaves exactly as before.
+    """
+    out = []
+    i, n = 0, len(source)
+    state = None  # None (code), a quote character, or "regex"
+    templates = []  # brace depth at each open ${ ... } inside a template literal
+    depth = 0
+    last = ""  # last significant code character
+    line_start = True
+
+    while i < n:
+        c = source[i]
+        if state is None:
+            if line_start and c in " \t":
+                i += 1
+                continue
+            if c == "/" and source.startswith("//", i):
+                while i < n and source[i] != "\n":
+                    i += 1
+                continue
+            if c == "/" and source.startswith("/*", i) and not source.startswith("/*!", i):
+                end = source.find("*/", i + 2)
+                i = n if end == -1 else end + 2
+                continue
+            if c == "\n":
+                if out and out[-1] != "\n":
+                    while out and out[-1] in " \t":
+                        out.pop()
+                    out.append("\n")
+                line_start = True
+                i += 1
+                continue
+            line_start = False
+            if c in "'\"`":
+                state = c
+            elif c == "/" and last in REGEX_PRECEDERS:
+                state = "regex"
+            elif c == "{":
+                depth += 1
+            elif c == "}":
+                if templates and templates[-1] == depth:
+                    templates.pop()
+                    state = "`"
+                else:
+                    depth -= 1
+            if not c.isspace():
+                last = c
+            out.append(c)
+            i += 1
+        else:
+            out.append(c)
+            i += 1
+            if c == "\\":
+                if i < n:
+                    out.append(source[i])
+                    i += 1
+            elif state == "`" and c == "$" and i < n and source[i] == "{":
+                out.append("{")
+                i += 1
+                templates.append(depth)
+                state = None
+                last = "{"
+            elif c == state or (state == "regex" and c == "/"):
+                # A closed regex or string acts like an operand for the next "/"
+                last = "a"
+                state = None
+            elif state == "regex" and c == "[":
+                # "/" inside a character class doesn't end the regex
+                while i < n and source[i] != "]":
+                    if source[i] == "\\":
+                        out.append(source[i])
+                        i += 1
+                    out.append(source[i])
+                    i += 1
+    return "".join(out).strip() + "\n"
+
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)/static/([^'")]+)\1\s*\)""")
+
+
+def minify_css(source, urls=None):
+    """Drop comments and layout whitespace; point /static/ urls at built assets."""
+    source = re.sub(r"/\*(?!!).*?\*/", "", source, flags=re.S)
+    lines = [line.strip() for line in source.splitlines()]
+    source = "\n".join(line for line in lines if line)
+    source = re.sub(r"\s*([{};,>])\s*", r"\1", source)
+    source = re.sub(r";}", "}", source)
+    if urls:
+        source = CSS_URL_RE.sub(lambda m: f"url({urls.get(m.group(2), '/static/' + m.group(2))})", source)
+    return source + "\n"
+
+
+# --- Output ----------------------------------------------------------------
+
+def fingerprint(name, content):
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(content).hexdigest()[:10]}{ext}"
+
+
+def compress_variants(content):
+    """Precompressed encodings of `content` that are actually smaller than it."""
+    variants = {"gzip": gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants["br"] = brotli.compress(content, quality=11)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(content)}
+
+
+def build(static_dir=STATIC_DIR, out_dir=None, bundles=BUNDLES, scripts=SCRIPTS,
+          stylesheets=STYLESHEETS, images=IMAGES, sprite_frames=SPRITE_FRAMES, sprite_size=SPRITE_FRAME_SIZE):
+    """
+    Build every asset into `out_dir` (static/dist by default) and write its
+    manifest.json, mapping each source name to its fingerprinted file.
+    """
+    out_dir = out_dir or os.path.join(static_dir, "dist")
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    manifest = {"assets": {}, "encodings": {}}
+    report = []
+
+    def emit(name, content, sources):
+        filename = fingerprint(os.path.basename(name), content)
+        with open(os.path.join(out_dir, filename), "wb") as f:
+            f.write(content)
+        manifest["assets"][name] = filename
+        encodings = {}
+        if filename.endswith(COMPRESSIBLE):
+            for encoding, data in compress_variants(content).items():
+                suffix = ".br" if encoding == "br" else ".gz"
+                with open(os.path.join(out_dir, filename + suffix), "wb") as f:
+                    f.write(data)
+                encodings[encoding] = len(data)
+            manifest["encodings"][filename] = sorted(encodings)
+        source_bytes = sum(os.path.getsize(os.path.join(static_dir, s)) for s in sources)
+        report.append((name, len(sources), source_bytes, len(content), encodings))
+        return filename
+
+    # The sprite is also kept in static/ so the unbuilt dev server can use it
+    frame_dir = os.path.join(static_dir, os.path.dirname(SPRITE))
+    sprite = build_sprite([os.path.join(frame_dir, f) for f in sprite_frames], sprite_size)
+    with open(os.path.join(static_dir, SPRITE), "wb") as f:
+        f.write(sprite)
+
+    urls = {}
+    frame_sources = [os.path.join(os.path.dirname(SPRITE), f) for f in sprite_frames]
+    urls[SPRITE] = "/assets/" + emit(SPRITE, sprite, frame_sources)
+    for name in images:
+        with open(os.path.join(static_dir, name), "rb") as f:
+            urls[name] = "/assets/" + emit(name, f.read(), [name])
+
+    for name in stylesheets:
+        with open(os.path.join(static_dir, name), encoding="utf-8") as f:
+            emit(name, minify_css(f.read(), urls).encode("utf-8"), [name])
+    for name in scripts:
+        with open(os.path.join(static_dir, name), encoding="utf-8") as f:
+            emit(name, minify_js(f.read()).encode("utf-8"), [name])
+    for entry in bundles:
+        modules = [path for path, _ in _module_order(entry, static_dir)]
+        emit(entry, minify_js(bundle_modules(entry, static_dir)).encode("utf-8"), modules)
+
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bundle, minify, fingerprint and precompress static assets.")
+    parser.add_argument("--static", default=STATIC_DIR, help="static folder to build from")
+    parser.add_argument("--out", help="output folder (default: <static>/dist)")
+    args = parser.parse_args(argv)
+
+    manifest, report = build(args.static, args.out)
+    total_files = total_source = total_built = 0
+    for name, files, source_bytes, built_bytes, encodings in report:
+        best = min([built_bytes, *encodings.values()])
+        print(f"{name:28} {files:2} file(s) {source_bytes:8} -> {built_bytes:8} bytes (smallest {best})")
+        total_files += files
+        total_source += source_bytes
+        total_built += best
+    print(f"{total_files} requests / {total_source} bytes -> {len(report)} requests / {total_built} bytes")
+    if brotli is None:
+        print("Brotli is not installed: only gzip variants were written")
+
+
+if __name__ == "__main__":
+    main()
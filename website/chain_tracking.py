@@ -1,120 +1,234 @@
 # chain_tracking.py
 
-def deduplicate_chain(chain):
-    seen = set()
-    deduped = []
-    for node in chain:
-        if node.name not in seen:
-            deduped.append(node)
-            seen.add(node.name)
-    return deduped
+# Nodes one placement's chain search may visit. Normal boards need a few
+# dozen; dense boards built to branch at every step are cut off here, and
+# the move is scored on the chains found so far.
+MAX_CHAIN_STEPS = 5000
 
+class ChainBranch:
+    """One step of a chain: a node and the branches that continue from it."""
 
-def find_chains_from_node(node, graph):
-    """
-    Return all maximal increasing and decreasing chains starting from a node.
-    """
-    visited = set([node.name])
-    inc_chains = dfs_all_max_chains(node, visited, [], +1)
-    dec_chains = dfs_all_max_chains(node, visited, [], -1)
+    __slots__ = ("node", "next")
 
-    return {
-        "increasing": [c for c in inc_chains if len(c) > 1],
-        "decreasing": [c for c in dec_chains if len(c) > 1],
-    }
+    def __init__(self, node):
+        self.node = node
+        self.next = []
 
+    def to_dict(self):
+        return {"node": self.node.name, "next": [b.to_dict() for b in self.next]}
 
-def dfs_all_max_chains(current, visited, path, direction):
-    path = path + [current]
-    results = []
 
+def dfs_chain_branches(current, visited, direction, neighbors=None, budget=None):
+    """
+    Every maximal path of phases stepping by `direction` from `current`,
+    as a tree of ChainBranch objects: paths that share a prefix share its
+    branches. `neighbors` optionally restricts the first step.
+    """
     next_phase = (current.value + direction) % 8
-    extended = False
-
-    for neighbor in current.neighbors:
+    branches = []
+    for neighbor in current.neighbors if neighbors is None else neighbors:
+        if budget is not None and budget[0] <= 0:
+            break
         if neighbor.name not in visited and neighbor.value == next_phase:
-            extended = True
-            new_visited = visited.copy()
-            new_visited.add(neighbor.name)
-            results += dfs_all_max_chains(neighbor, new_visited, path, direction)
-
-    if not extended:
-        results.append(path)
-
-    return results
-
-
-def stitch_chains(center_node, decreasing, increasing):
-    stitched = []
-
-    for dec in decreasing:
-        dec_reversed = list(reversed(dec))  # [A, B, X]
-
-        for inc in increasing:
-            # Exclude center node from inc side to avoid duplicate
-            inc_tail = inc[1:] if len(inc) > 1 and inc[0] == center_node else inc
-            stitched.append(dec_reversed + inc_tail)
-
-    return stitched
-
-
-
-def collect_stitched_and_leftover(center_node, decreasing, increasing):
-    stitched = []
-    used_decreasing = set()
-    used_increasing = set()
-
-    for i, dec in enumerate(decreasing):
-        dec_rev = list(reversed(dec))
-
-        for j, inc in enumerate(increasing):
-            inc_tail = inc[1:] if len(inc) > 1 and inc[0] == center_node else inc
-            stitched.append(dec_rev + inc_tail)
-            used_decreasing.add(i)
-            used_increasing.add(j)
-
-    # Leftovers = valid (len ≥ 3) chains that weren't stitched
-    leftover = []
-    for i, dec in enumerate(decreasing):
-        if i not in used_decreasing and len(dec) >= 3:
-            leftover.append(dec)
-
-    for j, inc in enumerate(increasing):
-        if j not in used_increasing and len(inc) >= 3:
-            leftover.append(inc)
-
-    deduped_stitched = [deduplicate_chain(chain) for chain in stitched]
-    return {
-        "stitched": deduped_stitched,
-        "leftover": leftover
-    }
+            if budget is not None:
+                budget[0] -= 1
+            branch = ChainBranch(neighbor)
+            branch.next = dfs_chain_branches(neighbor, visited | {neighbor.name}, direction, budget=budget)
+            branches.append(branch)
+    return branches
+
+
+def _walk(branches, visit, depth=1):
+    """Call visit(branch, depth, leaves under it) for every branch; returns the leaves under `branches`."""
+    total = 0
+    for branch in branches:
+        leaves = _walk(branch.next, visit, depth + 1) if branch.next else 1
+        visit(branch, depth, leaves)
+        total += leaves
+    return total
+
+
+def _preorder(branches):
+    stack = list(reversed(branches))
+    while stack:
+        branch = stack.pop()
+        yield branch
+        stack += reversed(branch.next)
+
+
+def _leaf_paths(branches, prefix):
+    for branch in branches:
+        path = prefix + [branch["node"]]
+        if branch["next"]:
+            yield from _leaf_paths(branch["next"], path)
+        else:
+            yield path
+
+
+def _depth(branches):
+    """Steps on the longest path of a ChainDag.to_dict() branch tree."""
+    deepest = 0
+    stack = [(b, 1) for b in branches]
+    while stack:
+        branch, depth = stack.pop()
+        deepest = max(deepest, depth)
+        stack += [(b, depth + 1) for b in branch["next"]]
+    return deepest
+
+
+def _preorder_dicts(branches):
+    stack = list(branches)
+    while stack:
+        branch = stack.pop()
+        yield branch
+        stack += branch["next"]
+
+
+def chain_stats(structure):
+    """
+    (chains, total length, longest) of a lunar_cycle event's structure,
+    from its count, points and each side's deepest path, without listing
+    the chains. The longest is exact unless a chain could wrap all the way
+    round the phases (nine nodes or more), where it is an upper bound.
+    """
+    dec, inc = _depth(structure["decreasing"]), _depth(structure["increasing"])
+    longest = dec + inc + 1
+    if longest > 8:
+        names = {structure["center"]}
+        for branch in _preorder_dicts(structure["decreasing"] + structure["increasing"]):
+            names.add(branch["node"])
+        longest = min(longest, len(names))
+    return structure["chains"], structure["points"], longest
 
 
-def find_chains_through_node(node, graph):
+def expand_chains(structure):
+    """
+    Every chain of a ChainDag.to_dict() structure (as in lunar_cycle
+    events) as a list of names, in the order the stitched search used to
+    list them. This is the product the DAG avoids: for tools and tests, not
+    for scoring.
     """
-    Return all stitched and leftover chains that go through `node`,
-    as a single flat list of chains (each is a list of Node objects).
+    decreasing = list(_leaf_paths(structure["decreasing"], [structure["center"]]))
+    increasing = list(_leaf_paths(structure["increasing"], [structure["center"]]))
+    if decreasing and increasing:
+        for dec in decreasing:
+            for inc in increasing:
+                yield list(dict.fromkeys(list(reversed(dec)) + inc[1:]))
+    else:
+        yield from decreasing
+        yield from increasing
+
+
+class ChainDag:
     """
-    all_chains = find_chains_from_node(node, graph)
-    result = collect_stitched_and_leftover(
-        center_node=node,
-        decreasing=all_chains["decreasing"],
-        increasing=all_chains["increasing"]
-    )
-    return result["stitched"] + result["leftover"]
+    Every lunar-cycle chain through a placed node, without listing them.
 
+    `decreasing` and `increasing` are branch trees growing from the centre.
+    When both sides have branches, each chain is one decreasing path
+    reversed, the centre, then one increasing path: `len(dec) * len(inc)`
+    chains sharing prefixes. When only one side does, its paths of three or
+    more nodes are the chains. A chain scores one point per distinct node.
+    """
 
-def extract_connections_from_chains(chains):
+    def __init__(self, center, decreasing, increasing):
+        self.center = center
+        if not (decreasing and increasing):
+            # A one-sided chain needs two steps from the centre
+            decreasing = [b for b in decreasing if b.next]
+            increasing = [b for b in increasing if b.next]
+        self.decreasing = decreasing
+        self.increasing = increasing
+        self._sides = None
+
+    def _both_sides(self):
+        if self._sides is None:
+            self._sides = (self._side(self.decreasing), self._side(self.increasing))
+        return self._sides
+
+    @staticmethod
+    def _side(branches):
+        """(number of paths, total path length counting the centre, paths through each node name)"""
+        length = [0]
+        through = {}
+
+        def visit(branch, depth, leaves):
+            through[branch.node.name] = through.get(branch.node.name, 0) + leaves
+            if not branch.next:
+                length[0] += depth + 1
+
+        paths = _walk(branches, visit)
+        return paths, length[0], through
+
+    def count(self):
+        (dec_paths, _, _), (inc_paths, _, _) = self._both_sides()
+        if dec_paths and inc_paths:
+            return dec_paths * inc_paths
+        return dec_paths + inc_paths
+
+    def points(self):
+        """
+        Total points of every chain. A stitched chain has
+        len(dec) + len(inc) - 1 nodes, less any node reached on both sides
+        (phases wrap after 8 steps); summing that over all pairs needs only
+        per-side path counts and lengths, and for each node the number of
+        paths through it on either side.
+        """
+        (dec_paths, dec_length, dec_through), (inc_paths, inc_length, inc_through) = self._both_sides()
+        if not (dec_paths and inc_paths):
+            return dec_length + inc_length
+        shared = sum(count * inc_through[name] for name, count in dec_through.items() if name in inc_through)
+        return inc_paths * dec_length + dec_paths * inc_length - dec_paths * inc_paths - shared
+
+    def nodes(self):
+        """Names of every node on some chain, centre first."""
+        names = {self.center.name: None}
+        for branches in (self.decreasing, self.increasing):
+            for branch in _preorder(branches):
+                names[branch.node.name] = None
+        return list(names)
+
+    def connections(self):
+        """Sorted name pairs for every link used by some chain."""
+        pairs = {}
+        for branches in (self.decreasing, self.increasing):
+            stack = [(self.center, b) for b in branches]
+            while stack:
+                parent, branch = stack.pop()
+                pairs[tuple(sorted((parent.name, branch.node.name)))] = None
+                stack += [(branch.node, b) for b in branch.next]
+        return list(pairs)
+
+    def to_dict(self):
+        return {
+            "center": self.center.name,
+            "decreasing": [b.to_dict() for b in self.decreasing],
+            "increasing": [b.to_dict() for b in self.increasing],
+        }
+
+
+def build_chain_dag(node, graph, neighbors=None, max_steps=None):
     """
-    Given a list of chains (each a list of Node objects),
-    return sorted (a, b) tuples for all adjacent neighbors in each chain.
+    The ChainDag of a placement, its search stopped after `max_steps`
+    visits (MAX_CHAIN_STEPS by default), which keeps the result
+    deterministic for replays. The DAG's `steps` is how much of the budget
+    the search used, and `cut_off` whether it ran out.
     """
-    connections = set()
-    for chain in chains:
-        for i in range(len(chain) - 1):
-            a, b = chain[i], chain[i + 1]
-            if b in a.neighbors:
-                pair = tuple(sorted([a.name, b.name]))
-                connections.add(pair)
-    return list(connections)
-
+    limit = MAX_CHAIN_STEPS if max_steps is None else max_steps
+    budget = [limit]
+    visited = {node.name}
+    increasing = dfs_chain_branches(node, visited, +1, neighbors, budget)
+    decreasing = dfs_chain_branches(node, visited, -1, neighbors, budget)
+    dag = ChainDag(node, decreasing, increasing)
+    dag.steps = limit - budget[0]
+    dag.cut_off = budget[0] <= 0
+    return dag
+
+
+def find_chains_through_node(node, graph, neighbors=None):
+    """
+    Return all chains that go through `node` as a flat list (each is a
+    list of Node objects). Scoring uses build_chain_dag instead; the list
+    can be as long as the product of the two sides' chain counts.
+    """
+    dag = build_chain_dag(node, graph, neighbors)
+    return [[graph.nodes[name] for name in chain] for chain in expand_chains(dag.to_dict())]
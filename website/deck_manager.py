@@ -1,47 +1,100 @@
 # deck_manager.py
 import random
 
+
+# The wildcard card: played as whichever phase 0-7 scores best for its player
+WILDCARD = 8
+
+
+def new_seed():
+    """Fresh 32-bit seed for a deck, from the OS entropy pool."""
+    return random.SystemRandom().getrandbits(32)
+
+
 class DeckManager:
-    def __init__(self, deck_type="infinite", copies_per_phase=None):
+    """
+    Deals the moon phase cards for one room.
+
+    Every deck owns its own `random.Random` seeded with `self.seed`, so the
+    same seed always deals the same game and rooms never share RNG state.
+    A finite deck is a shuffled bytearray read through a cursor, with
+    per-phase remaining counts kept up to date on every draw.
+
+    `wildcards` adds WILDCARD cards: that many copies in a finite deck, or
+    that many extra faces on the infinite deck's die (each drawn with the
+    same chance as one phase).
+    """
+
+    def __init__(self, deck_type="infinite", copies_per_phase=None, seed=None, wildcards=0):
         self.deck_size = 8  # Moon phases 0–7
         self.hand_size = 3
         self.deck_type = deck_type
         self.copies_per_phase = copies_per_phase
-        self.deck = []
-        self.reset()
+        self.wildcards = wildcards or 0
+        self.deck = None
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        """Deal a new game. Pass a seed to replay a previous deal."""
+        self.seed = new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.cursor = 0
 
-    def reset(self):
         if self.deck_type == "finite" and self.copies_per_phase:
-            self.deck = []
-            for phase in range(self.deck_size):
-                self.deck.extend([phase] * self.copies_per_phase)
-            random.shuffle(self.deck)
+            self.deck = bytearray(phase for phase in range(self.deck_size) for _ in range(self.copies_per_phase))
+            self.deck += bytes([WILDCARD]) * self.wildcards
+            self.rng.shuffle(self.deck)
+            self.remaining_by_phase = [self.copies_per_phase] * self.deck_size
+            self.remaining_wildcards = self.wildcards
         else:
             self.deck = None  # infinite
+            self.remaining_by_phase = None
+            self.remaining_wildcards = None
 
-        self.players = {
-            1: {"hand": [self._draw_card() for _ in range(self.hand_size)]},
-            2: {"hand": [self._draw_card() for _ in range(self.hand_size)]},
-        }
+        self.players = {}
+        self._slots = {}
+        for player in (1, 2):
+            self.players[player] = {"hand": [self._draw_card() for _ in range(self.hand_size)]}
+            self._slots[player] = {}
+            for index, card in enumerate(self.players[player]["hand"]):
+                self._add_slot(player, card, index)
 
     def _draw_card(self):
-        if self.deck_type == "finite" and self.deck is not None:
-            if not self.deck:
+        if self.deck is not None:
+            if self.cursor == len(self.deck):
                 return None  # Deck exhausted
-            return self.deck.pop()
+            card = self.deck[self.cursor]
+            self.cursor += 1
+            if card == WILDCARD:
+                self.remaining_wildcards -= 1
+            else:
+                self.remaining_by_phase[card] -= 1
+            return card
         else:
-            return random.randint(0, self.deck_size - 1)
+            card = self.rng.randrange(self.deck_size + self.wildcards)
+            return card if card < self.deck_size else WILDCARD
+
+    def _add_slot(self, player, card, index):
+        if card is not None:
+            slots = self._slots[player].setdefault(card, [])
+            slots.append(index)
+            slots.sort()
+
+    def remaining(self):
+        """Cards left to draw, or None for an infinite deck."""
+        return None if self.deck is None else len(self.deck) - self.cursor
 
     def get_hand(self, player):
         return self.players[player]["hand"]
 
     def play(self, player, card):
-        hand = self.players[player]["hand"]
-        if card not in hand:
+        slots = self._slots[player].get(card)
+        if not slots:
+            hand = self.players[player]["hand"]
             raise ValueError(f"Player {player} does not have card {card} in hand: {hand}")
 
-        index = hand.index(card)
+        index = slots.pop(0)
         new_card = self._draw_card()
-        hand[index] = new_card
+        self.players[player]["hand"][index] = new_card
+        self._add_slot(player, new_card, index)
         return index, new_card  # return what was drawn for more detailed client updates
-
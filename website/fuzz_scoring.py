@@ -0,0 +1,329 @@
+# fuzz_scoring.py
+#
+# Differential fuzzing for scoring engines: random boards and move
+# sequences are scored by a brute-force baseline and by every other
+# registered engine, and their events, claims and scores compared move by
+# move. A failing case is shrunk to a minimal board and move list.
+#
+#     python fuzz_scoring.py --cases 500 --seed 0
+#
+# Engines are registered with @register_engine; an engine is a factory
+# taking a rules config and returning an object with
+# evaluate(player, node, graph) -> events, like ScoringEvaluator. The
+# baseline shares no scoring code with them: it lists every chain as a
+# path and scores pairs and chains directly.
+
+import argparse
+import json
+import pickle
+import random
+import sys
+import time
+
+from board_generator import SHAPES
+from chain_tracking import expand_chains
+from graph_logic import Graph
+from score_tracker import ScoreTracker
+from scoring_events import ScoringEvent
+from scoring_pool import score_job
+from chain_tracking import MAX_CHAIN_STEPS
+from strategies.registry import ScoringEvaluator, build_rules
+
+
+ENGINES = {}
+
+# The engine every other one is checked against
+BASELINE = "brute_force"
+
+# Rules configs cases are scored under; None is the default rule set
+RULES_CONFIGS = (None, ["lunar_cycle", "phase_pair"], {"full_moon_pair": {"points": 3}, "lunar_cycle": None})
+
+
+def register_engine(name):
+    """Register an engine factory under `name`. Usable as a decorator."""
+    def register(factory):
+        ENGINES[name] = factory
+        return factory
+    return register
+
+
+def all_max_chains(current, visited, path, direction, budget):
+    """Every maximal path of phases stepping by `direction` from `current`, as node lists."""
+    path = path + [current]
+    results = []
+    next_phase = (current.value + direction) % 8
+    extended = False
+    for neighbor in current.neighbors:
+        if budget[0] <= 0:
+            break
+        if neighbor.name not in visited and neighbor.value == next_phase:
+            extended = True
+            budget[0] -= 1
+            results += all_max_chains(neighbor, visited | {neighbor.name}, path, direction, budget)
+    if not extended:
+        results.append(path)
+    return results
+
+
+@register_engine("brute_force")
+class BruteForceEngine:
+    """
+    Scoring as the rules read: a pair event per matching neighbor, and
+    every lunar-cycle chain listed as a path (one per decreasing and
+    increasing path pair, each node counted once) and summed. Searched in
+    the same order and step budget as the chain DAG, so cut-off searches
+    agree too.
+    """
+
+    def __init__(self, rules):
+        self.rules = [(rule.name, getattr(rule, "points", None)) for rule in build_rules(rules)]
+
+    def evaluate(self, player, node, graph):
+        events = []
+        for name, points in self.rules:
+            if name == "lunar_cycle":
+                events += self.cycle(player, node)
+                continue
+            for neighbor in node.neighbors:
+                if neighbor.value is None:
+                    continue
+                if neighbor.value == node.value if name == "phase_pair" else abs(neighbor.value - node.value) == 4:
+                    pair = tuple(sorted((node.name, neighbor.name)))
+                    events.append(ScoringEvent(player, name, {"pair": pair, "points": points},
+                                               [node.name, neighbor.name], [pair], points))
+        return events
+
+    @staticmethod
+    def cycle(player, node):
+        budget = [MAX_CHAIN_STEPS]
+        increasing = [p for p in all_max_chains(node, {node.name}, [], +1, budget) if len(p) > 1]
+        decreasing = [p for p in all_max_chains(node, {node.name}, [], -1, budget) if len(p) > 1]
+        if decreasing and increasing:
+            paths = decreasing + increasing
+            chains = [list(dict.fromkeys([n.name for n in reversed(dec)] + [n.name for n in inc[1:]]))
+                      for dec in decreasing for inc in increasing]
+        else:
+            paths = [p for p in decreasing + increasing if len(p) > 2]  # one-sided: two steps at least
+            chains = [[n.name for n in p] for p in paths]
+        if not chains:
+            return []
+
+        points = sum(len(chain) for chain in chains)
+        claimed = list(dict.fromkeys(name for chain in chains for name in chain))
+        connections = list(dict.fromkeys(tuple(sorted((a.name, b.name))) for p in paths for a, b in zip(p, p[1:])))
+        return [ScoringEvent(player, "lunar_cycle", {"chains": chains, "points": points},
+                             claimed, connections, points)]
+
+
+@register_engine("reference")
+def reference_engine(rules):
+    """Today's single-pass evaluator, the one the game uses."""
+    return ScoringEvaluator(build_rules(rules))
+
+
+@register_engine("per_rule")
+class PerRuleEngine:
+    """ScoreTracker's per-rule API: each rule looks at all of the node's neighbors itself."""
+
+    def __init__(self, rules):
+        self.rules = build_rules(rules)
+
+    def evaluate(self, player, node, graph):
+        tracker = ScoreTracker()
+        events = []
+        for rule in self.rules:
+            if hasattr(rule, "score_cycle"):
+                events += tracker.update_score_for_cycle(player, rule, node, graph)
+            else:
+                events += tracker.update_score_for_pair(player, rule, node)
+        return events
+
+
+@register_engine("worker")
+class WorkerEngine:
+    """The scoring pool's job: a compact copy of the board, events pickled back."""
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def evaluate(self, player, node, graph):
+        return pickle.loads(pickle.dumps(score_job(graph.to_compact(), self.rules, player, node.name)))
+
+
+@register_engine("candidates")
+class CandidatesEngine:
+    """Wildcard scoring: all eight phases in one pass, keeping the events for the card placed."""
+
+    def __init__(self, rules):
+        self.evaluator = ScoringEvaluator(build_rules(rules))
+
+    def evaluate(self, player, node, graph):
+        return self.evaluator.evaluate_candidates(player, node, graph)[node.value]
+
+
+# --- Cases: {"board": compact board without values, "rules": config, "moves": [[player, name, value]]} ---
+
+def random_case(rng, max_nodes=30):
+    shape = rng.choice(("grid", "hex", "ring", "planar"))
+    if shape in ("grid", "hex"):
+        size = rng.randint(2, max(2, int(max_nodes ** 0.5)))
+    else:
+        size = rng.randint(3, max(3, max_nodes))
+    graph = Graph.from_dict(SHAPES[shape](size, rng))
+    board = graph.to_compact()
+    del board["values"]
+
+    # Half the cards continue a neighbor's phase (or its opposite), so chains and pairs are common
+    moves = []
+    order = list(graph.nodes.values())
+    rng.shuffle(order)
+    for i, node in enumerate(order[:rng.randint(1, len(order))]):
+        placed = [n.value for n in node.neighbors if n.value is not None]
+        if placed and rng.random() < 0.5:
+            value = (rng.choice(placed) + rng.choice((-1, 0, 1, 4))) % 8
+        else:
+            value = rng.randrange(8)
+        node.value = value
+        moves.append([1 + i % 2, node.name, value])
+    return {"board": board, "rules": rng.choice(RULES_CONFIGS), "moves": moves}
+
+
+def canonical_event(event):
+    """An event with orderings that carry no meaning (claims, connections, DAG branches) sorted out."""
+    structure = event["structure"]
+    if "chains" in structure:
+        # The baseline lists its chains; the others keep a chain DAG and a count
+        chains = structure["chains"] if isinstance(structure["chains"], list) else expand_chains(structure)
+        structure = {"chains": sorted(map(tuple, chains)), "points": structure["points"]}
+    else:
+        structure = {"pair": tuple(structure["pair"]), "points": structure["points"]}
+    return {
+        "player": event["player"],
+        "type": event["type"],
+        "points": event["points"],
+        "structure": structure,
+        "claimed": sorted(event["claimed"]),
+        "connections": sorted(tuple(sorted(pair)) for pair in event["connections"]),
+    }
+
+
+def first_mismatch(case, engines, timings=None):
+    """
+    Play the case through every engine. Returns None if they all agree,
+    else where they first differ and what each gave.
+    """
+    runs = {}
+    for name in engines:
+        runs[name] = (ENGINES[name](case["rules"]), Graph.from_compact(case["board"]), ScoreTracker())
+
+    for index, (player, node_name, value) in enumerate(case["moves"]):
+        results = {}
+        for name, (engine, graph, tracker) in runs.items():
+            node = graph.nodes[node_name]
+            node.value = value
+            started = time.perf_counter()
+            try:
+                events = engine.evaluate(player, node, graph)
+            except Exception as e:
+                results[name] = {"error": f"{type(e).__name__}: {e}"}
+                continue
+            finally:
+                if timings is not None:
+                    timings[name] = timings.get(name, 0.0) + time.perf_counter() - started
+            tracker.apply_events(events)
+            results[name] = {
+                "events": [canonical_event(e) for e in events],
+                "scores": dict(tracker.scores),
+                "claimed_cards": dict(sorted(tracker.claimed_cards.items())),
+            }
+
+        reference = results[engines[0]]
+        if any(result != reference for result in results.values()):
+            return {"move": index, "results": results}
+    return None
+
+
+def remove_node(case, name):
+    board = case["board"]
+    keep = [i for i, n in enumerate(board["names"]) if n != name]
+    index = {old: new for new, old in enumerate(keep)}
+    return {
+        "board": {
+            "names": [board["names"][i] for i in keep],
+            "positions": [board["positions"][i] for i in keep],
+            "adjacency": [[index[j] for j in board["adjacency"][i] if j in index] for i in keep],
+        },
+        "rules": case["rules"],
+        "moves": [move for move in case["moves"] if move[1] != name],
+    }
+
+
+def shrink(case, engines):
+    """Greedily drop moves and nodes while the engines still disagree; returns the smallest case found."""
+    def fails(candidate):
+        return first_mismatch(candidate, engines) is not None
+
+    mismatch = first_mismatch(case, engines)
+    case = dict(case, moves=case["moves"][:mismatch["move"] + 1])
+    changed = True
+    while changed:
+        changed = False
+        for i in reversed(range(len(case["moves"]))):
+            candidate = dict(case, moves=case["moves"][:i] + case["moves"][i + 1:])
+            if candidate["moves"] and fails(candidate):
+                case, changed = candidate, True
+        for name in reversed(case["board"]["names"]):
+            candidate = remove_node(case, name)
+            if candidate["moves"] and fails(candidate):
+                case, changed = candidate, True
+    return case
+
+
+def fuzz(cases=200, seed=0, engines=None, max_nodes=30):
+    """
+    Run `cases` random cases through `engines` (default: all) and the
+    baseline, and report. Times are relative to the reference evaluator.
+    """
+    engines = [BASELINE] + [name for name in engines or ENGINES if name != BASELINE]
+    rng = random.Random(seed)
+    timings = {}
+    moves = 0
+    failures = []
+    for _ in range(cases):
+        case = random_case(rng, max_nodes)
+        moves += len(case["moves"])
+        mismatch = first_mismatch(case, engines, timings)
+        if mismatch is not None:
+            small = shrink(case, engines)
+            failures.append({"case": small, **first_mismatch(small, engines)})
+
+    reference = timings.get("reference") or timings.get(BASELINE) or 1e-9
+    return {
+        "cases": cases,
+        "moves": moves,
+        "failures": failures,
+        "engines": {name: {"seconds": round(timings.get(name, 0.0), 4),
+                           "relative": round(timings.get(name, 0.0) / reference, 2)} for name in engines},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check scoring engines against the reference on random boards.")
+    parser.add_argument("--cases", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-nodes", type=int, default=30)
+    parser.add_argument("--engines", nargs="+", choices=list(ENGINES), help="default: every registered engine")
+    args = parser.parse_args(argv)
+
+    report = fuzz(args.cases, args.seed, args.engines, args.max_nodes)
+    for failure in report["failures"]:
+        print(json.dumps(failure))
+    speeds = ", ".join(f"{name} {e['relative']}x ({e['seconds']}s)" for name, e in report["engines"].items())
+    print(f"[fuzz_scoring] {report['cases']} cases, {report['moves']} moves, "
+          f"{len(report['failures'])} mismatch(es) against {BASELINE}; time relative to reference: {speeds}",
+          file=sys.stderr)
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
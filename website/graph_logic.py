@@ -1,5 +1,8 @@
 # graph_logic.py
 class Node:
+    # Every live room holds one per cell, so slots keep the per-room memory down
+    __slots__ = ("name", "value", "neighbors", "position")
+
     def __init__(self, name, position):
         self.name = name
         self.value = None
@@ -42,25 +45,56 @@ class Graph:
         for node in self.nodes.values():
             node.value = None
 
+    def get_values(self):
+        """Every node's value in node order: the board's state, since its shape never changes in a game."""
+        return tuple(node.value for node in self.nodes.values())
 
-    @staticmethod
-    def from_dict(data):
-        new_graph = Graph()
-        for node_id, node_info in data['nodes'].items():
-            new_graph.add_node(node_id, node_info['position'])
-            new_graph.nodes[node_id].value = node_info['value']
-        return new_graph
+    def set_values(self, values):
+        for node, value in zip(self.nodes.values(), values):
+            node.value = value
 
 
     @classmethod
     def from_dict(cls, data):
+        """
+        Build a graph from a board dict (as exported by the graph builder).
+        Edges are deduplicated with a set, so this is linear in the board size.
+        """
         g = cls()
         for name, node_data in data["nodes"].items():
             g.add_node(name, position=tuple(node_data.get("position", (0,0))))
+        connected = set()
         for name, node_data in data["nodes"].items():
             node = g.nodes[name]
             for neighbor_name in node_data.get("neighbors", []):
-                if neighbor_name in g.nodes and g.nodes[neighbor_name] not in node.neighbors:
+                edge = (name, neighbor_name) if name < neighbor_name else (neighbor_name, name)
+                if neighbor_name in g.nodes and neighbor_name != name and edge not in connected:
+                    connected.add(edge)
                     g.connect_nodes(node, g.nodes[neighbor_name])
         return g
 
+    def to_compact(self):
+        """
+        Compact topology form: parallel lists indexed by node, with neighbors
+        stored as indices (in the same order as `Node.neighbors`).
+        Cheap to pickle and to hash.
+        """
+        names = list(self.nodes)
+        index = {name: i for i, name in enumerate(names)}
+        return {
+            "names": names,
+            "positions": [list(node.position) for node in self.nodes.values()],
+            "adjacency": [[index[n.name] for n in node.neighbors] for node in self.nodes.values()],
+            "values": [node.value for node in self.nodes.values()],
+        }
+
+    @classmethod
+    def from_compact(cls, data):
+        g = cls()
+        names = data["names"]
+        nodes = [g.add_node(name, position=tuple(pos)) for name, pos in zip(names, data["positions"])]
+        for node, neighbors in zip(nodes, data["adjacency"]):
+            node.neighbors = [nodes[j] for j in neighbors]
+        for node, value in zip(nodes, data.get("values") or []):
+            node.value = value
+        return g
@@ -0,0 +1,44 @@
+# json_codec.py
+#
+# JSON for responses, socket packets and state views: orjson when it is
+# installed, the standard library otherwise. Both give the same compact
+# output, with non-string keys (scores by player number) as strings.
+
+import json
+
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+
+def to_json(obj):
+    """`default` hook for the slotted models (Node, ScoringEvent), which serialize through to_dict()."""
+    to_dict = getattr(obj, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return to_dict()
+
+
+if orjson is not None:
+    def dumps(obj):
+        return orjson.dumps(obj, default=to_json, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    loads = orjson.loads
+else:
+    def dumps(obj):
+        return json.dumps(obj, default=to_json, separators=(",", ":"), ensure_ascii=False)
+
+    loads = json.loads
+
+
+class CodecJSONProvider(JSONProvider):
+    """Flask's jsonify and request.get_json through this module."""
+
+    def dumps(self, obj, **kwargs):
+        return dumps(obj)
+
+    def loads(self, s, **kwargs):
+        return loads(s)
@@ -0,0 +1,269 @@
+# matchmaking.py
+
+import hashlib
+import heapq
+import itertools
+import json
+import time
+import uuid
+from bisect import bisect_left
+from collections import deque
+
+
+# Upper bounds (seconds) of the wait-time histogram buckets; the last is open-ended
+WAIT_TIME_BOUNDS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120, float("inf"))
+
+
+def bucket_key(boards, deck_type, copies_per_phase):
+    """Players are only paired with others who asked for the same board set and deck."""
+    board_set = hashlib.sha1(json.dumps(boards or [], sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    if deck_type != "finite":
+        copies_per_phase = None
+    return f"{board_set}:{deck_type}:{copies_per_phase}"
+
+
+class Histogram:
+    def __init__(self, bounds=WAIT_TIME_BOUNDS):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        return {
+            "bounds": [b if b != float("inf") else "inf" for b in self.bounds],
+            "counts": self.counts,
+            "count": self.count,
+            "sum": round(self.sum, 3),
+        }
+
+
+class Ticket:
+    __slots__ = ("id", "bucket", "settings", "status", "created", "matched_at", "deadline",
+                 "opponent", "seat", "accepted", "room_id")
+
+    def __init__(self, bucket, settings, now):
+        self.id = uuid.uuid4().hex[:12]
+        self.bucket = bucket
+        self.settings = settings  # the bucket's room settings, shared by its tickets
+        self.status = "waiting"  # -> matched -> ready, or cancelled / expired / abandoned
+        self.created = now
+        self.matched_at = None
+        self.deadline = None
+        self.opponent = None
+        self.seat = None
+        self.accepted = False
+        self.room_id = None
+
+    def to_dict(self, now):
+        data = {"ticket": self.id, "status": self.status, "waited": round((self.matched_at or now) - self.created, 3)}
+        if self.status in ("matched", "ready"):
+            data["seat"] = self.seat
+            data["accepted"] = self.accepted
+        if self.status == "matched":
+            data["accept_within"] = round(max(0.0, self.deadline - now), 3)
+        if self.status == "ready":
+            data["room_id"] = self.room_id
+            data["url"] = f"/game/{self.room_id}?player={self.seat[-1]}"
+        return data
+
+
+class Matchmaker:
+    """
+    Queue of players waiting for an opponent, one FIFO per (board set, deck)
+    bucket. Joining pairs with the oldest live ticket in the bucket, so a
+    match costs O(1) amortized: dead tickets are skipped lazily rather than
+    removed from the middle of the queue.
+
+    A pair then has `accept_timeout` seconds to accept its seats. When both
+    accept, `create_room(settings)` deals the game the same way /start_game
+    does. A player who doesn't accept in time is abandoned and the one who
+    did goes back to the front of the queue, waiting afresh. Tickets nobody
+    matches within `queue_timeout` seconds expire; they are found from a
+    heap ordered by expiry, so expiring costs nothing while none are due.
+
+    A bucket is forgotten once nobody is waiting in it, so the board sets
+    players ever asked for aren't kept; matched tickets hold their settings.
+    """
+
+    def __init__(self, create_room, queue_timeout=120.0, accept_timeout=15.0, clock=time.monotonic):
+        self.create_room = create_room
+        self.queue_timeout = queue_timeout
+        self.accept_timeout = accept_timeout
+        self.clock = clock
+
+        self.queues = {}    # bucket -> deque of tickets, oldest first
+        self.waiting = {}   # bucket -> live waiting count
+        self.settings = {}  # bucket -> room settings, stored once per bucket while it has a queue
+        self.tickets = {}
+        self.by_age = deque()  # every ticket, oldest first, for forgetting resolved ones
+        self.pending = deque()  # matched pairs by accept deadline
+        self.expiries = []  # (expires at, seq, ticket, created) per time a ticket was queued; a heap
+        self.sequence = itertools.count()
+        self.wait_times = Histogram()
+        self.totals = {"joined": 0, "matched": 0, "ready": 0, "expired": 0, "abandoned": 0, "cancelled": 0}
+
+    def join(self, boards=None, deck_type="infinite", copies_per_phase=None):
+        now = self.clock()
+        self.expire(now)
+
+        key = bucket_key(boards, deck_type, copies_per_phase)
+        settings = self.settings.get(key) or {
+            "boards": boards,
+            "deck_type": deck_type,
+            "copies_per_phase": copies_per_phase if deck_type == "finite" else None,
+        }
+        queue = self._queue(key, settings)
+
+        ticket = Ticket(key, settings, now)
+        self.tickets[ticket.id] = ticket
+        self.by_age.append(ticket)
+        self.totals["joined"] += 1
+
+        while queue:
+            other = queue.popleft()
+            if other.status == "waiting":
+                self.waiting[key] -= 1
+                self._forget_if_idle(key)
+                self._pair(other, ticket, now)
+                return ticket
+
+        queue.append(ticket)
+        self.waiting[key] += 1
+        self._schedule_expiry(ticket)
+        return ticket
+
+    def _schedule_expiry(self, ticket):
+        expires = ticket.created + self.queue_timeout
+        heapq.heappush(self.expiries, (expires, next(self.sequence), ticket, ticket.created))
+
+    def _queue(self, key, settings):
+        if key not in self.queues:
+            self.queues[key] = deque()
+            self.waiting[key] = 0
+            self.settings[key] = settings
+        return self.queues[key]
+
+    def _forget_if_idle(self, key):
+        """Drop a bucket nobody is waiting in; any tickets left in its queue are dead."""
+        if self.waiting.get(key) == 0:
+            del self.queues[key], self.waiting[key], self.settings[key]
+
+    def _pair(self, first, second, now):
+        deadline = now + self.accept_timeout
+        for ticket, seat, opponent in ((first, "player1", second), (second, "player2", first)):
+            ticket.status = "matched"
+            ticket.seat = seat
+            ticket.opponent = opponent
+            ticket.matched_at = now
+            ticket.deadline = deadline
+            self.wait_times.observe(now - ticket.created)
+        self.pending.append((deadline, first))
+        self.totals["matched"] += 1
+
+    def get(self, ticket_id):
+        self.expire()
+        return self.tickets.get(ticket_id)
+
+    def accept(self, ticket_id):
+        ticket = self.get(ticket_id)
+        if ticket is None or ticket.status not in ("matched", "ready"):
+            return ticket
+
+        ticket.accepted = True
+        opponent = ticket.opponent
+        if ticket.status == "matched" and opponent.accepted:
+            room_id = self.create_room(ticket.settings)
+            for t in (ticket, opponent):
+                t.status = "ready"
+                t.room_id = room_id
+            self.totals["ready"] += 1
+        return ticket
+
+    def leave(self, ticket_id):
+        ticket = self.get(ticket_id)
+        if ticket is None:
+            return None
+        if ticket.status == "waiting":
+            ticket.status = "cancelled"
+            self.waiting[ticket.bucket] -= 1
+            self._forget_if_idle(ticket.bucket)
+            self.totals["cancelled"] += 1
+        elif ticket.status == "matched":
+            self._abandon(ticket, self.clock())
+        return ticket
+
+    def _abandon(self, ticket, now):
+        """`ticket` walked away from a match: requeue its opponent at the front."""
+        ticket.status = "abandoned"
+        self.totals["abandoned"] += 1
+        opponent = ticket.opponent
+        ticket.opponent = opponent.opponent = None
+
+        if opponent.status == "matched":
+            opponent.status = "waiting"
+            opponent.accepted = False
+            opponent.seat = opponent.deadline = opponent.matched_at = None
+            opponent.created = now  # a fresh wait, with its own queue_timeout
+            self._queue(opponent.bucket, opponent.settings).appendleft(opponent)
+            self.waiting[opponent.bucket] += 1
+            self._schedule_expiry(opponent)
+
+    def expire(self, now=None):
+        """
+        Resolve timed-out handshakes and drop tickets that waited too long.
+        The handshakes and expiries are ordered by time, so this only looks
+        at the ones that are due.
+        """
+        now = self.clock() if now is None else now
+
+        while self.pending and self.pending[0][0] <= now:
+            deadline, first = self.pending.popleft()
+            second = first.opponent
+            if first.status != "matched" or first.deadline != deadline:
+                continue  # already resolved, or requeued into a newer match
+            stragglers = [t for t in (first, second) if not t.accepted]
+            if len(stragglers) == 2:
+                for t in stragglers:
+                    t.status = "abandoned"
+                    t.opponent = None
+                self.totals["abandoned"] += 2
+            else:
+                self._abandon(stragglers[0], now)
+
+        while self.expiries and self.expiries[0][0] < now:
+            _, _, ticket, created = heapq.heappop(self.expiries)
+            if ticket.status != "waiting" or ticket.created != created:
+                continue  # matched or cancelled since, or requeued with a later expiry
+            ticket.status = "expired"
+            self.totals["expired"] += 1
+            key = ticket.bucket
+            self.waiting[key] -= 1
+            queue = self.queues[key]
+            while queue and queue[0].status != "waiting":
+                queue.popleft()
+            self._forget_if_idle(key)
+
+        # Forget resolved tickets once their players have had time to read the outcome
+        while self.by_age and now - self.by_age[0].created > 2 * self.queue_timeout:
+            if self.by_age[0].status in ("waiting", "matched"):
+                break
+            del self.tickets[self.by_age.popleft().id]
+
+    def room_ids(self):
+        """Rooms dealt to matched pairs whose tickets are still kept."""
+        return {ticket.room_id for ticket in self.tickets.values() if ticket.room_id is not None}
+
+    def stats(self):
+        return {
+            "queue_depth": {key: count for key, count in self.waiting.items() if count},
+            "total_waiting": sum(self.waiting.values()),
+            "pending_handshakes": sum(1 for d, t in self.pending if t.status == "matched" and t.deadline == d),
+            "wait_time_seconds": self.wait_times.to_dict(),
+            "totals": dict(self.totals),
+        }
@@ -0,0 +1,63 @@
+# memory_report.py
+
+import gc
+import os
+import sys
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+# Parts of a room reported by /debug/memory, and the room keys each is made of
+ROOM_PARTS = {
+    "graph": ("graph",),
+    "tracker": ("score_tracker",),
+    "history": ("game_history", "redo_stack", "replay"),
+    "updates": ("sync", "view", "analysis", "final_scores"),
+    "settings": ("settings", "last_settings"),
+}
+
+# Shared by every room with the same rules, so not charged to any of them
+SHARED_KEYS = ("scoring",)
+
+_SKIPPED = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+
+def deep_size(obj, seen):
+    """
+    Estimated bytes held by `obj` and everything it references that isn't
+    in `seen` (ids of objects already counted). Classes, modules and
+    functions are left out.
+    """
+    size = 0
+    stack = [obj]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return size
+
+
+def room_memory(game):
+    """
+    Estimated bytes per part of one room. Objects reachable from more than
+    one part (last_settings shares its boards with settings) are counted in
+    the first part that reaches them.
+    """
+    seen = {id(game.get(key)) for key in SHARED_KEYS}
+    parts = {}
+    for part, keys in ROOM_PARTS.items():
+        parts[part] = sum(deep_size(game[key], seen) for key in keys if key in game)
+    listed = {key for keys in ROOM_PARTS.values() for key in keys} | set(SHARED_KEYS)
+    parts["other"] = sum(deep_size(value, seen) for key, value in game.items() if key not in listed)
+    parts["total"] = sum(parts.values()) + sys.getsizeof(game)
+    return parts
+
+
+def rss_bytes():
+    """Resident set size of this process, or None where /proc isn't available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
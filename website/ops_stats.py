@@ -0,0 +1,206 @@
+# ops_stats.py
+#
+# In-process counters for the /ops dashboard. Recording an event is O(1):
+# it lands in the ring slot for the current second, and in its room's and
+# board's running totals. Reading a window sums at most one slot per
+# second of it, once per second per dashboard.
+
+import hashlib
+import heapq
+import os
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+
+from scoring_pool import JOB_TIME_BOUNDS
+
+
+# Upper bounds (seconds) of the move latency buckets; the same as scoring jobs
+MOVE_TIME_BOUNDS = JOB_TIME_BOUNDS
+
+
+class SecondRing:
+    """
+    Per-second totals for the last `size` seconds: a count, a sum and a
+    maximum per second, and a histogram when `bounds` are given. A slot is
+    cleared when its second comes round again, so old seconds cost nothing.
+    """
+
+    def __init__(self, size=60, bounds=None):
+        self.size = size
+        self.bounds = bounds
+        self.seconds = [None] * size
+        self.counts = [0] * size
+        self.sums = [0.0] * size
+        self.maxima = [0.0] * size
+        self.buckets = [[0] * len(bounds) for _ in range(size)] if bounds else None
+
+    def add(self, now, value=0.0):
+        second = int(now)
+        i = second % self.size
+        if self.seconds[i] != second:
+            self.seconds[i] = second
+            self.counts[i] = 0
+            self.sums[i] = 0.0
+            self.maxima[i] = 0.0
+            if self.buckets is not None:
+                self.buckets[i] = [0] * len(self.bounds)
+        self.counts[i] += 1
+        self.sums[i] += value
+        if value > self.maxima[i]:
+            self.maxima[i] = value
+        if self.buckets is not None:
+            self.buckets[i][bisect_left(self.bounds, value)] += 1
+
+    def window(self, now, seconds):
+        """Totals over the `seconds` whole seconds before the current one."""
+        current = int(now)
+        count, total, maximum = 0, 0.0, 0.0
+        buckets = [0] * len(self.bounds) if self.bounds else None
+        for second in range(current - min(seconds, self.size - 1), current):
+            i = second % self.size
+            if self.seconds[i] != second:
+                continue
+            count += self.counts[i]
+            total += self.sums[i]
+            maximum = max(maximum, self.maxima[i])
+            if buckets is not None:
+                buckets = [a + b for a, b in zip(buckets, self.buckets[i])]
+        return {"count": count, "sum": total, "max": maximum, "buckets": buckets}
+
+    def quantile(self, window, q):
+        """Upper bound of the bucket holding quantile `q` of a window (at most its max), or None if empty."""
+        if not window["count"]:
+            return None
+        rank = q * window["count"]
+        seen = 0
+        for bound, n in zip(self.bounds, window["buckets"]):
+            seen += n
+            if seen >= rank:
+                return min(bound, window["max"])  # the top bucket is open-ended
+        return window["max"]
+
+
+class MoveTimes:
+    """Running move times for one room or board."""
+
+    __slots__ = ("moves", "total", "max", "slow", "nodes")
+
+    def __init__(self, nodes):
+        self.moves = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+        self.nodes = nodes
+
+    def add(self, seconds, slow):
+        self.moves += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        if slow:
+            self.slow += 1
+
+    def to_dict(self):
+        return {
+            "moves": self.moves,
+            "mean_ms": round(self.total / self.moves * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "slow": self.slow,
+            "nodes": self.nodes,
+        }
+
+
+class OpsStats:
+    """
+    Moves, joins and emits per second, move latency, and the slowest rooms
+    and boards. Rooms and boards are kept least-recently-moved first and
+    capped at `max_tracked` each, so an old one is dropped per new one.
+    Rooms are listed by room_label(), never by id: anyone with an id can
+    join the room.
+    """
+
+    def __init__(self, size=60, slow_move=0.25, max_tracked=1000, clock=time.monotonic):
+        self.size = size
+        self.slow_move = slow_move
+        self.max_tracked = max_tracked
+        self.clock = clock
+        self.started = clock()
+        self.moves = SecondRing(size, MOVE_TIME_BOUNDS)
+        self.slow_moves = SecondRing(size)
+        self.joins = SecondRing(size)
+        self.emits = SecondRing(size)
+        self.rooms = OrderedDict()
+        self.boards = OrderedDict()
+        self.totals = {"moves": 0, "slow_moves": 0, "joins": 0, "emits": 0, "emit_bytes": 0}
+        self.salt = os.urandom(16)  # per process, so short room ids can't be found by hashing them all
+
+    def room_label(self, room_id):
+        return hashlib.blake2b(room_id.encode("utf-8"), key=self.salt, digest_size=5).hexdigest()
+
+    def _times(self, table, key, nodes):
+        times = table.get(key)
+        if times is None:
+            times = table[key] = MoveTimes(nodes)
+            if len(table) > self.max_tracked:
+                table.popitem(last=False)
+        else:
+            table.move_to_end(key)
+        return times
+
+    def record_move(self, room_id, board_id, nodes, seconds):
+        now = self.clock()
+        slow = seconds >= self.slow_move
+        self.moves.add(now, seconds)
+        self.totals["moves"] += 1
+        if slow:
+            self.slow_moves.add(now)
+            self.totals["slow_moves"] += 1
+        self._times(self.rooms, room_id, nodes).add(seconds, slow)
+        self._times(self.boards, board_id, nodes).add(seconds, slow)
+
+    def record_join(self):
+        self.joins.add(self.clock())
+        self.totals["joins"] += 1
+
+    def record_emit(self, event, data, to=None):
+        """Count an emit, and its size when its text is already encoded (as state broadcasts are)."""
+        size = len(data.text) if hasattr(data, "text") else 0
+        self.emits.add(self.clock(), size)
+        self.totals["emits"] += 1
+        self.totals["emit_bytes"] += size
+
+    def _slowest(self, table, top, label=str):
+        slowest = heapq.nlargest(top, list(table.items()), key=lambda item: item[1].total / item[1].moves)
+        return [{"id": label(key), **times.to_dict()} for key, times in slowest]
+
+    def snapshot(self, top=10, window=10):
+        """Per-second rates over the last `window` seconds and the last second, totals and the top-N slowest."""
+        now = self.clock()
+        window = max(1, min(window, self.size - 1))
+        moves, last_moves = self.moves.window(now, window), self.moves.window(now, 1)
+        joins, emits = self.joins.window(now, window), self.emits.window(now, window)
+
+        def ms(seconds):
+            return None if seconds is None else round(seconds * 1000, 2)
+
+        return {
+            "uptime": round(now - self.started, 1),
+            "window": window,
+            "moves_per_sec": round(moves["count"] / window, 2),
+            "moves_last_sec": last_moves["count"],
+            "move_ms": {
+                "mean": ms(moves["sum"] / moves["count"]) if moves["count"] else None,
+                "p50": ms(self.moves.quantile(moves, 0.5)),
+                "p95": ms(self.moves.quantile(moves, 0.95)),
+                "max": ms(moves["max"]),
+            },
+            "slow_moves": self.slow_moves.window(now, window)["count"],
+            "slow_move_ms": ms(self.slow_move),
+            "joins_per_sec": round(joins["count"] / window, 2),
+            "emits_per_sec": round(emits["count"] / window, 2),
+            "emit_bytes_per_sec": round(emits["sum"] / window),
+            "totals": dict(self.totals),
+            "slowest_rooms": self._slowest(self.rooms, top, self.room_label),
+            "slowest_boards": self._slowest(self.boards, top),
+        }
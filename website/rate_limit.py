@@ -0,0 +1,65 @@
+# rate_limit.py
+
+import math
+import time
+from collections import OrderedDict
+
+
+class TokenBucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens, updated):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by client or room: `rate` tokens per second, up to
+    `burst`. Buckets refill lazily when checked, so a decision is a dict
+    lookup and some arithmetic. At most `max_keys` buckets are kept; the
+    least recently used is dropped first (it comes back full).
+    """
+
+    def __init__(self, rate, burst, max_keys=10000, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.clock = clock
+        self.buckets = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+
+    def allow(self, key, cost=1):
+        """Take `cost` tokens from the key's bucket. Returns 0 if allowed, else seconds until it would be."""
+        now = self.clock()
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = TokenBucket(self.burst, now)
+            if len(self.buckets) > self.max_keys:
+                self.buckets.popitem(last=False)
+        else:
+            self.buckets.move_to_end(key)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+
+        if bucket.tokens >= cost:
+            bucket.tokens -= cost
+            self.allowed += 1
+            return 0
+        self.limited += 1
+        return (cost - bucket.tokens) / self.rate
+
+    def stats(self):
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "keys": len(self.buckets),
+            "allowed": self.allowed,
+            "limited": self.limited,
+        }
+
+
+def retry_after_header(wait):
+    """Retry-After is whole seconds; never tell a client to retry immediately."""
+    return str(max(1, math.ceil(wait)))
@@ -0,0 +1,282 @@
+# ratings.py
+
+import hashlib
+import random
+import secrets
+import sqlite3
+import time
+import uuid
+
+
+DEFAULT_RATING = 1500.0
+K_FACTOR = 32
+
+
+def expected_score(rating, opponent):
+    return 1.0 / (1.0 + 10 ** ((opponent - rating) / 400.0))
+
+
+def elo_update(rating_a, rating_b, score_a, k=K_FACTOR):
+    """New (rating_a, rating_b) after a game; score_a is 1 for a win, 0.5 for a draw, 0 for a loss."""
+    delta = k * (score_a - expected_score(rating_a, rating_b))
+    return rating_a + delta, rating_b - delta
+
+
+class _SkipNode:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level):
+        self.key = key
+        self.next = [None] * level
+        self.width = [0] * level  # positions skipped by next[i], so ranks can be summed
+
+
+class SkipList:
+    """
+    Sorted keys with O(log n) insert, remove, rank-of-key and key-at-rank.
+    Every forward link records how many positions it spans (the same
+    scheme as Redis sorted sets). Ranks are 1-based.
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self, seed=None):
+        self.head = _SkipNode(None, self.MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+        self.rng = random.Random(seed)
+
+    def __len__(self):
+        return self.size
+
+    def _random_level(self):
+        level = 1
+        while level < self.MAX_LEVEL and self.rng.random() < self.P:
+            level += 1
+        return level
+
+    def insert(self, key):
+        update = [self.head] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        x = self.head
+        for i in reversed(range(self.level)):
+            rank[i] = rank[i + 1] if i + 1 < self.level else 0
+            while x.next[i] is not None and x.next[i].key < key:
+                rank[i] += x.width[i]
+                x = x.next[i]
+            update[i] = x
+
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                rank[i] = 0
+                update[i] = self.head
+                self.head.width[i] = self.size
+            self.level = level
+
+        node = _SkipNode(key, level)
+        for i in range(level):
+            node.next[i] = update[i].next[i]
+            update[i].next[i] = node
+            node.width[i] = update[i].width[i] - (rank[0] - rank[i])
+            update[i].width[i] = rank[0] - rank[i] + 1
+        for i in range(level, self.level):
+            update[i].width[i] += 1
+        self.size += 1
+
+    def remove(self, key):
+        """Remove `key`. Returns False if it wasn't there."""
+        update = [self.head] * self.MAX_LEVEL
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.next[i] is not None and x.next[i].key < key:
+                x = x.next[i]
+            update[i] = x
+
+        x = x.next[0]
+        if x is None or x.key != key:
+            return False
+        for i in range(self.level):
+            if update[i].next[i] is x:
+                update[i].width[i] += x.width[i] - 1
+                update[i].next[i] = x.next[i]
+            else:
+                update[i].width[i] -= 1
+        while self.level > 1 and self.head.next[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+        return True
+
+    def rank(self, key):
+        """1-based position of `key`, or None if it isn't in the list."""
+        traversed = 0
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.next[i] is not None and x.next[i].key <= key:
+                traversed += x.width[i]
+                x = x.next[i]
+            if x is not self.head and x.key == key:
+                return traversed
+        return None
+
+    def _node_at(self, rank):
+        traversed = 0
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.next[i] is not None and traversed + x.width[i] <= rank:
+                traversed += x.width[i]
+                x = x.next[i]
+            if traversed == rank:
+                return x
+        return None
+
+    def slice(self, start, count):
+        """Up to `count` keys starting at 1-based rank `start`."""
+        x = self._node_at(start) if 1 <= start <= self.size else None
+        keys = []
+        while x is not None and len(keys) < count:
+            keys.append(x.key)
+            x = x.next[0]
+        return keys
+
+
+def _token_hash(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class RatingStore:
+    """
+    Player ids and Elo ratings in a SQLite database, with an in-memory
+    skip list ordered by rating for leaderboard and rank queries. The index
+    is rebuilt from the database on first use and then kept in step with
+    every rating change.
+
+    Player ids are public (the leaderboard lists them); taking a seat as a
+    player needs the secret seat token handed out once by create_player(),
+    of which only a hash is stored.
+    """
+
+    def __init__(self, path=":memory:", k=K_FACTOR):
+        self.k = k
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS players (
+                id TEXT PRIMARY KEY,
+                name TEXT,
+                rating REAL NOT NULL,
+                games INTEGER NOT NULL DEFAULT 0,
+                wins INTEGER NOT NULL DEFAULT 0,
+                losses INTEGER NOT NULL DEFAULT 0,
+                draws INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                seat_token TEXT
+            );
+            CREATE TABLE IF NOT EXISTS rated_games (
+                id TEXT PRIMARY KEY,
+                player1 TEXT NOT NULL,
+                player2 TEXT NOT NULL,
+                score1 INTEGER NOT NULL,
+                score2 INTEGER NOT NULL,
+                delta REAL NOT NULL,
+                finished_at REAL NOT NULL
+            );
+        """)
+        # Databases made before seat tokens get the column; their players can't be seated
+        if "seat_token" not in [row[1] for row in self.db.execute("PRAGMA table_info(players)")]:
+            with self.db:
+                self.db.execute("ALTER TABLE players ADD COLUMN seat_token TEXT")
+        self.db.execute("CREATE UNIQUE INDEX IF NOT EXISTS players_seat_token ON players (seat_token)")
+        self._index = None
+
+    @staticmethod
+    def _key(player_id, rating):
+        return (-rating, player_id)  # best rating first, ties broken by id
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = SkipList()
+            for player_id, rating in self.db.execute("SELECT id, rating FROM players"):
+                self._index.insert(self._key(player_id, rating))
+        return self._index
+
+    def create_player(self, name=None):
+        """A new player, with the only copy of its `seat_token`."""
+        player_id = uuid.uuid4().hex[:16]
+        seat_token = secrets.token_urlsafe(24)
+        index = self.index  # load existing players before this one is written
+        with self.db:
+            self.db.execute(
+                "INSERT INTO players (id, name, rating, created_at, seat_token) VALUES (?, ?, ?, ?, ?)",
+                (player_id, name, DEFAULT_RATING, time.time(), _token_hash(seat_token))
+            )
+        index.insert(self._key(player_id, DEFAULT_RATING))
+        return {**self.get(player_id), "seat_token": seat_token}
+
+    def player_for_token(self, seat_token):
+        """The id of the player `seat_token` was issued to, or None."""
+        if not isinstance(seat_token, str) or not seat_token:
+            return None
+        row = self.db.execute("SELECT id FROM players WHERE seat_token = ?", (_token_hash(seat_token),)).fetchone()
+        return row[0] if row else None
+
+    def get(self, player_id):
+        row = self.db.execute(
+            "SELECT id, name, rating, games, wins, losses, draws FROM players WHERE id = ?", (player_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("player_id", "name", "rating", "games", "wins", "losses", "draws")
+        player = dict(zip(keys, row))
+        player["rating"] = round(player["rating"], 1)
+        player["rank"] = self.index.rank(self._key(player_id, row[2]))
+        return player
+
+    def record_result(self, game_id, player1, player2, final_scores):
+        """
+        Rate a finished game from `finalize_scores()["final_scores"]`.
+        Each game id is rated once; returns the rating change for
+        player1, or None if the game was already rated or can't be.
+        """
+        if player1 == player2:
+            return None
+        index = self.index
+        rows = dict(self.db.execute("SELECT id, rating FROM players WHERE id IN (?, ?)", (player1, player2)))
+        if len(rows) != 2:
+            return None
+
+        score1, score2 = final_scores[1], final_scores[2]
+        result = 1.0 if score1 > score2 else 0.0 if score1 < score2 else 0.5
+        new1, new2 = elo_update(rows[player1], rows[player2], result, self.k)
+        column1 = {1.0: "wins", 0.0: "losses", 0.5: "draws"}[result]
+        column2 = {1.0: "losses", 0.0: "wins", 0.5: "draws"}[result]
+
+        try:
+            with self.db:
+                self.db.execute(
+                    "INSERT INTO rated_games VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (game_id, player1, player2, score1, score2, new1 - rows[player1], time.time())
+                )
+                for player_id, rating, column in ((player1, new1, column1), (player2, new2, column2)):
+                    self.db.execute(
+                        f"UPDATE players SET rating = ?, games = games + 1, {column} = {column} + 1 WHERE id = ?",
+                        (rating, player_id)
+                    )
+        except sqlite3.IntegrityError:
+            return None  # already rated
+
+        for player_id, old, new in ((player1, rows[player1], new1), (player2, rows[player2], new2)):
+            index.remove(self._key(player_id, old))
+            index.insert(self._key(player_id, new))
+        return round(new1 - rows[player1], 1)
+
+    def leaderboard(self, limit=10, offset=0):
+        keys = self.index.slice(offset + 1, limit)
+        names = dict(self.db.execute(
+            f"SELECT id, name FROM players WHERE id IN ({','.join('?' * len(keys))})", [k[1] for k in keys]
+        )) if keys else {}
+        return [
+            {"rank": offset + i + 1, "player_id": player_id, "name": names.get(player_id), "rating": round(-neg, 1)}
+            for i, (neg, player_id) in enumerate(keys)
+        ]
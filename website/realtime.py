@@ -0,0 +1,143 @@
+# realtime.py
+
+import asyncio
+import contextlib
+import threading
+import time
+from contextlib import contextmanager
+
+
+class FlaskSocketIOTransport:
+    """
+    How game code reaches connected clients: `emit`, `enter_room`,
+    `start_background_task` and `sleep`, plus `waiting()` around any other
+    wait that blocks the calling thread, and `locked(fn, *args)` for code
+    outside a request or task (a streamed response body) that reads game
+    state. This one is the default, for Flask-SocketIO on eventlet;
+    asgi.py swaps in AsyncServerTransport.
+    """
+
+    def __init__(self, socketio):
+        self.socketio = socketio
+
+    def emit(self, event, data, to=None):
+        self.socketio.emit(event, data, to=to)
+
+    def enter_room(self, sid, room):
+        self.socketio.server.enter_room(sid, room, namespace="/")
+
+    def start_background_task(self, target, *args):
+        return self.socketio.start_background_task(target, *args)
+
+    def sleep(self, seconds):
+        self.socketio.sleep(seconds)
+
+    def waiting(self):
+        # Under eventlet a blocked greenlet already yields to the others
+        return contextlib.nullcontext()
+
+    def locked(self, fn, *args):
+        # Greenlets only switch where they wait, so nothing runs beside fn
+        return fn(*args)
+
+
+class Engine:
+    """
+    One lock held by whatever game code is running, so rooms, decks and
+    trackers see one caller at a time as they do on a single eventlet hub.
+    Code that waits on something slow (a scoring worker, a timer) releases
+    the lock for the wait, the way a greenlet yields.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+
+    def run(self, fn, *args):
+        with self.lock:
+            return fn(*args)
+
+    def wrap_wsgi(self, wsgi_app):
+        def locked_app(environ, start_response):
+            with self.lock:
+                return wsgi_app(environ, start_response)
+        return locked_app
+
+    @contextmanager
+    def released(self):
+        self.lock.release()
+        try:
+            yield
+        finally:
+            self.lock.acquire()
+
+
+class AsyncServerTransport:
+    """
+    The transport for python-socketio's AsyncServer. Game code runs in
+    threads under the Engine lock, so emits and room joins are handed to the
+    event loop and sent in order by one task; they never wait on a client.
+    Background tasks are threads that hold the lock except while sleeping.
+    """
+
+    def __init__(self, server, engine):
+        self.server = server
+        self.engine = engine
+        self.loop = None
+        self.outbox = None
+
+    async def run(self):
+        """Send queued emits and room joins; started on the server's loop."""
+        self.loop = asyncio.get_running_loop()
+        self.outbox = asyncio.Queue()
+        while True:
+            action, args = await self.outbox.get()
+            try:
+                if action == "emit":
+                    event, data, to = args
+                    await self.server.emit(event, data, to=to)
+                else:
+                    await self.server.enter_room(*args)
+            except Exception as e:
+                print("[AsyncServerTransport] send failed:", e)
+
+    def _queue(self, action, *args):
+        self.loop.call_soon_threadsafe(self.outbox.put_nowait, (action, args))
+
+    def emit(self, event, data, to=None):
+        self._queue("emit", event, data, to)
+
+    def enter_room(self, sid, room):
+        self._queue("enter_room", sid, room)
+
+    def start_background_task(self, target, *args):
+        thread = threading.Thread(target=self.engine.run, args=(target, *args), daemon=True)
+        thread.start()
+        return thread
+
+    def sleep(self, seconds):
+        with self.engine.released():
+            time.sleep(seconds)
+
+    def waiting(self):
+        return self.engine.released()
+
+    def locked(self, fn, *args):
+        return self.engine.run(fn, *args)
+
+
+class ObservedTransport:
+    """
+    Any transport, with `observe(event, data, to)` called for each emit
+    before it's sent; app.py counts emits for /ops this way.
+    """
+
+    def __init__(self, transport, observe):
+        self.transport = transport
+        self.observe = observe
+
+    def emit(self, event, data, to=None):
+        self.observe(event, data, to)
+        self.transport.emit(event, data, to=to)
+
+    def __getattr__(self, name):
+        return getattr(self.transport, name)
@@ -0,0 +1,239 @@
+# replay.py
+
+import json
+import time
+import uuid
+from collections import OrderedDict
+from copy import deepcopy
+
+from graph_logic import Graph
+from score_tracker import ScoreTracker
+from deck_manager import DeckManager, WILDCARD
+from board_import import board_id
+
+
+# A full engine snapshot is kept every this many moves for random access
+CHECKPOINT_INTERVAL = 16
+
+
+def new_replay(graph, deck_manager, starting_player, scoring_rules=None):
+    """
+    Start a replay record for a game about to be played on `graph`.
+    The record is everything needed to re-run the game: board, deck seed
+    and the ordered moves appended while it is played.
+    """
+    board = graph.to_compact()
+    del board["values"]
+    return {
+        "id": uuid.uuid4().hex[:12],
+        "board_id": board_id(board),
+        "board": board,
+        "scoring_rules": scoring_rules,
+        "deck": {
+            "type": deck_manager.deck_type,
+            "copies_per_phase": deck_manager.copies_per_phase,
+            "wildcards": deck_manager.wildcards,
+            "seed": deck_manager.seed,
+        },
+        "starting_player": starting_player,
+        "started_at": round(time.time(), 3),
+        "moves": [],
+    }
+
+
+def record_place(record, player, node_name, value, debug=False, wildcard=False):
+    move = [player, node_name, value]
+    if debug:
+        move.append("debug")  # placed without playing a card from the hand
+    if wildcard:
+        move.append("wild")  # a wildcard played as `value`
+    record["moves"].append(move)
+
+
+def record_fill(record, player, node_name, value):
+    """A /debug/fill_board placement: no card, no undo snapshot, no turn change."""
+    record["moves"].append([player, node_name, value, "fill"])
+
+
+def record_undo(record):
+    record["moves"].append(["undo"])
+
+
+def record_redo(record):
+    record["moves"].append(["redo"])
+
+
+class ReplayEngine:
+    """
+    Re-executes a replay record through the scoring rules, mirroring how
+    app.py applies moves, undo and redo. `seek(n)` jumps to the state after
+    the first n moves, starting from the nearest checkpoint.
+    """
+
+    def __init__(self, record, checkpoint_interval=CHECKPOINT_INTERVAL):
+        from strategies.registry import ScoringEvaluator, build_rules  # not needed just to record games
+        self.record = record
+        self.moves = record["moves"]
+        self.checkpoint_interval = checkpoint_interval
+        self.graph = Graph.from_compact(record["board"])
+        self.nodes = list(self.graph.nodes.values())
+        self.evaluator = ScoringEvaluator(build_rules(record.get("scoring_rules")))
+
+        deck = record["deck"]
+        self.deck_manager = DeckManager(deck["type"], deck["copies_per_phase"], seed=deck["seed"],
+                                        wildcards=deck.get("wildcards", 0))
+        self.tracker = ScoreTracker()
+        self.current_player = record["starting_player"]
+        self.history = []
+        self.redo_stack = []
+        self.position = 0
+        self.last_events = []
+        self.checkpoints = {0: self._checkpoint()}
+
+    def _board_snapshot(self):
+        # Never mutated once taken, so checkpoints can share them
+        return tuple(n.value for n in self.nodes), self.tracker.copy(), self.current_player
+
+    def _restore_board(self, snapshot):
+        values, tracker, player = snapshot
+        for node, value in zip(self.nodes, values):
+            node.value = value
+        self.tracker = tracker.copy()
+        self.current_player = player
+
+    def _checkpoint(self):
+        return {
+            "board": self._board_snapshot(),
+            "deck_manager": deepcopy(self.deck_manager),
+            "history": list(self.history),
+            "redo_stack": list(self.redo_stack),
+        }
+
+    def _restore_checkpoint(self, position):
+        checkpoint = self.checkpoints[position]
+        self._restore_board(checkpoint["board"])
+        self.deck_manager = deepcopy(checkpoint["deck_manager"])
+        self.history = list(checkpoint["history"])
+        self.redo_stack = list(checkpoint["redo_stack"])
+        self.position = position
+        self.last_events = []
+
+    def step(self):
+        """Apply the next move. Returns its scoring events."""
+        move = self.moves[self.position]
+        self.last_events = []
+
+        if move[0] == "undo":
+            self.redo_stack.append(self._board_snapshot())
+            self._restore_board(self.history.pop())
+        elif move[0] == "redo":
+            self.history.append(self._board_snapshot())
+            self._restore_board(self.redo_stack.pop())
+        elif "fill" in move[3:]:
+            player, node_name, value = move[:3]
+            node = self.graph.nodes[node_name]
+            node.add_value(value)
+            self.last_events = self.tracker.score_placement(player, node, self.graph, self.evaluator)
+        else:
+            player, node_name, value = move[:3]
+            self.history.append(self._board_snapshot())
+            self.redo_stack.clear()
+            if "debug" not in move[3:]:
+                self.deck_manager.play(player, WILDCARD if "wild" in move[3:] else value)
+            node = self.graph.nodes[node_name]
+            node.add_value(value)
+            self.last_events = self.tracker.score_placement(player, node, self.graph, self.evaluator)
+            self.current_player = 3 - self.current_player
+
+        self.position += 1
+        if self.position % self.checkpoint_interval == 0 and self.position not in self.checkpoints:
+            self.checkpoints[self.position] = self._checkpoint()
+        return self.last_events
+
+    def seek(self, position):
+        position = max(0, min(position, len(self.moves)))
+        nearest = max(p for p in self.checkpoints if p <= position)
+        if position < self.position or nearest > self.position:
+            self._restore_checkpoint(nearest)
+        while self.position < position:
+            self.step()
+        return self
+
+    def run(self):
+        """Replay the whole game and return the final scores."""
+        self.seek(len(self.moves))
+        return self.tracker.finalize_scores()
+
+    def state(self):
+        deck_manager = self.deck_manager
+        return {
+            "replay_id": self.record["id"],
+            "move": self.position,
+            "total_moves": len(self.moves),
+            "last_move": self.moves[self.position - 1] if self.position else None,
+            "graph": self.graph.to_dict(),
+            "scores": self.tracker.get_scores(),
+            "claimed_cards": self.tracker.get_all_claimed_cards(),
+            "connections": {
+                "phase_pairs": self.tracker.phase_pairs,
+                "full_moon_pairs": self.tracker.full_moon_pairs,
+                "lunar_cycles": self.tracker.lunar_cycle_connections
+            },
+            "current_player": self.current_player,
+            "events": self.last_events,
+            "hands": {"1": deck_manager.get_hand(1), "2": deck_manager.get_hand(2)},
+            "deck_remaining": deck_manager.remaining() if deck_manager.deck is not None else "∞",
+        }
+
+
+def export_replays(records, fp):
+    """Write replay records to an open file as JSON-lines."""
+    for record in records:
+        fp.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def load_replays(fp):
+    for line in fp:
+        if line.strip():
+            yield json.loads(line)
+
+
+class ReplayStore:
+    """
+    Finished replays, dropping the oldest when full. Every stored record
+    is also appended to the JSON-lines file at `path`, if one is set.
+    Engines are cached so stepping through a replay stays incremental.
+    """
+
+    def __init__(self, path=None, max_replays=1000, max_engines=32):
+        self.path = path
+        self.max_replays = max_replays
+        self.max_engines = max_engines
+        self.replays = OrderedDict()
+        self.engines = OrderedDict()
+
+    def add(self, record):
+        record = dict(record, moves=list(record["moves"]))
+        self.replays[record["id"]] = record
+        self.replays.move_to_end(record["id"])
+        while len(self.replays) > self.max_replays:
+            self.replays.popitem(last=False)
+        self.engines.pop(record["id"], None)
+
+        if self.path:
+            with open(self.path, "a", encoding="utf-8") as f:
+                export_replays([record], f)
+
+    def get(self, replay_id):
+        return self.replays.get(replay_id)
+
+    def engine(self, replay_id):
+        if replay_id not in self.engines:
+            record = self.get(replay_id)
+            if record is None:
+                return None
+            self.engines[replay_id] = ReplayEngine(record)
+            while len(self.engines) > self.max_engines:
+                self.engines.popitem(last=False)
+        self.engines.move_to_end(replay_id)
+        return self.engines[replay_id]
@@ -0,0 +1,78 @@
+# room_sync.py
+
+import secrets
+import threading
+from collections import deque
+
+
+class RoomSync:
+    """
+    Versioned log of the state updates broadcast to one room.
+
+    Every broadcast bumps the room's version, and what changed at that
+    version (its events and flags, not the whole state) is kept in a
+    bounded backlog. A client that reconnects with the last version it saw
+    is sent one snapshot of the state plus the updates it missed, so it can
+    still play their events; only when those have been trimmed does it get
+    the snapshot alone. The snapshot is built once per version no matter
+    how many clients ask for it.
+
+    The version, qualified by the log's `epoch` (a room re-created under
+    the same id starts again from 0), also tags HTTP responses about the
+    room, and long-polling clients `wait` for it to move on.
+    """
+
+    def __init__(self, backlog_size=64, compact=None):
+        self.version = 0
+        self.compact = compact  # what the backlog keeps of an update
+        self.backlog = deque(maxlen=backlog_size)  # (version, update), oldest first
+        self._snapshot = None  # (version, payload)
+        self.epoch = secrets.token_hex(4)
+        self.changed = threading.Condition()
+
+    def record(self, payload, update=None):
+        """
+        Tag an outgoing payload with the next version and keep `update`,
+        the part of it that says what changed (the whole payload if not
+        given).
+        """
+        self.version += 1
+        payload["version"] = self.version
+        update = payload if update is None else update
+        update["version"] = self.version
+        self.backlog.append((self.version, update if self.compact is None else self.compact(update)))
+        with self.changed:
+            self.changed.notify_all()
+        return payload
+
+    def wait(self, version, timeout):
+        """Block until the room is past `version` or `timeout` seconds pass; True if it moved on."""
+        with self.changed:
+            return self.changed.wait_for(lambda: self.version > version, timeout)
+
+    def etag(self, tag=""):
+        """Strong entity tag for the room at its current version; `tag` tells apart views of it."""
+        return f"{self.epoch}-{self.version}{tag}"
+
+    def since(self, version):
+        """
+        Updates after `version`, oldest first, or None when some of them
+        are no longer in the backlog (or the version is from another run,
+        or isn't a version at all).
+        """
+        if not isinstance(version, int) or isinstance(version, bool) or version > self.version:
+            return None
+        if version == self.version:
+            return []
+        oldest = self.backlog[0][0] if self.backlog else self.version + 1
+        if version + 1 < oldest:
+            return None
+        return [payload for v, payload in self.backlog if v > version]
+
+    def snapshot(self, build):
+        """Full public state at the current version; `build()` runs once per version."""
+        if self._snapshot is None or self._snapshot[0] != self.version:
+            payload = build()
+            payload["version"] = self.version
+            self._snapshot = (self.version, payload)
+        return self._snapshot[1]
@@ -1,5 +1,7 @@
 # scoring.py
 
+from scoring_events import pair_events, cycle_events
+from chain_tracking import chain_stats, expand_chains
 
 
 class ScoreTracker:
@@ -9,101 +11,85 @@ class ScoreTracker:
         self.claimed_cards = {}
         self.phase_pairs = []
         self.full_moon_pairs = []
-        self.lunar_cycle_chains = []
+        self.lunar_cycles = []  # chain DAG structures, one per scoring placement
         self.lunar_cycle_connections = []
+        self.lunar_cycle_connection_set = set()  # membership for the list above
         self.scoring_history = []
 
+    def copy(self):
+        """
+        A copy to keep for undo. Scored events, pairs and chain structures
+        never change, so only the containers holding them are copied.
+        """
+        tracker = ScoreTracker()
+        tracker.scores = dict(self.scores)
+        tracker.claimed_cards = dict(self.claimed_cards)
+        tracker.phase_pairs = list(self.phase_pairs)
+        tracker.full_moon_pairs = list(self.full_moon_pairs)
+        tracker.lunar_cycles = list(self.lunar_cycles)
+        tracker.lunar_cycle_connections = list(self.lunar_cycle_connections)
+        tracker.lunar_cycle_connection_set = set(self.lunar_cycle_connection_set)
+        tracker.scoring_history = list(self.scoring_history)
+        return tracker
+
 
     def update_score_for_pair(self, player, pair_scoring_module, node):
         """
         Update score when a PhasePair or FullMoonPair is scored.
         Returns a list of individual scoring events.
         """
-        scored_pairs, claimed_cards = pair_scoring_module.score_pair(player, node)
-    
-        # Record claimed card ownership
-        for card in claimed_cards:
-            self.claimed_cards[card.name] = player
-    
-        # Build and apply each scoring event
-        scoring_events = []
-        for item in scored_pairs:
-            pair = item["pair"]
-            print(f"[DEBUG] Scoring event has pair: {pair}")
-
-            points = item["points"]
-    
-            self.scores[player] += points
-    
-            if pair_scoring_module.__class__.__name__ == "PhasePair":
-                self.phase_pairs.append(pair)
-                score_type = "phase_pair"
-            elif pair_scoring_module.__class__.__name__ == "FullMoonPair":
-                self.full_moon_pairs.append(pair)
-                score_type = "full_moon_pair"
-            else:
-                score_type = "pair"
-    
-            event = {
-                "player": player,
-                "type": score_type,
-                "structure": {"pair": pair, "points": points},
-                "claimed": [c.name for c in item["claimed"]],
-                "connections": [pair],
-                "points": points
-            }
-    
-            self.scoring_history.append(event)
-            scoring_events.append(event)
-    
+        scored_pairs, _ = pair_scoring_module.score_pair(player, node)
+        scoring_events = pair_events(player, pair_scoring_module.name, scored_pairs)
+        self.apply_events(scoring_events)
         return scoring_events
 
 
     def update_score_for_cycle(self, player, cycle_scoring_module, node, graph):
         scored_chains = cycle_scoring_module.score_cycle(player, node, graph)
-
-        scoring_events = []
-        for item in scored_chains:
-            points = item["points"]
-            claimed_nodes = item["claimed"]
-
-            self.scores[player] += points
-
-            for node in claimed_nodes:
-                self.claimed_cards[node.name] = player
-
-            # Update long-term storage
-            self.lunar_cycle_chains.append(item["chain"])
-            for pair in item["connections"]:
-                if pair not in self.lunar_cycle_connections:
-                    self.lunar_cycle_connections.append(pair)
-
-            event = {
-                "player": player,
-                "type": "lunar_cycle",
-                "structure": {
-                    "chain": item["chain"],
-                    "points": points
-                },
-                "claimed": [n.name for n in claimed_nodes],
-                "connections": item["connections"],
-                "points": points
-            }
-
-            self.scoring_history.append(event)
-            scoring_events.append(event)
-
+        scoring_events = cycle_events(player, scored_chains)
+        self.apply_events(scoring_events)
         return scoring_events
 
 
+    def score_placement(self, player, node, graph, evaluator):
+        """Score a placement against every rule of the evaluator in one pass."""
+        scoring_events = evaluator.evaluate(player, node, graph)
+        self.apply_events(scoring_events)
+        return scoring_events
 
 
+    def apply_events(self, scoring_events):
+        """Record scoring events: points, claimed cards and connections."""
+        for event in scoring_events:
+            player = event["player"]
+            self.scores[player] += event["points"]
 
+            for name in event["claimed"]:
+                self.claimed_cards[name] = player
 
+            if event["type"] == "phase_pair":
+                self.phase_pairs.append(event["structure"]["pair"])
+            elif event["type"] == "full_moon_pair":
+                self.full_moon_pairs.append(event["structure"]["pair"])
+            elif event["type"] == "lunar_cycle":
+                self.lunar_cycles.append(event["structure"])
+                for pair in event["connections"]:
+                    key = tuple(pair)
+                    if key not in self.lunar_cycle_connection_set:
+                        self.lunar_cycle_connection_set.add(key)
+                        self.lunar_cycle_connections.append(pair)
 
+            self.scoring_history.append(event)
 
 
+    @property
+    def lunar_cycle_chains(self):
+        """Every scored chain as a list of names, expanded from the stored DAGs; for tools and tests."""
+        return [chain for structure in self.lunar_cycles for chain in expand_chains(structure)]
 
+    def lunar_cycle_stats(self):
+        """(chains, total length, longest) per scoring placement, without expanding the chains."""
+        return [chain_stats(structure) for structure in self.lunar_cycles]
 
     def get_scores(self):
         """Return the current scores of both players."""
@@ -142,8 +128,9 @@ class ScoreTracker:
         self.claimed_cards = {}
         self.phase_pairs = []
         self.full_moon_pairs = []
-        self.lunar_cycle_chains = []
+        self.lunar_cycles = []
         self.lunar_cycle_connections = []
+        self.lunar_cycle_connection_set = set()
         self.scoring_history = []
 
 
@@ -0,0 +1,93 @@
+# scoring_events.py
+
+from collections.abc import Mapping
+
+
+class ScoringEvent(Mapping):
+    """
+    One scoring event, read like a dict (`event["points"]`). Events never
+    change once built, so the copies of a ScoreTracker kept for undo share
+    them instead of copying every event scored so far.
+    """
+
+    __slots__ = ("player", "type", "structure", "claimed", "connections", "points")
+
+    def __init__(self, player, type, structure, claimed, connections, points):
+        self.player = player
+        self.type = type
+        self.structure = structure
+        self.claimed = claimed
+        self.connections = connections
+        self.points = points
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return ScoringEvent, tuple(getattr(self, key) for key in self.__slots__)
+
+    def __repr__(self):
+        return f"ScoringEvent({self.to_dict()!r})"
+
+    def to_dict(self):
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+def pair_events(player, score_type, scored_pairs):
+    """
+    Turn the output of a pair scorer into scoring events.
+    Each scored pair becomes one event of the given type.
+    """
+    events = []
+    for item in scored_pairs:
+        pair = item["pair"]
+        points = item["points"]
+        events.append(ScoringEvent(
+            player=player,
+            type=score_type,
+            structure={"pair": pair, "points": points},
+            claimed=[c.name for c in item["claimed"]],
+            connections=[pair],
+            points=points
+        ))
+
+    return events
+
+
+def cycle_events(player, scored_chains):
+    """
+    Turn the output of LunarCycle.score_cycle into scoring events. The
+    structure is the chain DAG: `center`, branch trees for `decreasing` and
+    `increasing` (each {"node", "next"}), and the `chains` it stands for.
+    """
+    events = []
+    for item in scored_chains:
+        points = item["points"]
+        events.append(ScoringEvent(
+            player=player,
+            type="lunar_cycle",
+            structure={
+                **item["dag"],
+                "chains": item["chains"],
+                "points": points
+            },
+            claimed=item["claimed"],
+            connections=item["connections"],
+            points=points
+        ))
+
+    return events
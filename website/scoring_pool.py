@@ -0,0 +1,218 @@
+# scoring_pool.py
+
+import contextlib
+import json
+import multiprocessing
+import queue
+import time
+
+from graph_logic import Graph
+from matchmaking import Histogram
+
+
+# Seconds a new worker may take to import and report ready; not part of any job's timeout
+STARTUP_TIMEOUT = 30
+
+# Upper bounds (seconds) of the job latency histogram buckets
+JOB_TIME_BOUNDS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, float("inf"))
+
+
+class ScoringUnavailable(Exception):
+    """A job was refused (queue full, room busy) or didn't finish in time; nothing was applied."""
+
+
+class ScoringFailed(RuntimeError):
+    """A job raised in its worker; the message is the worker's traceback."""
+
+
+# --- Jobs: run in a worker process on a compact board, return plain data ---
+
+_evaluators = {}
+
+
+def _evaluator(rules):
+    """Evaluators are cached per rules config, so a worker builds each one once."""
+    key = json.dumps(rules, sort_keys=True)
+    if key not in _evaluators:
+        from strategies.registry import evaluator_for_board
+        _evaluators[key] = evaluator_for_board({"scoringRules": rules} if rules is not None else None)
+    return _evaluators[key]
+
+
+def score_job(compact, rules, player, node_name):
+    """Events for a placement already written into `compact["values"]`."""
+    graph = Graph.from_compact(compact)
+    return _evaluator(rules).evaluate(player, graph.nodes[node_name], graph)
+
+
+def wild_job(compact, rules, player, node_name, claimed_cards):
+    """(phase, events) for a wildcard placed on the empty `node_name`, resolved to its best phase."""
+    from analysis import best_phase
+    graph = Graph.from_compact(compact)
+    return best_phase(player, graph.nodes[node_name], graph, _evaluator(rules), claimed_cards)
+
+
+def fill_job(compact, rules, placements):
+    """Events for each (player, node_name, value) placed in order, as /debug/fill_board does."""
+    graph = Graph.from_compact(compact)
+    evaluator = _evaluator(rules)
+    results = []
+    for player, node_name, value in placements:
+        node = graph.nodes[node_name]
+        node.add_value(value)
+        results.append(evaluator.evaluate(player, node, graph))
+    return results
+
+
+def analyze_job(compact, rules, player, hand, claimed_cards, lookahead):
+    from analysis import analyze
+    return analyze(Graph.from_compact(compact), _evaluator(rules), player, hand, claimed_cards, lookahead=lookahead)
+
+
+JOBS = {"score": score_job, "wild": wild_job, "fill": fill_job, "analyze": analyze_job}
+
+
+def _worker_main(jobs, results):
+    import strategies.registry  # noqa: F401 - load the rules before reporting ready
+    results.send((True, "ready"))
+    while True:
+        try:
+            name, args = jobs.recv()
+        except EOFError:
+            return
+        try:
+            results.send((True, JOBS[name](*args)))
+        except Exception as e:
+            results.send((False, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    def __init__(self, context):
+        # One-way pipes: the hub side waits on a plain fd, which eventlet can do cooperatively
+        job_reader, self.jobs = context.Pipe(duplex=False)
+        self.results, result_writer = context.Pipe(duplex=False)
+        self.process = context.Process(target=_worker_main, args=(job_reader, result_writer), daemon=True)
+        self.process.start()
+        job_reader.close()
+        result_writer.close()
+        self.ready = False
+
+    def wait_ready(self):
+        if not self.ready:
+            if not self.results.poll(STARTUP_TIMEOUT):
+                raise EOFError("worker did not start")
+            self.results.recv()
+            self.ready = True
+
+    def stop(self):
+        self.process.kill()
+        self.jobs.close()
+        self.results.close()
+
+
+class ScoringPool:
+    """
+    A fixed set of worker processes for scoring and analysis, so a slow
+    chain search runs beside the eventlet hub instead of on it. Callers
+    wait on a pipe, which yields to other greenlets under monkey patching.
+
+    Each key (a room) may have one job in flight; more callers than
+    `max_queue` waiting for a worker are turned away; a job that runs past
+    `timeout` has its worker killed and replaced. Any of these raise
+    ScoringUnavailable; a job that raises in its worker raises
+    ScoringFailed. With `processes=0` jobs run inline.
+
+    Workers are spawned, so scripts that use the pool need the usual
+    `if __name__ == "__main__":` guard.
+    """
+
+    def __init__(self, processes=2, timeout=2.0, max_queue=64, start_method="spawn"):
+        self.processes = processes
+        self.timeout = timeout
+        self.max_queue = max_queue
+        # spawn, not fork: a forked child would inherit the parent's monkey patching
+        self.context = multiprocessing.get_context(start_method)
+        self.idle = queue.Queue()
+        self.workers = []
+        self.in_flight = set()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.counts = {"completed": 0, "failed": 0, "timeouts": 0, "rejected": 0}
+        self.job_time = Histogram(JOB_TIME_BOUNDS)
+        # Entered around every wait for a worker; the ASGI server releases its engine lock here
+        self.blocking = contextlib.nullcontext
+
+    def start(self):
+        while len(self.workers) < self.processes:
+            worker = _Worker(self.context)
+            self.workers.append(worker)
+            self.idle.put(worker)
+
+    def _replace(self, worker):
+        worker.stop()
+        self.workers.remove(worker)
+        self.start()
+
+    def _reject(self, reason):
+        self.counts["rejected"] += 1
+        raise ScoringUnavailable(reason)
+
+    def run(self, name, *args, key=None):
+        """Run job `name` with `args` and return its result."""
+        if key is not None and key in self.in_flight:
+            self._reject("Another computation for this room is still running")
+        if self.processes == 0:
+            return JOBS[name](*args)
+        if self.waiting >= self.max_queue:
+            self._reject("Scoring queue is full")
+        self.start()
+
+        self.in_flight.add(key)
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            try:
+                with self.blocking():
+                    worker = self.idle.get(timeout=self.timeout)
+            except queue.Empty:
+                self._reject("No scoring worker became free in time")
+            finally:
+                self.waiting -= 1
+
+            try:
+                with self.blocking():
+                    worker.wait_ready()
+                    started = time.perf_counter()
+                    worker.jobs.send((name, args))
+                    done = worker.results.poll(self.timeout)
+                if not done:
+                    self.counts["timeouts"] += 1
+                    self._replace(worker)
+                    raise ScoringUnavailable(f"Computation took longer than {self.timeout}s")
+                ok, result = worker.results.recv()
+            except (EOFError, OSError) as e:
+                self.counts["failed"] += 1
+                self._replace(worker)
+                raise ScoringUnavailable(f"Scoring worker failed: {e}")
+
+            self.idle.put(worker)
+            self.job_time.observe(time.perf_counter() - started)
+            if not ok:
+                self.counts["failed"] += 1
+                raise ScoringFailed(result)
+            self.counts["completed"] += 1
+            return result
+        finally:
+            self.in_flight.discard(key)
+
+    def stats(self):
+        return {
+            "processes": self.processes,
+            "timeout": self.timeout,
+            "busy": len(self.workers) - self.idle.qsize(),
+            "queued": self.waiting,
+            "max_queued": self.max_waiting,
+            "max_queue": self.max_queue,
+            **self.counts,
+            "job_time": self.job_time.to_dict(),
+        }
@@ -0,0 +1,119 @@
+# simulation.py
+
+import random
+
+from graph_logic import Graph
+from score_tracker import ScoreTracker
+from deck_manager import DeckManager
+from strategies.registry import evaluator_for_board
+
+
+POLICIES = ("random", "greedy")
+
+
+def build_graph(board):
+    """Accept either a board dict from the builder or the compact topology form."""
+    if "adjacency" in board:
+        return Graph.from_compact(board)
+    return Graph.from_dict(board)
+
+
+def deck_for_board(board, seed=None):
+    deck_settings = board.get("deckSettings") or {}
+    deck_type = deck_settings.get("deckType", "infinite")
+    copies_per_phase = deck_settings.get("copiesPerPhase") if deck_type == "finite" else None
+    return DeckManager(deck_type=deck_type, copies_per_phase=copies_per_phase, seed=seed)
+
+
+def immediate_points(player, node, value, graph, evaluator):
+    """Points a placement would score right now, without changing the board."""
+    node.value = value
+    try:
+        return sum(e["points"] for e in evaluator.evaluate(player, node, graph))
+    finally:
+        node.value = None
+
+
+def choose_move(player, hand, graph, evaluator, policy, rng):
+    cards = [c for c in hand if c is not None]
+    empty = [n for n in graph.nodes.values() if n.value is None]
+    if not cards or not empty:
+        return None
+
+    if policy == "random":
+        return rng.choice(cards), rng.choice(empty)
+
+    best, best_points = [], -1
+    for card in set(cards):
+        for node in empty:
+            points = immediate_points(player, node, card, graph, evaluator)
+            if points > best_points:
+                best, best_points = [(card, node)], points
+            elif points == best_points:
+                best.append((card, node))
+    return rng.choice(best)
+
+
+def simulate_game(board, seed=None, policy="greedy", starting_player=1):
+    """
+    Play one headless game on a board with the real deck and scorers.
+    Returns final scores plus a few statistics used for balance metrics.
+    The same seed always plays the same game.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy: {policy}")
+
+    rng = random.Random(seed)
+    graph = build_graph(board)
+    evaluator = evaluator_for_board(board)
+    tracker = ScoreTracker()
+    deck_manager = deck_for_board(board, seed=rng.getrandbits(32))
+
+    player = starting_player
+    moves = 0
+    passes = 0
+    while passes < 2:
+        move = choose_move(player, deck_manager.get_hand(player), graph, evaluator, policy, rng)
+        if move is None:
+            passes += 1
+        else:
+            passes = 0
+            card, node = move
+            deck_manager.play(player, card)
+            node.add_value(card)
+            tracker.score_placement(player, node, graph, evaluator)
+            moves += 1
+        player = 3 - player
+
+    final = tracker.finalize_scores()["final_scores"]
+    if final[1] == final[2]:
+        winner = 0
+    else:
+        winner = 1 if final[1] > final[2] else 2
+
+    return {
+        "seed": seed,
+        "starting_player": starting_player,
+        "final_scores": final,
+        "winner": winner,
+        "moves": moves,
+        "cycles": tracker.lunar_cycle_stats(),  # (chains, total length, longest) per scoring move
+    }
+
+
+def balance_score(board, games=20, seed=0, policy="greedy"):
+    """
+    1.0 when the first player wins exactly half of the decided games,
+    0.0 when one seat always wins. Seats alternate between games.
+    """
+    first_wins = decided = 0
+    for i in range(games):
+        starting_player = 1 + i % 2
+        result = simulate_game(board, seed=seed + i, policy=policy, starting_player=starting_player)
+        if result["winner"]:
+            decided += 1
+            first_wins += result["winner"] == starting_player
+
+    if not decided:
+        return 1.0
+    return 1.0 - abs(2 * first_wins / decided - 1)
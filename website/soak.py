@@ -0,0 +1,143 @@
+# soak.py
+#
+# Memory soak test: plays thousands of headless games through the Flask
+# test client, with a Socket.IO test client in every room, and checks
+# what stays behind once finished rooms have expired:
+#
+#     python soak.py --games 2000 --max-bytes-per-game 2048
+#
+# Traced Python memory (tracemalloc) and RSS are sampled every
+# `--sample-every` games. The run fails when the traced memory kept per
+# completed game over the second half of the run, after bounded caches
+# (replays, rate limits) have filled, is above the threshold.
+
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from flask_socketio import SocketIOTestClient
+
+os.environ.setdefault("RATE_LIMITS", "0")
+os.environ.setdefault("SCORING_WORKERS", "0")  # score inline, so all the memory is in this process
+os.environ.setdefault("RATINGS_DB", ":memory:")
+os.environ.pop("REPLAY_LOG", None)
+
+import app as moon_app
+from memory_report import rss_bytes
+
+
+def play_game(client, rng, undo_every=7):
+    """One game to the end with a player's socket joined, the odd undo, redo and poll. Returns moves played."""
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    socket = moon_app.socketio.test_client(moon_app.app)
+    socket.emit("join_room", {"room_id": room_id})
+    game = moon_app.games[room_id]
+    moves = 0
+    while True:
+        player = game["current_player"]
+        hand = [card for card in game["deck_manager"].get_hand(player) if card is not None]
+        empty = [name for name, node in game["graph"].nodes.items() if node.value is None]
+        if not hand or not empty:
+            break
+        result = client.post(f"/place/{room_id}", json={
+            "player": player, "node_name": rng.choice(empty), "value": rng.choice(hand)
+        }).get_json()
+        moves += 1
+        if result.get("game_over"):
+            break
+        if moves % undo_every == 0:
+            client.post(f"/undo/{room_id}")
+            if rng.random() < 0.5:
+                client.post(f"/redo/{room_id}")
+        if moves % 5 == 0:
+            client.get(f"/state/{room_id}", headers={"X-Player-ID": f"player{player}"})
+        socket.get_received()
+    socket.disconnect()
+    # The test client keeps every client it made (and its server environ); that's the harness, not the app
+    SocketIOTestClient.clients.pop(socket.eio_sid, None)
+    moon_app.socketio.server.environ.pop(socket.eio_sid, None)
+    return moves
+
+
+def traced_bytes():
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def slope(points):
+    """Least-squares bytes per game through (games, bytes) points."""
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    spread = sum((x - mean_x) ** 2 for x, _ in points)
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread if spread else 0.0
+
+
+def soak(games=2000, sample_every=100, warmup=100, max_replays=50, seed=0):
+    """Play `games` games after `warmup` and report the memory kept per game."""
+    rng = random.Random(seed)
+    client = moon_app.app.test_client()
+    moon_app.replay_store.max_replays = max_replays
+
+    def finish_rooms():
+        # Every game here is over and its socket gone; expire them as if the timeout had passed
+        moon_app.expire_rooms(now=time.monotonic() + moon_app.FINISHED_ROOM_TIMEOUT)
+
+    for _ in range(warmup):
+        play_game(client, rng)
+    finish_rooms()
+
+    tracemalloc.start()
+    samples = [{"games": 0, "traced_bytes": traced_bytes(), "rss_bytes": rss_bytes(), "rooms": len(moon_app.games)}]
+    started = time.perf_counter()
+    moves = 0
+    for played in range(1, games + 1):
+        moves += play_game(client, rng)
+        if played % sample_every == 0 or played == games:
+            finish_rooms()
+            samples.append({"games": played, "traced_bytes": traced_bytes(), "rss_bytes": rss_bytes(),
+                            "rooms": len(moon_app.games)})
+    elapsed = time.perf_counter() - started
+    tracemalloc.stop()
+
+    late = [(s["games"], s["traced_bytes"]) for s in samples if s["games"] >= games / 2]
+    rss = [s["rss_bytes"] for s in samples if s["rss_bytes"] is not None]
+    return {
+        "games": games,
+        "moves": moves,
+        "seconds": round(elapsed, 1),
+        "bytes_per_game": round(slope(late) if len(late) > 1 else 0.0, 1),
+        "traced_growth_bytes": samples[-1]["traced_bytes"] - samples[0]["traced_bytes"],
+        "rss_growth_bytes": rss[-1] - rss[0] if rss else None,
+        "rooms_left": len(moon_app.games),
+        "samples": samples,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play many games and fail if memory grows per game.")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--sample-every", type=int, default=100)
+    parser.add_argument("--warmup", type=int, default=100, help="games played before measuring")
+    parser.add_argument("--max-replays", type=int, default=50, help="replay store size, filled during warm-up")
+    parser.add_argument("--max-bytes-per-game", type=float, default=2048)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = soak(args.games, args.sample_every, args.warmup, args.max_replays, args.seed)
+    print(json.dumps(report))
+    ok = report["bytes_per_game"] <= args.max_bytes_per_game and report["rooms_left"] == 0
+    print(f"[soak] {report['games']} games, {report['moves']} moves in {report['seconds']}s: "
+          f"{report['bytes_per_game']} bytes kept per game (limit {args.max_bytes_per_game}), "
+          f"RSS {report['rss_growth_bytes']} bytes over the run, {report['rooms_left']} room(s) left"
+          f" — {'ok' if ok else 'FAILED'}", file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
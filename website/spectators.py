@@ -0,0 +1,85 @@
+# spectators.py
+
+import time
+
+from state_view import EncodedPayload
+
+
+# Flags that must survive when several updates are merged into one
+STICKY_FLAGS = ("new_game", "is_undo", "debug_fill")
+
+
+def spectator_room(room_id):
+    return f"{room_id}:spectators"
+
+
+class SpectatorBroadcaster:
+    """
+    Sends state updates to each game's spectators from a background task.
+
+    Players publish the same public payload they broadcast to their own
+    room, already encoded; publishing stores a reference, so the move path
+    only pays for the audience when updates arriving faster than `interval`
+    seconds are coalesced (latest state, all events in order, encoded as
+    they are merged). Each room's update is emitted once to its spectator
+    sub-room, where Socket.IO encodes the packet a single time for every
+    watcher.
+    """
+
+    def __init__(self, socketio, interval=0.5):
+        self.socketio = socketio
+        self.interval = interval
+        self.pending = {}
+        self.last_sent = {}
+        self.watchers = {}  # room_id -> number of connected spectators
+        self._task = None
+
+    def add_watcher(self, room_id):
+        self.watchers[room_id] = self.watchers.get(room_id, 0) + 1
+        if self._task is None:
+            self._task = self.socketio.start_background_task(self._run)
+
+    def remove_watcher(self, room_id):
+        count = self.watchers.get(room_id, 0) - 1
+        if count > 0:
+            self.watchers[room_id] = count
+        else:
+            self.watchers.pop(room_id, None)
+            self.pending.pop(room_id, None)
+            self.last_sent.pop(room_id, None)
+
+    def publish(self, room_id, payload):
+        if room_id not in self.watchers:
+            return
+
+        pending = self.pending.get(room_id)
+        if pending is None:
+            self.pending[room_id] = payload
+            return
+
+        fields = {"events": list(pending.get("events", [])) + list(payload.get("events", []))}
+        for flag in STICKY_FLAGS:
+            if pending.get(flag):
+                fields[flag] = True
+        merged = EncodedPayload(fields, base=payload)
+        merged.text  # encoded now: the payload's state is the trackers' own, which later moves change
+        self.pending[room_id] = merged
+
+    def flush(self, now=None):
+        """Emit every pending update whose room is outside its rate limit."""
+        now = time.monotonic() if now is None else now
+        for room_id in list(self.pending):
+            if now - self.last_sent.get(room_id, float("-inf")) < self.interval:
+                continue
+            payload = self.pending.pop(room_id)
+            self.last_sent[room_id] = now
+            self.socketio.emit("state_updated", payload, to=spectator_room(room_id))
+
+    def _run(self):
+        tick = min(self.interval, 0.1)
+        while True:
+            self.socketio.sleep(tick)
+            try:
+                self.flush()
+            except Exception as e:
+                print("[SpectatorBroadcaster] flush failed:", e)
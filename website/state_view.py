@@ -0,0 +1,109 @@
+# state_view.py
+
+import json
+
+import json_codec
+
+
+def encode(obj):
+    """
+    Compact JSON for `obj`. An EncodedPayload or EncodedJSON, or one
+    directly inside a dict or list, is spliced in from its text rather
+    than encoded.
+    """
+    if isinstance(obj, (EncodedPayload, EncodedJSON)):
+        return obj.text
+    if isinstance(obj, dict) and any(isinstance(v, (EncodedPayload, EncodedJSON)) for v in obj.values()):
+        return "{" + ",".join(f"{json.dumps(str(k))}:{encode(v)}" for k, v in obj.items()) + "}"
+    if isinstance(obj, list) and any(isinstance(v, (EncodedPayload, EncodedJSON)) for v in obj):
+        return "[" + ",".join(encode(v) for v in obj) + "]"
+    return json_codec.dumps(obj)
+
+
+class EncodedPayload(dict):
+    """
+    A payload dict that is serialized at most once, however many times it
+    is sent. Built on a `base` payload, only the fields added on top are
+    encoded; the base's text is reused. The text is made on first use, so
+    fields may be added until then (RoomSync.record adds "version").
+    """
+
+    def __init__(self, fields, base=None):
+        super().__init__(base or {})
+        self.update(fields)
+        self._base = base
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            base = self._base
+            extra = {k: v for k, v in self.items() if base is None or k not in base or v is not base[k]}
+            if base is None or any(k in base for k in extra):
+                self._text = json_codec.dumps(dict(self))
+            elif not extra:
+                self._text = base.text
+            elif not base:
+                self._text = encode(extra)
+            else:
+                self._text = base.text[:-1] + "," + encode(extra)[1:]
+            self._base = None  # the base and its text can go once this no longer needs them
+        return self._text
+
+    def encoded(self):
+        """Just the text, to keep after sending: a fraction of the memory of the payload's objects."""
+        return EncodedJSON(self.text)
+
+
+class EncodedJSON:
+    """A payload that was sent and is kept only to be sent again, as its encoded text."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+class PacketJSON:
+    """`json` module for the Socket.IO servers, so emitted EncodedPayloads keep their text."""
+
+    @staticmethod
+    def dumps(obj, *args, **kwargs):
+        return encode(obj)
+
+    loads = staticmethod(json_codec.loads)
+
+
+def public_state(game):
+    """Everything players and spectators of a room see, hands aside."""
+    score_tracker = game["score_tracker"]
+    deck_manager = game["deck_manager"]
+    return {
+        "graph": game["graph"].to_dict(),
+        "scores": score_tracker.get_scores(),
+        "claimed_cards": score_tracker.get_all_claimed_cards(),
+        "connections": {
+            "phase_pairs": score_tracker.phase_pairs,
+            "full_moon_pairs": score_tracker.full_moon_pairs,
+            "lunar_cycles": score_tracker.lunar_cycle_connections
+        },
+        "current_player": game["current_player"],
+        "deck_remaining": deck_manager.remaining() if deck_manager.deck is not None else "∞",
+        "hand_sizes": {
+            "1": len([c for c in deck_manager.get_hand(1) if c is not None]),
+            "2": len([c for c in deck_manager.get_hand(2) if c is not None])
+        }
+    }
+
+
+def state_view(game):
+    """
+    The room's public state at its current version, built and encoded once
+    per version. Every change to a room is broadcast, and every broadcast
+    bumps the version, so a cached view is never stale.
+    """
+    version = game["sync"].version
+    view = game.get("view")
+    if view is None or view[0] != version:
+        view = game["view"] = (version, EncodedPayload(public_state(game)))
+    return view[1]
@@ -1,6 +1,6 @@
 // animator.js
 
-import { sleep, logWithTime, getPhaseImage } from "./utils.js";
+import { sleep, logWithTime, createPhaseIcon } from "./utils.js";
 
 
 
@@ -14,21 +14,21 @@ export const Animator = {
     await pulseNodes(pair);
   },
 
-  async animateLunarCycle(chain, connections) {
-    if (!Array.isArray(chain)) return;
-  
-    console.log("[Animator] 🔁 Animate Lunar Cycle", chain);
-  
-    // Step 1: Pulse all nodes in the chain
-    pulseNodes(chain);
+  async animateLunarCycle(structure, claimed) {
+    if (!structure || !structure.center) return;
+
+    console.log("[Animator] 🔁 Animate Lunar Cycle", structure.chains, "chain(s) through", structure.center);
+
+    // Step 1: Pulse every node on some chain
+    pulseNodes(claimed);
     await sleep(600);
-  
-    // Step 2: Animate each edge in green, then fade to black
-    for (let i = 0; i < chain.length - 1; i++) {
-      const a = chain[i];
-      const b = chain[i + 1];
-      await drawBoldEdge(a, b, "green");  // temporary green
+
+    // Step 2: Grow the chains out from the placed card, one step of every branch at a time
+    let frontier = [...structure.decreasing, ...structure.increasing].map(branch => [structure.center, branch]);
+    while (frontier.length > 0) {
+      await Promise.all(frontier.map(([from, branch]) => drawBoldEdge(from, branch.node, "green")));  // temporary green
       await sleep(300);
+      frontier = frontier.flatMap(([, branch]) => branch.next.map(next => [branch.node, next]));
     }
 
   },
@@ -181,8 +181,11 @@ async animateOpponentCardToSquare(nodeId, phase) {
 
     // After flight, flip to reveal the phase
     setTimeout(() => {
-      const imgPath = `/static/images/moon/${getPhaseImage(phase)}`;
-      cardClone.style.background = `white url('${imgPath}') center/contain no-repeat`;
+      const face = createPhaseIcon(phase);
+      face.classList.add("card-face");
+      cardClone.style.background = "white";
+      cardClone.style.display = "flex";
+      cardClone.appendChild(face);
       cardClone.style.border = "1px solid #888";
       cardClone.style.transform = "rotateY(180deg) scaleX(-1)";
       cardClone.style.transition = "transform 0.4s";
@@ -191,12 +194,7 @@ async animateOpponentCardToSquare(nodeId, phase) {
         document.body.removeChild(cardClone);
     
         // Draw the actual phase on the square
-        const img = document.createElement("img");
-        img.src = imgPath;
-        img.width = 32;
-        img.height = 32;
-        img.alt = "moon phase";
-        square.appendChild(img);
+        square.appendChild(createPhaseIcon(phase, 32));
     
         resolve();
       }, 400);
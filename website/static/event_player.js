@@ -84,14 +84,14 @@ export const EventPlayer = {
 
       case "lunar_cycle":
         if (window.animationsEnabled) {
-          await Animator.animateLunarCycle(event.structure.chain, event.connections);
+          await Animator.animateLunarCycle(event.structure, event.claimed);
         }
         for (const [a, b] of event.connections) {
           Renderer.drawPersistentBoldEdge(a, b);
         }
 
         if (window.animationsEnabled) {
-          await Animator.animateStarsFromNodes(event.structure.chain, event.player, event.points);
+          await Animator.animateStarsFromNodes(event.claimed, event.player, event.points);
         } else {
           Renderer.updateScores(GameState.current.scores);
         }
@@ -42,6 +42,9 @@ if (urlParams.has("room")) {
       const copiesInput = document.getElementById("copiesPerPhase");
       if (copiesInput && rememberedDeckType === "finite") copiesInput.value = rememberedCopies;
 
+      const wildcardsInput = document.getElementById("wildcards");
+      if (wildcardsInput && typeof prev.wildcards === "number") wildcardsInput.value = prev.wildcards;
+
       // 3) Draw previews + recompute info/warnings
       if (typeof renderBoardPreviews === "function") renderBoardPreviews();
       if (typeof updateInfo === "function") updateInfo();
@@ -407,6 +410,7 @@ function startGame() {
 
   const deckType = document.querySelector('input[name="deckType"]:checked').value;
   const copiesPerPhase = deckType === "finite" ? parseInt(document.getElementById("copiesPerPhase").value) : null;
+  const wildcards = parseInt(document.getElementById("wildcards").value) || 0;
 
   document.getElementById("startWarning").innerText = "";
 
@@ -418,7 +422,8 @@ function startGame() {
       boards: boardPool,
       room_id: roomId,
       deckType: deckType,
-      copiesPerPhase: copiesPerPhase
+      copiesPerPhase: copiesPerPhase,
+      wildcards: wildcards
     })
   })
   .then(response => response.json())
@@ -434,7 +439,7 @@ function startGame() {
         `;
       }
     } else {
-      alert("Failed to create game.");
+      alert(data.error ? `Failed to create game: ${data.error}` : "Failed to create game.");
     }
   })
   .catch(() => alert("Server error starting game."));
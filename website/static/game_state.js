@@ -5,8 +5,16 @@ import { logWithTime } from "./utils.js";
 
 export const GameState = {
   playerNum: null,
+  isSpectator: false,
   current: null,  // stores the full game state after load()
 
+/**
+ * Value of the X-Player-ID header for this client.
+ */
+playerHeader() {
+  return this.isSpectator ? "spectator" : `player${this.playerNum}`;
+},
+
 async init() {
   const params = new URLSearchParams(window.location.search);
   const player = params.get("player");
@@ -14,10 +22,50 @@ async init() {
   if (player === "1" || player === "2") {
     this.playerNum = parseInt(player);
     logWithTime(`[GameState] Initialized from URL as Player ${this.playerNum}`);
+  } else if (player === "spectator") {
+    this.isSpectator = true;
+    logWithTime("[GameState] Initialized from URL as a spectator");
   } else {
     this.playerNum = 1; // default
     logWithTime(`[GameState] No ?player= found, defaulting to Player ${this.playerNum}`);
   }
+
+  if (!this.isSpectator) {
+    await this.claimSeat();
+  }
+},
+
+
+/**
+ * Seat this browser's rated identity in the room, creating the identity
+ * on first visit. Rating is optional, so failures are only logged.
+ */
+async claimSeat() {
+  try {
+    let playerId = localStorage.getItem("moonPlayerId");
+    let seatToken = localStorage.getItem("moonSeatToken");
+    if (!playerId || !seatToken) {
+      const player = await (await fetch("/players", { method: "POST" })).json();
+      playerId = player.player_id;
+      seatToken = player.seat_token;
+      localStorage.setItem("moonPlayerId", playerId);
+      localStorage.setItem("moonSeatToken", seatToken);  // secret: the id is public, this proves it's us
+    }
+
+    const res = await fetch(`/seat/${window.roomId}`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json", "X-Player-ID": this.playerHeader() },
+      body: JSON.stringify({ seat_token: seatToken })
+    });
+    if (res.status === 403) {
+      // ratings db was reset; a new identity is made next visit
+      localStorage.removeItem("moonPlayerId");
+      localStorage.removeItem("moonSeatToken");
+    }
+    logWithTime(`[GameState] Seat claim for ${playerId}:`, res.status);
+  } catch (err) {
+    console.warn("[GameState] Could not claim a rated seat:", err);
+  }
 },
 
 
@@ -28,7 +76,7 @@ async load() {
   }
 
   const res = await fetch(url, {
-    headers: { "X-Player-ID": `player${this.playerNum}` }
+    headers: { "X-Player-ID": this.playerHeader() }
   });
 
   if (!res.ok) {
@@ -55,7 +103,8 @@ async sendMove(squareId, selectedPhase) {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
-      "X-Player-ID": `player${this.playerNum}`
+      "X-Player-ID": `player${this.playerNum}`,
+      "X-Seat-Token": localStorage.getItem("moonSeatToken") || ""  // rated rooms check it against the claimed seat
     },
     body: JSON.stringify({
       player: this.playerNum,
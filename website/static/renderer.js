@@ -1,5 +1,5 @@
 import { GameState } from "./game_state.js";
-import { getPhaseImage } from "./utils.js";
+import { createPhaseIcon, setPhaseIcon } from "./utils.js";
 
 
 
@@ -20,20 +20,17 @@ export const Renderer = {
     const el = document.getElementById(nodeId);
     if (!el) continue;
 
-    let img = el.querySelector("img");
+    let icon = el.querySelector(".moon-phase");
     if (node.value === null) {
       // Remove image if exists
-      if (img) img.remove();
+      if (icon) icon.remove();
     } else {
       // Create image if missing
-      if (!img) {
-        img = document.createElement("img");
-        img.width = 32;
-        img.height = 32;
-        img.alt = "moon phase";
-        el.appendChild(img);
+      if (!icon) {
+        icon = createPhaseIcon(node.value, 32);
+        el.appendChild(icon);
       }
-      img.src = `/static/images/moon/${getPhaseImage(node.value)}`;
+      setPhaseIcon(icon, node.value);
     }
 
     el.onclick = () => {
@@ -214,7 +211,7 @@ showHand(hand) {
   hand.forEach(phase => {
     if (phase === null) return;
     const btn = document.createElement("button");
-    btn.innerHTML = `<img src="/static/images/moon/${getPhaseImage(phase)}" alt="phase" width="32" height="32">`;
+    btn.appendChild(createPhaseIcon(phase));
     btn.dataset.phase = phase;
     btn.className = "hand-card";
 
@@ -103,6 +103,14 @@ async function main() {
   }
 
 
+  // Spectators watch only: no hand, no game controls
+  if (GameState.isSpectator) {
+    for (const id of ["hand", "game-controls"]) {
+      const el = document.getElementById(id);
+      if (el) el.style.display = "none";
+    }
+  }
+
   // HIGHLIGHT YOUR PLAYER'S SCORE BOX
   const myScoreBox = document.getElementById(`player${GameState.playerNum}-score`);
   if (myScoreBox) {
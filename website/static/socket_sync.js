@@ -8,6 +8,26 @@ import { Animator } from "./animator.js";
 
 
 
+// A resync after a reconnect is a snapshot plus the updates the client missed:
+// play their events in order and take the newest move and flags
+function foldMissed(gameState) {
+  if (!Array.isArray(gameState.missed)) return gameState;
+  const folded = { ...gameState, events: [] };
+  for (const update of gameState.missed) {
+    if (update.new_game || update.is_undo || update.debug_fill) {
+      // the board was rebuilt or rewound; earlier events and moves no longer show on it
+      folded.events = [];
+      delete folded.last_move;
+    }
+    folded.events.push(...(update.events || []));
+    for (const flag of ["last_move", "game_over", "final_scores", "replay_id", "new_game", "is_undo", "debug_fill"]) {
+      if (flag in update) folded[flag] = update[flag];
+    }
+  }
+  return folded;
+}
+
+
 function opponentJustPlaced(gameState) {
   return gameState.last_move
     && gameState.last_move.player !== GameState.playerNum
@@ -19,6 +39,7 @@ function opponentJustPlaced(gameState) {
 
 export const SocketSync = {
   socket: null,
+  lastVersion: null,  // newest room state version received, sent back on reconnect
 
   connect() {
     this.socket = io();  // assumes socket.io is available globally
@@ -27,15 +48,48 @@ export const SocketSync = {
     this.socket.on("connect", () => {
       logWithTime("[SocketSync] Connected to server");
       console.log("[SocketSync] Emitting join_room with room_id:", window.roomId);
-      this.socket.emit("join_room", { room_id: window.roomId });
+      this.socket.emit("join_room", {
+        room_id: window.roomId,
+        role: GameState.isSpectator ? "spectator" : "player",
+        last_version: this.lastVersion
+      });
     });
 
     this.socket.on("disconnect", () => {
       logWithTime("[SocketSync] Disconnected from server");
     });
 
-this.socket.on("state_updated", async (gameState) => {
+    // Tournament rooms: series score and where this seat plays next
+    this.socket.on("series_updated", (data) => {
+      logWithTime("[SocketSync] Received 'series_updated' event", data);
+      const div = document.getElementById("series-status");
+      if (!div || GameState.isSpectator) return;
+
+      const [a, b] = data.series.players;
+      const [winsA, winsB] = data.series.wins;
+      const score = document.createElement("p");
+      score.textContent = `Series: ${a} ${winsA} – ${winsB} ${b}${data.series.finished ? " (finished)" : ""}`;
+
+      const links = document.createElement("p");
+      const nextUrl = data.next_urls[String(GameState.playerNum)];
+      for (const [href, label] of [[nextUrl, "Play your next game"], [data.tournament_url, "Tournament standings"]]) {
+        if (!href) continue;
+        const link = document.createElement("a");
+        link.href = href;
+        link.textContent = label;
+        links.append(link, " ");
+      }
+      div.replaceChildren(score, links);
+      div.style.display = "block";
+    });
+
+this.socket.on("state_updated", async (received) => {
   logWithTime("[SocketSync] Received 'state_updated' event");
+  const gameState = foldMissed(received);
+
+  if (typeof gameState.version === "number") {
+    SocketSync.lastVersion = gameState.version;
+  }
 
   const isReset = gameState.events && gameState.events.includes("reset");
 
@@ -65,7 +119,7 @@ this.socket.on("state_updated", async (gameState) => {
         url += "?debug=true";
       }
       const res = await fetch(url, {
-        headers: { "X-Player-ID": `player${GameState.playerNum}` }
+        headers: { "X-Player-ID": GameState.playerHeader() }
       });
       const data = await res.json();
       GameState.current.hand = data.hand;
@@ -81,8 +135,8 @@ this.socket.on("state_updated", async (gameState) => {
     // TEMPORARILY HIDE PHASE ON SQUARE
     const square = document.getElementById(gameState.last_move.node);
     if (square) {
-      const img = square.querySelector("img");
-      if (img) img.remove(); // remove the moon phase image until flip completes
+      const icon = square.querySelector(".moon-phase");
+      if (icon) icon.remove(); // remove the moon phase image until flip completes
     }
 
     // THEN ANIMATE CARD FLYING & FLIPPING
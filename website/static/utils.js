@@ -19,17 +19,43 @@ export function logWithTime(...args) {
 }
 
 
-export function getPhaseImage(phase) {
-  const PHASE_IMAGES = [
-    "new_moon.png",
-    "waxing_crescent.png",
-    "first_quarter.png",
-    "waxing_gibbous.png",
-    "full_moon.png",
-    "waning_gibbous.png",
-    "last_quarter.png",
-    "waning_crescent.png"
-  ];
-  return PHASE_IMAGES[phase] ?? "";
+// Frames in images/moon/phases.png: phases 0-7, then the error phase
+const PHASE_SPRITE_FRAMES = 9;
+
+// The wildcard card (deck_manager.WILDCARD): played as whichever phase scores best
+export const WILDCARD = 8;
+
+/**
+ * Create an element showing a moon phase from the sprite.
+ * @param {number} phase
+ * @param {number} [size] - width and height in px
+ * @returns {HTMLElement}
+ */
+export function createPhaseIcon(phase, size) {
+  const icon = document.createElement("span");
+  icon.className = "moon-phase";
+  icon.setAttribute("role", "img");
+  if (size) {
+    icon.style.width = `${size}px`;
+    icon.style.height = `${size}px`;
+  }
+  setPhaseIcon(icon, phase);
+  return icon;
 }
 
+/**
+ * Point a phase icon at the sprite frame for `phase`.
+ * @param {HTMLElement} icon
+ * @param {number} phase
+ */
+export function setPhaseIcon(icon, phase) {
+  const wildcard = phase === WILDCARD;
+  icon.classList.toggle("wildcard", wildcard);
+  icon.setAttribute("aria-label", wildcard ? "wildcard" : "moon phase");
+  if (wildcard) {
+    icon.style.backgroundPosition = "";  // the stylesheet centres the star
+    return;
+  }
+  const frame = Number.isInteger(phase) && phase >= 0 && phase < 8 ? phase : PHASE_SPRITE_FRAMES - 1;
+  icon.style.backgroundPosition = `${frame * 100 / (PHASE_SPRITE_FRAMES - 1)}% 0`;
+}
@@ -1,8 +1,21 @@
 # full_moon_pair.py
 
+from scoring_events import pair_events
+
+
 class FullMoonPair:
+    name = "full_moon_pair"
+
+    def __init__(self, points=2):
+        if not isinstance(points, int) or isinstance(points, bool) or points < 0:
+            raise ValueError(f"{self.name} points must be a non-negative integer")
+        self.points = points
 
-    def score_pair(self, player, node):
+    def wants(self, node, neighbor):
+        """Neighbor predicate used by the evaluator: opposite phase of the placed card."""
+        return abs(neighbor.value - node.value) == 4
+
+    def score_pair(self, player, node, neighbors=None):
         """
         Score full moon pairs (two phases that add to a full moon) and return:
         - A list of dicts: each with 'pair', 'points', and 'claimed' nodes
@@ -11,17 +24,16 @@ class FullMoonPair:
         scored_pairs = []
         claimed_set = {}
 
-        for neighbor in node.neighbors:
+        for neighbor in node.neighbors if neighbors is None else neighbors:
             if node.value is not None and neighbor.value is not None:
                 if abs(neighbor.value - node.value) == 4:
                     pair = tuple(sorted([node.name, neighbor.name]))
                     scored_pairs.append({
                         "pair": pair,
-                        "points": 2, 
+                        "points": self.points, 
                         "claimed": [node, neighbor]
                     })
                     claimed_set[neighbor.name] = neighbor
-                    print(f"[DEBUG] Full moon pair found: {pair}")
 
 
         if scored_pairs:
@@ -29,3 +41,11 @@ class FullMoonPair:
 
         return scored_pairs, list(claimed_set.values())
 
+    def score(self, player, node, graph, neighbors):
+        scored_pairs, _ = self.score_pair(player, node, neighbors)
+        return pair_events(player, self.name, scored_pairs)
+
+    def assess(self, player, node, graph, neighbors, budget=None):
+        """score() in two steps, as LunarCycle.assess: one pair per wanted neighbor."""
+        return (self.points * len(neighbors), [node.name] + [n.name for n in neighbors],
+                lambda: self.score(player, node, graph, neighbors))
@@ -1,26 +1,61 @@
 # lunar_cycle.py
 
-from chain_tracking import find_chains_through_node, extract_connections_from_chains
+from chain_tracking import MAX_CHAIN_STEPS, build_chain_dag
+from scoring_events import cycle_events
+
 
 class LunarCycle:
-    def score_cycle(self, player, node, graph):
-        chains = find_chains_through_node(node, graph)
+    name = "lunar_cycle"
+
+    def wants(self, node, neighbor):
+        """Neighbor predicate used by the evaluator: the next or previous phase."""
+        return neighbor.value in ((node.value + 1) % 8, (node.value - 1) % 8)
+
+    def score_cycle(self, player, node, graph, neighbors=None):
+        """
+        All chains through the placed node as one scored DAG, or nothing.
+        Each chain is worth one point per node; the DAG's count and points
+        cover every chain without listing them.
+        """
+        return self._scored(build_chain_dag(node, graph, neighbors))
 
-        scored_chains = []
-        for chain in chains:
-            if len(chain) < 3:
-                continue  # Skip too-short chains if needed
+    @staticmethod
+    def _scored(dag):
+        chains = dag.count()
+        if not chains:
+            return []
 
-            chain_names = [n.name for n in chain]
-            claimed = list(set(chain))
-            connections = extract_connections_from_chains([chain])
+        return [{
+            "dag": dag.to_dict(),
+            "chains": chains,
+            "points": dag.points(),
+            "claimed": dag.nodes(),
+            "connections": dag.connections()
+        }]
 
-            scored_chains.append({
-                "chain": chain_names,
-                "points": len(chain),  # or any scoring formula
-                "claimed": claimed,
-                "connections": connections
-            })
+    def score(self, player, node, graph, neighbors):
+        return cycle_events(player, self.score_cycle(player, node, graph, neighbors))
 
-        return scored_chains
+    def assess(self, player, node, graph, neighbors, budget=None):
+        """
+        score() in two steps, for ranking a wildcard's phases: the points and
+        claimed names now, and a function making the events from the same
+        search only for the phase that is played.
 
+        `budget` is a [steps left] list, this phase's share of one
+        placement's search, so ranking every phase costs no more steps than
+        playing one. A search it cuts short is ranked on what it found, and
+        searched again in full if its phase is played, so the events always
+        match score().
+        """
+        limit = MAX_CHAIN_STEPS if budget is None else min(MAX_CHAIN_STEPS, budget[0])
+        dag = build_chain_dag(node, graph, neighbors, max_steps=limit)
+        if budget is not None:
+            budget[0] -= dag.steps
+        if dag.cut_off and limit < MAX_CHAIN_STEPS:
+            build = lambda: self.score(player, node, graph, neighbors)
+        else:
+            build = lambda: cycle_events(player, self._scored(dag))
+        if not dag.count():
+            return 0, [], build
+        return dag.points(), dag.nodes(), build
@@ -1,8 +1,21 @@
 # phase_pair.py
 
+from scoring_events import pair_events
+
+
 class PhasePair:
+    name = "phase_pair"
+
+    def __init__(self, points=1):
+        if not isinstance(points, int) or isinstance(points, bool) or points < 0:
+            raise ValueError(f"{self.name} points must be a non-negative integer")
+        self.points = points
 
-    def score_pair(self, player, node):
+    def wants(self, node, neighbor):
+        """Neighbor predicate used by the evaluator: same phase as the placed card."""
+        return neighbor.value == node.value
+
+    def score_pair(self, player, node, neighbors=None):
         """
         Score a phase pair and return a list of dicts with:
         - 'pair': the (a, b) tuple of node names
@@ -13,13 +26,13 @@ class PhasePair:
         scored_pairs = []
         claimed_set = {}
 
-        for neighbor in node.neighbors:
+        for neighbor in node.neighbors if neighbors is None else neighbors:
             if neighbor.value == node.value:
                 pair = tuple(sorted([node.name, neighbor.name]))
 
                 scored_pairs.append({
                     "pair": pair,
-                    "points": 1,
+                    "points": self.points,
                     "claimed": [node, neighbor]  
                 })
 
@@ -30,3 +43,11 @@ class PhasePair:
 
         return scored_pairs, list(claimed_set.values())
 
+    def score(self, player, node, graph, neighbors):
+        scored_pairs, _ = self.score_pair(player, node, neighbors)
+        return pair_events(player, self.name, scored_pairs)
+
+    def assess(self, player, node, graph, neighbors, budget=None):
+        """score() in two steps, as LunarCycle.assess: one pair per wanted neighbor."""
+        return (self.points * len(neighbors), [node.name] + [n.name for n in neighbors],
+                lambda: self.score(player, node, graph, neighbors))
@@ -0,0 +1,183 @@
+# registry.py
+
+from strategies.phase_pair import PhasePair
+from strategies.full_moon_pair import FullMoonPair
+from strategies.lunar_cycle import LunarCycle
+from chain_tracking import MAX_CHAIN_STEPS
+
+
+RULES = {}
+
+PHASES = range(8)
+
+# Rules used when a board does not configure its own
+DEFAULT_RULES = ("phase_pair", "full_moon_pair", "lunar_cycle")
+
+
+def register_rule(rule_cls):
+    """Register a scoring rule class under its `name`. Usable as a decorator."""
+    RULES[rule_cls.name] = rule_cls
+    return rule_cls
+
+
+for _rule_cls in (PhasePair, FullMoonPair, LunarCycle):
+    register_rule(_rule_cls)
+
+
+def build_rules(config=None):
+    """
+    Instantiate rules from a config, which can be:
+    - None: the default rule set
+    - a list of rule names, e.g. ["phase_pair", "lunar_cycle"]
+    - a dict of rule name -> options, e.g. {"full_moon_pair": {"points": 3}}
+    Rules keep the order they are given in, which is also the event order.
+    """
+    if config is None:
+        config = DEFAULT_RULES
+    if isinstance(config, dict):
+        items = config.items()
+    elif isinstance(config, (list, tuple)):
+        items = ((name, None) for name in config)
+    else:
+        raise TypeError("scoringRules must be a list of rule names or an object of rule options")
+
+    rules = []
+    for name, options in items:
+        if not isinstance(name, str) or name not in RULES:
+            raise ValueError(f"Unknown scoring rule: {name!r}")
+        if options is not None and not isinstance(options, dict):
+            raise TypeError(f"Options for {name} must be an object")
+        rules.append(RULES[name](**(options or {})))
+    return rules
+
+
+class _Phase:
+    """Stand-in for a node holding `value`, to ask rules about phases rather than nodes."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+
+class ScoringEvaluator:
+    """
+    Scores a placement against several rules with a single pass over the
+    placed node's neighbors. Each rule declares the neighbors it cares about
+    through `wants(node, neighbor)`, and is only called with those.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        # partners[neighbor phase]: (placed phase, rule index) for every rule that would want
+        # that neighbor next to that phase. Rules decide on phases alone, so this is asked once.
+        self.partners = [
+            tuple((phase, i) for i, rule in enumerate(self.rules) for phase in PHASES
+                  if rule.wants(_Phase(phase), _Phase(value)))
+            for value in PHASES
+        ]
+
+    def evaluate(self, player, node, graph):
+        matched = [[] for _ in self.rules]
+
+        for neighbor in node.neighbors:
+            if neighbor.value is None:
+                continue
+            for i, rule in enumerate(self.rules):
+                if rule.wants(node, neighbor):
+                    matched[i].append(neighbor)
+
+        events = []
+        for rule, neighbors in zip(self.rules, matched):
+            if neighbors:
+                events += rule.score(player, node, graph, neighbors)
+        return events
+
+    def assess_candidates(self, player, node, graph, phases=PHASES):
+        """
+        What `node` would score holding each of `phases`, as a Candidate per
+        phase; for a wildcard, which may be played as any of them.
+
+        One pass over the neighbors sorts each of them to the candidate
+        phases that want it, per rule, so every rule is asked once per phase
+        with its own neighbors only. A neighbor continues a chain for exactly
+        one candidate in each direction (the phase just below or above it),
+        so each neighbor's chain branches are searched once for all eight
+        candidates, within one placement's step budget shared out between
+        them. Rules with `assess` leave the events unbuilt until a
+        candidate's events() is called.
+        """
+        matched = {}
+        for neighbor in node.neighbors:
+            if neighbor.value is not None:
+                for key in self.partners[neighbor.value]:
+                    if key in matched:
+                        matched[key].append(neighbor)
+                    else:
+                        matched[key] = [neighbor]
+
+        # One placement's chain search steps, shared evenly by the phases with something to score
+        steps_left = MAX_CHAIN_STEPS
+        scoring = {phase for phase, _ in matched}
+        waiting = len(scoring.intersection(phases))
+        candidates = {}
+        saved = node.value
+        try:
+            for phase in phases:
+                candidate = candidates[phase] = Candidate(node, phase)
+                if phase not in scoring:
+                    continue
+                share = steps_left // waiting
+                waiting -= 1
+                budget = [share]
+                node.value = phase
+                for i, rule in enumerate(self.rules):
+                    neighbors = matched.get((phase, i))
+                    if neighbors is None:
+                        continue
+                    assess = getattr(rule, "assess", None)
+                    if assess is not None:
+                        points, claimed, build = assess(player, node, graph, neighbors, budget)
+                    else:
+                        events = rule.score(player, node, graph, neighbors)
+                        points, claimed = sum(e["points"] for e in events), [n for e in events for n in e["claimed"]]
+                        build = events.copy
+                    candidate.points += points
+                    candidate.claimed += claimed
+                    candidate.builds.append(build)
+                steps_left -= share - budget[0]
+        finally:
+            node.value = saved
+        return candidates
+
+    def evaluate_candidates(self, player, node, graph, phases=PHASES):
+        """Events for `node` holding each of `phases`, as evaluate() would give them, keyed by phase."""
+        return {phase: c.events() for phase, c in self.assess_candidates(player, node, graph, phases).items()}
+
+
+class Candidate:
+    """One phase a node could hold: its points and claimed names, with the events built on demand."""
+
+    __slots__ = ("node", "phase", "points", "claimed", "builds")
+
+    def __init__(self, node, phase):
+        self.node = node
+        self.phase = phase
+        self.points = 0
+        self.claimed = []
+        self.builds = []  # per matched rule, a function making its events
+
+    def events(self):
+        """The scoring events, in rule order, exactly as ScoringEvaluator.evaluate gives them."""
+        saved = self.node.value
+        self.node.value = self.phase
+        try:
+            return [event for build in self.builds for event in build()]
+        finally:
+            self.node.value = saved
+
+
+def evaluator_for_board(board=None):
+    """Build the evaluator for a board dict, honoring its optional `scoringRules`."""
+    config = board.get("scoringRules") if board else None
+    return ScoringEvaluator(build_rules(config))
@@ -0,0 +1,11 @@
+import os
+
+# The suite plays whole games from one address as fast as it can; rate
+# limiting has its own tests, which turn it back on per app.
+os.environ.setdefault("RATE_LIMITS", "0")
+
+# The /ops dashboard is only served with a token set
+os.environ.setdefault("OPS_TOKEN", "test-ops-token")
+
+# Debug routes are off unless asked for; the suite uses them
+os.environ.setdefault("DEBUG_ROUTES", "1")
@@ -0,0 +1,69 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+from graph_logic import Graph
+from strategies.registry import evaluator_for_board
+from analysis import analyze, best_phase
+from deck_manager import WILDCARD
+
+
+def make_line(values):
+    graph = Graph()
+    names = [chr(ord("A") + i) for i in range(len(values))]
+    for i, name in enumerate(names):
+        graph.add_node(name, (i, 0))
+    for a, b in zip(names, names[1:]):
+        graph.connect_nodes(graph.nodes[a], graph.nodes[b])
+    for name, value in zip(names, values):
+        if value is not None:
+            graph.nodes[name].add_value(value)
+    return graph
+
+
+def test_ranks_placements_and_leaves_board_untouched():
+    graph = make_line([2, None, 6, None, None])
+    before = {name: node.value for name, node in graph.nodes.items()}
+
+    result = analyze(graph, evaluator_for_board(), 1, [2, 3, 2], {"A": 2}, lookahead=False)
+
+    best = result["candidates"][0]
+    # 2 next to 2 is a pair, and 2 opposite 6 is a full moon: 3 points, A stolen, B and C claimed
+    assert (best["card"], best["node"], best["points"], best["claim_swing"]) == (2, "B", 3, 4)
+    assert {p["type"] for p in best["pairs"]} == {"phase_pair", "full_moon_pair"}
+    assert len(result["candidates"]) == 3 * 2  # distinct cards x empty nodes
+    assert {name: node.value for name, node in graph.nodes.items()} == before
+
+
+def test_lookahead_accounts_for_opponent_reply_within_budget():
+    graph = make_line([None, None, 4, None])
+    result = analyze(graph, evaluator_for_board(), 1, [4, 5], {})
+    assert result["lookahead_complete"]
+    for c in result["candidates"]:
+        assert c["net"] == c["score"] - c["reply"]["score"]
+    assert result["candidates"] == sorted(result["candidates"], key=lambda c: -c["net"])
+
+    partial = analyze(graph, evaluator_for_board(), 1, [4, 5], {}, max_evaluations=20)
+    assert not partial["lookahead_complete"]
+    assert sum("reply" in c for c in partial["candidates"]) == 1
+    assert all(node.value in (None, 4) for node in graph.nodes.values())
+
+
+def test_wildcard_resolves_to_the_best_phase_for_its_player():
+    graph = make_line([2, None, 6, None, 5])
+    evaluator = evaluator_for_board()
+
+    # On B, 2 makes a pair with A and a full moon with C
+    phase, events = best_phase(1, graph.nodes["B"], graph, evaluator, {})
+    assert phase == 2 and sum(e["points"] for e in events) == 3
+    # On D, full moons with C (as 2) and E (as 1) tie, and the lowest phase wins, unless C is the opponent's
+    assert best_phase(1, graph.nodes["D"], graph, evaluator, {})[0] == 1
+    assert best_phase(1, graph.nodes["D"], graph, evaluator, {"C": 2})[0] == 2
+    assert graph.nodes["B"].value is None and graph.nodes["D"].value is None
+
+    result = analyze(graph, evaluator, 1, [WILDCARD, 3], {}, lookahead=False)
+    wild = next(c for c in result["candidates"] if c["card"] == WILDCARD and c["node"] == "B")
+    assert (wild["phase"], wild["points"]) == (2, 3)
@@ -0,0 +1,34 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+from board_analytics import analyze_boards, summarize
+from board_generator import generate_board
+
+
+def test_summarize_tracks_seat_advantage_and_cycles():
+    # (starting_player, winner, score 1, score 2, moves, (chains, total length, longest) per scoring move)
+    games = [(1, 1, 10, 4, 9, [(1, 3, 3)]), (2, 2, 6, 8, 9, [(1, 3, 3), (1, 5, 5)]), (1, 0, 5, 5, 9, [])]
+    metrics = summarize(games)
+    assert metrics["first_player_win_rate"] == 1.0
+    assert metrics["balance"] == 0.0
+    assert metrics["mean_score"] == {"first": 7.6667, "second": 5.0}
+    assert metrics["mean_lunar_cycle_length"] == 3.6667
+    assert (metrics["lunar_cycles_per_game"], metrics["max_lunar_cycle_length"]) == (1.0, 5)
+    assert round(metrics["draw_rate"], 2) == 0.33
+
+
+def test_reports_are_cached_by_board_hash(tmp_path):
+    boards = [generate_board("grid", 3, seed=1), generate_board("ring", 6, seed=2), {"nodes": {}}]
+    first = list(analyze_boards(boards, games=6, processes=2, cache_dir=str(tmp_path)))
+    assert [r["ok"] for r in first] == [True, True, False]
+    assert not any(r.get("cached") for r in first)
+    assert first[0]["metrics"]["games"] == 6
+
+    boards[1] = generate_board("ring", 7, seed=2)
+    second = list(analyze_boards(boards, games=6, processes=2, cache_dir=str(tmp_path)))
+    assert [r.get("cached") for r in second[:2]] == [True, False]
+    assert second[0]["metrics"] == first[0]["metrics"]
@@ -0,0 +1,42 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import pytest
+from board_generator import SHAPES, generate_batch, generate_board
+from board_import import validate_board
+from simulation import simulate_game
+
+
+@pytest.mark.parametrize("shape", sorted(SHAPES))
+def test_generated_boards_are_valid_and_reproducible(shape):
+    for seed in range(3):
+        board = generate_board(shape, 9 if shape in ("ring", "planar") else 4, seed)
+        assert validate_board(board) == []
+        assert board == generate_board(shape, board["generator"]["size"], seed)
+
+
+def test_planar_boards_never_stack_nodes_across_a_seed_sweep():
+    # Seeds that once placed two nodes on the same spot, then a sweep of larger boards
+    specs = [{"shape": "planar", "size": side, "seed": seed}
+             for side, seeds in ((6, (9, 29)), (7, (19, 35)), (8, (3,))) for seed in seeds]
+    specs += [{"shape": "planar", "size": side, "seed": seed} for side in (6, 7, 8) for seed in range(40, 46)]
+    boards = list(generate_batch(specs, processes=1))
+    assert [b["generator"]["seed"] for b in boards] == [spec["seed"] for spec in specs]
+    assert all(validate_board(b) == [] for b in boards)
+
+
+def test_grid_matches_default_board_topology():
+    board = generate_board("grid", 5, 0)
+    degrees = sorted(len(n["neighbors"]) for n in board["nodes"].values())
+    assert degrees == [2] * 4 + [3] * 12 + [4] * 9
+
+
+def test_simulated_game_fills_the_board():
+    board = generate_board("hex", 4, 1)
+    result = simulate_game(board, seed=3)
+    assert result["moves"] == len(board["nodes"])
+    assert result["winner"] in (0, 1, 2)
@@ -0,0 +1,82 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import json
+from board_import import iter_boards, validate_board, normalize_board, board_id, import_boards, board_size_errors
+from graph_logic import Graph
+
+
+def square_board():
+    return {
+        "name": "square",
+        "nodes": {
+            "a": {"position": [0, 0], "neighbors": ["b", "d"]},
+            "b": {"position": [1, 0], "neighbors": ["a", "c"]},
+            "c": {"position": [1, 1], "neighbors": ["b", "d"]},
+            "d": {"position": [0, 1], "neighbors": ["c", "a"]},
+        },
+        "deckSettings": {"deckType": "finite", "copiesPerPhase": 2},
+    }
+
+
+def test_valid_board_has_no_errors():
+    assert validate_board(square_board()) == []
+
+
+def test_validation_reports_each_problem():
+    board = square_board()
+    board["nodes"]["a"]["neighbors"].append("zzz")
+    board["nodes"]["b"]["neighbors"].append("d")
+    board["nodes"]["c"]["position"] = [0, 0]
+    board["deckSettings"] = {"deckType": "finite", "copiesPerPhase": 0}
+
+    errors = validate_board(board)
+    assert any("dangling neighbor zzz" in e for e in errors)
+    assert any("b -> d is not symmetric" in e for e in errors)
+    assert any("share position" in e for e in errors)
+    assert any("copiesPerPhase" in e for e in errors)
+
+
+def test_size_check_wants_an_integer_copies_per_phase():
+    board = square_board()
+    for copies in ("4", True, 2.5, 0, 10 ** 9):
+        board["deckSettings"] = {"deckType": "finite", "copiesPerPhase": copies}
+        assert board_size_errors(board) and "copiesPerPhase" in board_size_errors(board)[0]
+    for copies in (4, None):
+        board["deckSettings"] = {"deckType": "finite", "copiesPerPhase": copies}
+        assert board_size_errors(board) == []
+
+
+def test_disconnected_board_is_rejected():
+    board = square_board()
+    board["nodes"]["e"] = {"position": [5, 5], "neighbors": []}
+    assert validate_board(board) == ["Board is not connected: 1 node(s) unreachable"]
+
+
+def test_normalized_board_round_trips_through_graph():
+    board = square_board()
+    board["nodes"]["a"]["neighbors"].append("b")  # duplicate entry is dropped
+    compact = normalize_board(board)
+    graph = Graph.from_compact(compact)
+
+    assert graph.to_dict() == Graph.from_dict(board).to_dict()
+    assert board_id(compact) == board_id(normalize_board(square_board()))
+
+
+def test_import_streams_json_array_and_json_lines(tmp_path):
+    bad = square_board()
+    del bad["nodes"]["a"]["position"]
+
+    array_file = tmp_path / "boards.json"
+    array_file.write_text(json.dumps([square_board(), bad, square_board()], indent=2))
+    lines_file = tmp_path / "boards.jsonl"
+    lines_file.write_text("\n".join(json.dumps(b) for b in [square_board(), bad]) + "\n")
+
+    assert len(list(iter_boards(array_file))) == 3
+    reports = list(import_boards(lines_file, processes=2))
+    assert [r["ok"] for r in reports] == [True, False]
+    assert reports[0]["board"]["deckSettings"]["deckType"] == "finite"
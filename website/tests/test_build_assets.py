@@ -0,0 +1,75 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gzip
+
+from build_assets import build, bundle_modules, minify_js, read_png, write_png
+from assets import AssetStore
+
+
+def make_static(tmp_path):
+    (tmp_path / "images" / "moon").mkdir(parents=True)
+    (tmp_path / "styles").mkdir()
+    frames = []
+    for shade in (0, 255):
+        rows = [bytearray([shade, shade, shade, 255] * 4) for _ in range(4)]
+        name = f"frame{shade}.png"
+        (tmp_path / "images" / "moon" / name).write_bytes(write_png(4, 4, rows))
+        frames.append(name)
+    (tmp_path / "images" / "star.png").write_bytes(write_png(1, 1, [bytearray(4)]))
+
+    (tmp_path / "util.js").write_text('// helpers\nexport function double(x) {\n  return x * 2;\n}\n')
+    (tmp_path / "main.js").write_text('import { double as twice } from "./util.js";\n\nconsole.log(twice(21));\n')
+    (tmp_path / "styles" / "site.css").write_text(
+        "/* stars */\n.star {\n  background: url('/static/images/star.png');\n  color: red;\n}\n" * 20
+    )
+    return frames
+
+
+def test_minifier_keeps_strings_templates_and_regexes():
+    source = (
+        'const url = "https://example.com"; // trailing\n'
+        '    /* block\n comment */\n'
+        'const re = /\\/\\/[/]x/g;\n'
+        'const html = `<div>\n    // not a comment ${ {a: 1}.a } /* nor this */\n</div>`;\n'
+    )
+    assert minify_js(source) == (
+        'const url = "https://example.com";\n'
+        'const re = /\\/\\/[/]x/g;\n'
+        'const html = `<div>\n    // not a comment ${ {a: 1}.a } /* nor this */\n</div>`;\n'
+    )
+
+
+def test_bundle_wires_imports_to_exports(tmp_path):
+    make_static(tmp_path)
+    bundle = bundle_modules("main.js", str(tmp_path))
+    assert "import" not in bundle and "export" not in bundle
+    assert bundle.index("const __util = ") < bundle.index("const { double: twice } = __util;")
+    assert "return { double };" in bundle
+
+
+def test_build_fingerprints_compresses_and_serves(tmp_path):
+    frames = make_static(tmp_path)
+    manifest, _ = build(str(tmp_path), bundles=["main.js"], scripts=[], stylesheets=["styles/site.css"],
+                        images=["images/star.png"], sprite_frames=frames, sprite_size=2)
+    dist = tmp_path / "dist"
+
+    width, height, rows = read_png((tmp_path / "images" / "moon" / "phases.png").read_bytes())
+    assert (width, height) == (4, 2)
+    assert rows[0][:4] == bytearray([0, 0, 0, 255]) and rows[0][-4:] == bytearray([255, 255, 255, 255])
+
+    css = manifest["assets"]["styles/site.css"]
+    assert css.startswith("site.") and manifest["encodings"][css] == ["br", "gzip"]
+    text = gzip.decompress((dist / (css + ".gz")).read_bytes()).decode()
+    assert f"url(/assets/{manifest['assets']['images/star.png']})" in text and "stars" not in text
+
+    store = AssetStore(str(dist))
+    assert store.url("main.js") == f"/assets/{manifest['assets']['main.js']}"
+    body, headers = store.response(css, "gzip, br;q=0")
+    assert headers["Content-Encoding"] == "gzip" and headers["Vary"] == "Accept-Encoding"
+    assert "immutable" in headers["Cache-Control"]
+    body, headers = store.response(css, "identity")
+    assert "Content-Encoding" not in headers and body == (dist / css).read_bytes()
+    assert store.response("missing.css") is None
@@ -0,0 +1,63 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+from graph_logic import Graph
+from chain_tracking import build_chain_dag, chain_stats, expand_chains
+from strategies.registry import evaluator_for_board
+
+
+def junction_board(width, length):
+    """A centre of phase 4 with `width` decreasing and `width` increasing arms of `length` nodes each."""
+    graph = Graph()
+    center = graph.add_node("X", (0, 0))
+    center.value = 4
+    for direction, label in ((-1, "d"), (1, "i")):
+        for arm in range(width):
+            previous = center
+            for step in range(1, length + 1):
+                node = graph.add_node(f"{label}{arm}-{step}", (direction * step, arm))
+                node.value = (4 + direction * step) % 8
+                graph.connect_nodes(previous, node)
+                previous = node
+    return graph
+
+
+def test_a_junction_scores_every_chain_in_one_compact_event():
+    graph = junction_board(width=3, length=2)
+    [event] = [e for e in evaluator_for_board().evaluate(1, graph.nodes["X"], graph) if e["type"] == "lunar_cycle"]
+
+    chains = list(expand_chains(event["structure"]))
+    assert event["structure"]["chains"] == len(chains) == 9
+    assert all(len(chain) == 5 and chain[2] == "X" for chain in chains)
+    assert event["points"] == sum(len(chain) for chain in chains) == 45
+    assert chain_stats(event["structure"]) == (9, 45, 5)
+    assert sorted(event["claimed"]) == sorted(graph.nodes)
+    assert len(event["connections"]) == 12
+
+
+def test_nodes_reached_from_both_sides_count_once_per_chain():
+    # Eight nodes in a ring, phases 0..7: from any node both directions meet the same seven nodes
+    graph = Graph()
+    nodes = [graph.add_node(f"r{i}", (i, 0)) for i in range(8)]
+    for i, node in enumerate(nodes):
+        node.value = i
+        graph.connect_nodes(node, nodes[(i + 1) % 8])
+
+    dag = build_chain_dag(nodes[0], graph)
+    [chain] = expand_chains(dag.to_dict())
+    assert len(chain) == 8
+    assert (dag.count(), dag.points()) == (1, 8)
+    assert chain_stats({**dag.to_dict(), "chains": 1, "points": 8}) == (1, 8, 8)
+
+    # A chain on one side of the placed node needs two steps from it
+    pair = Graph()
+    a, b = pair.add_node("a", (0, 0)), pair.add_node("b", (1, 0))
+    a.value, b.value = 4, 5
+    pair.connect_nodes(a, b)
+    assert build_chain_dag(a, pair).count() == 0
+    arms = junction_board(width=2, length=1)
+    assert build_chain_dag(arms.nodes["i0-1"], arms).points() == 6
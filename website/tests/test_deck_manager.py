@@ -0,0 +1,76 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import pytest
+from deck_manager import DeckManager, WILDCARD
+
+
+def draw_all(deck_manager, player=1):
+    cards = []
+    while any(c is not None for c in deck_manager.get_hand(player)):
+        card = next(c for c in deck_manager.get_hand(player) if c is not None)
+        deck_manager.play(player, card)
+        cards.append(card)
+    return cards
+
+
+def test_same_seed_deals_the_same_game():
+    a = DeckManager("finite", copies_per_phase=2, seed=42)
+    b = DeckManager("finite", copies_per_phase=2, seed=42)
+    assert a.get_hand(1) == b.get_hand(1) and a.get_hand(2) == b.get_hand(2)
+    assert draw_all(a) == draw_all(b)
+
+    c = DeckManager("infinite", seed=7)
+    d = DeckManager("infinite", seed=7)
+    assert [c.play(1, c.get_hand(1)[0]) for _ in range(20)] == [d.play(1, d.get_hand(1)[0]) for _ in range(20)]
+
+
+def test_reset_records_a_new_seed_and_can_replay_it():
+    deck_manager = DeckManager("finite", copies_per_phase=3)
+    first_seed, first_hand = deck_manager.seed, list(deck_manager.get_hand(1))
+
+    deck_manager.reset(first_seed)
+    assert deck_manager.get_hand(1) == first_hand
+
+
+def test_finite_deck_tracks_remaining_counts():
+    deck_manager = DeckManager("finite", copies_per_phase=2, seed=1)
+    assert deck_manager.remaining() == 16 - 6
+    assert sum(deck_manager.remaining_by_phase) == deck_manager.remaining()
+
+    cards = draw_all(deck_manager, 1) + draw_all(deck_manager, 2)
+    assert sorted(cards) == sorted(list(range(8)) * 2)
+    assert deck_manager.remaining() == 0
+    assert deck_manager.remaining_by_phase == [0] * 8
+
+
+def test_wildcards_are_dealt_alongside_the_phases():
+    deck_manager = DeckManager("finite", copies_per_phase=1, seed=4, wildcards=3)
+    assert deck_manager.remaining() == 11 - 6
+    assert sum(deck_manager.remaining_by_phase) + deck_manager.remaining_wildcards == deck_manager.remaining()
+
+    cards = draw_all(deck_manager, 1) + draw_all(deck_manager, 2)
+    assert sorted(cards) == list(range(8)) + [WILDCARD] * 3
+    assert deck_manager.remaining_wildcards == 0
+
+    # Without wildcards an infinite deck deals exactly as before
+    plain, none = DeckManager(seed=11), DeckManager(seed=11, wildcards=0)
+    assert plain.get_hand(1) == none.get_hand(1)
+    assert WILDCARD in sum((DeckManager(seed=s, wildcards=8).get_hand(1) for s in range(10)), [])
+
+
+def test_play_replaces_the_first_matching_slot():
+    deck_manager = DeckManager(seed=3)
+    deck_manager.players[1]["hand"] = [5, 2, 5]
+    deck_manager._slots[1] = {5: [0, 2], 2: [1]}
+
+    index, new_card = deck_manager.play(1, 5)
+    assert index == 0
+    assert deck_manager.get_hand(1)[0] == new_card
+
+    with pytest.raises(ValueError):
+        deck_manager.play(1, 8)
@@ -0,0 +1,53 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import fuzz_scoring
+from fuzz_scoring import ENGINES, fuzz, register_engine
+from strategies.registry import ScoringEvaluator, build_rules
+
+
+def test_builtin_engines_agree_with_the_reference():
+    report = fuzz(cases=40, seed=3, max_nodes=20)
+    assert report["failures"] == []
+    assert report["moves"] > 100
+    assert set(report["engines"]) == set(ENGINES) and report["engines"]["reference"]["relative"] == 1.0
+
+
+def test_a_chain_dag_bug_shared_by_every_engine_is_caught(monkeypatch):
+    import chain_tracking
+    counted = chain_tracking.ChainDag.points
+    monkeypatch.setattr(chain_tracking.ChainDag, "points", lambda dag: counted(dag) + 1)
+    report = fuzz(cases=20, seed=3, max_nodes=20)
+    assert report["failures"]
+    assert all(set(f["results"]) == set(ENGINES) for f in report["failures"])
+
+
+def test_a_disagreeing_engine_is_shrunk_to_a_minimal_case():
+    @register_engine("first_pair_only")
+    class FirstPairOnly(ScoringEvaluator):
+        """Drops every phase pair after the first one a placement makes."""
+
+        def __init__(self, rules):
+            super().__init__(build_rules(rules))
+
+        def evaluate(self, player, node, graph):
+            events = super().evaluate(player, node, graph)
+            pairs = [e for e in events if e["type"] == "phase_pair"]
+            return [e for e in events if e["type"] != "phase_pair" or e is pairs[0]]
+
+    try:
+        report = fuzz(cases=60, seed=4, engines=["reference", "first_pair_only"], max_nodes=20)
+    finally:
+        del fuzz_scoring.ENGINES["first_pair_only"]
+
+    assert report["failures"]
+    for failure in report["failures"]:
+        # Two equal neighbors, then the same phase between them
+        case = failure["case"]
+        assert len(case["board"]["names"]) == 3 and len(case["moves"]) == 3
+        assert len({value for _, _, value in case["moves"]}) == 1
+        assert failure["move"] == 2
@@ -0,0 +1,42 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import json
+import pickle
+from copy import deepcopy
+
+import json_codec
+from graph_logic import Graph
+from score_tracker import ScoreTracker
+from strategies.registry import evaluator_for_board
+
+
+def scored_board():
+    graph = Graph()
+    a, b = graph.add_node("a", (0, 0)), graph.add_node("b", (1, 0))
+    graph.connect_nodes(a, b)
+    a.value, b.value = 4, 4
+    return graph, evaluator_for_board().evaluate(1, b, graph)
+
+
+def test_events_and_states_encode_like_plain_json():
+    graph, events = scored_board()
+    assert events and all(dict(e) == e.to_dict() for e in events)
+    payload = {"events": events, "graph": graph.to_dict(), "scores": {1: 3, 2: 0}, "deck_remaining": "∞"}
+    plain = {"events": [e.to_dict() for e in events], "graph": graph.to_dict(),
+             "scores": {"1": 3, "2": 0}, "deck_remaining": "∞"}
+    assert json_codec.loads(json_codec.dumps(payload)) == json.loads(json.dumps(plain))
+    assert json.loads(json.dumps(payload, default=json_codec.to_json)) == json_codec.loads(json_codec.dumps(plain))
+
+
+def test_undo_copies_share_events_and_workers_get_them_back_intact():
+    graph, events = scored_board()
+    tracker = ScoreTracker()
+    tracker.apply_events(events)
+    copy = deepcopy(tracker)
+    assert copy.scoring_history[0] is tracker.scoring_history[0]
+    assert pickle.loads(pickle.dumps(events)) == events
@@ -0,0 +1,129 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import time
+
+from matchmaking import Matchmaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_matchmaker(**kwargs):
+    clock = FakeClock()
+    rooms = []
+
+    def create_room(settings):
+        rooms.append(settings)
+        return f"room-{len(rooms)}"
+
+    return Matchmaker(create_room, clock=clock, **kwargs), clock, rooms
+
+
+def test_pairs_within_bucket_and_deals_room_after_both_accept():
+    mm, clock, rooms = make_matchmaker()
+    a = mm.join(deck_type="finite", copies_per_phase=4)
+    b = mm.join(deck_type="infinite")
+    assert a.status == b.status == "waiting"
+
+    clock.now = 3.0
+    c = mm.join(deck_type="finite", copies_per_phase=4)
+    assert (a.status, a.seat, c.status, c.seat) == ("matched", "player1", "matched", "player2")
+    assert mm.stats()["queue_depth"] == {b.bucket: 1}
+
+    mm.accept(a.id)
+    assert rooms == []
+    mm.accept(c.id)
+    assert rooms == [{"boards": None, "deck_type": "finite", "copies_per_phase": 4}]
+    assert a.room_id == c.room_id == "room-1"
+    assert c.to_dict(clock.now)["url"] == "/game/room-1?player=2"
+    assert mm.stats()["wait_time_seconds"]["count"] == 2
+
+
+def test_handshake_timeout_requeues_the_player_who_accepted():
+    mm, clock, rooms = make_matchmaker(accept_timeout=10)
+    a = mm.join()
+    b = mm.join()
+    mm.accept(b.id)
+
+    clock.now = 11.0
+    mm.expire()
+    assert a.status == "abandoned"
+    assert b.status == "waiting" and not b.accepted
+
+    c = mm.join()
+    assert b.opponent is c and b.seat == "player1"
+    assert mm.get(a.id).status == "abandoned"
+
+
+def test_unmatched_tickets_expire_and_leaving_is_skipped():
+    mm, clock, rooms = make_matchmaker(queue_timeout=60)
+    a = mm.join()
+    mm.leave(a.id)
+    b = mm.join()
+    assert b.status == "waiting"  # not paired with the cancelled ticket
+
+    clock.now = 61.0
+    mm.expire()
+    assert b.status == "expired"
+    assert mm.stats()["total_waiting"] == 0
+
+    clock.now = 200.0
+    mm.expire()
+    assert mm.get(a.id) is None and mm.get(b.id) is None
+
+
+def test_requeued_ticket_waits_afresh_and_only_due_tickets_are_looked_at():
+    mm, clock, rooms = make_matchmaker(queue_timeout=60, accept_timeout=10)
+    waiting = [mm.join(deck_type="finite", copies_per_phase=n) for n in range(1, 6)]  # one per bucket
+    clock.now = 50.0
+    a = mm.join()
+    b = mm.join()
+    mm.accept(b.id)
+
+    clock.now = 65.0  # the five buckets' tickets are due; b is requeued with a new wait
+    mm.expire()
+    assert all(t.status == "expired" for t in waiting) and b.status == "waiting"
+    assert b.created == 65.0 and b.to_dict(clock.now)["waited"] == 0
+    assert [entry[2] for entry in mm.expiries] == [a, b]  # what's left: a's stale entry and b's new one
+
+    clock.now = 115.0  # past b's first expiry, within its second
+    mm.expire()
+    assert b.status == "waiting"
+    clock.now = 126.0
+    mm.expire()
+    assert b.status == "expired" and mm.expiries == [] and mm.queues == {}
+
+
+def test_buckets_are_forgotten_once_nobody_waits_in_them():
+    mm, clock, rooms = make_matchmaker()
+    boards = [{"nodes": {"a": {"neighbors": [], "position": [0, 0]}}}]
+    a = mm.join(boards=boards)
+    b = mm.join(boards=boards)
+    assert mm.queues == mm.waiting == mm.settings == {}
+    mm.accept(a.id)
+    mm.accept(b.id)
+    assert rooms[0]["boards"] == boards  # the matched pair kept its settings
+
+    c = mm.join(boards=boards, deck_type="finite", copies_per_phase=2)
+    assert c.bucket in mm.settings
+    mm.leave(c.id)
+    assert mm.queues == mm.waiting == mm.settings == {}
+
+
+def test_thousands_of_joins_per_second():
+    mm = Matchmaker(lambda settings: "room")
+    boards = [{"nodes": {"a": {"neighbors": [], "position": [0, 0]}}}]
+    start = time.perf_counter()
+    for i in range(20000):
+        mm.join(boards=boards if i % 4 == 0 else None)
+    elapsed = time.perf_counter() - start
+    assert mm.totals["matched"] == 10000
+    assert 20000 / elapsed > 2000
@@ -0,0 +1,72 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import time
+
+import app as moon_app
+
+
+def play_moves(client, room_id, count):
+    game = moon_app.games[room_id]
+    for _ in range(count):
+        player = game["current_player"]
+        card = next(c for c in game["deck_manager"].get_hand(player) if c is not None)
+        node_name = next(name for name, node in game["graph"].nodes.items() if node.value is None)
+        client.post(f"/place/{room_id}", json={"player": player, "node_name": node_name, "value": card})
+
+
+def test_memory_report_breaks_rooms_down_and_undo_history_stays_small():
+    client = moon_app.app.test_client()
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    play_moves(client, room_id, 8)
+    client.post(f"/undo/{room_id}")
+    assert client.post(f"/redo/{room_id}").get_json()["success"]
+
+    report = client.get("/debug/memory?top=1000").get_json()
+    room = report["rooms"][room_id]
+    assert set(room) == {"graph", "tracker", "history", "updates", "settings", "other", "total"}
+    assert room["total"] >= sum(v for k, v in room.items() if k != "total")
+    # Snapshots hold node values and copies of the tracker's lists, not boards
+    assert room["history"] < 3 * room["graph"]  # 8 copies of the board would be over 8
+    assert report["room_count"] == len(moon_app.games) and report["totals"]["total"] >= room["total"]
+
+
+def test_idle_rooms_expire_unless_someone_is_connected():
+    client = moon_app.app.test_client()
+    finished, idle, watched = (client.post("/start_game", json={}).get_json()["room_id"] for _ in range(3))
+    moon_app.games[finished]["replay"]["final_scores"] = {}
+    socket = moon_app.socketio.test_client(moon_app.app)
+    socket.emit("join_room", {"room_id": watched})
+
+    now = time.monotonic()
+    for room_id in (finished, idle, watched):
+        moon_app.games[room_id]["last_active"] = now - moon_app.FINISHED_ROOM_TIMEOUT
+    expired = moon_app.expire_rooms(now)
+    assert finished in expired and idle in moon_app.games and watched in moon_app.games
+
+    moon_app.games[idle]["last_active"] = moon_app.games[watched]["last_active"] = now - moon_app.ROOM_IDLE_TIMEOUT
+    assert idle in moon_app.expire_rooms(now) and watched in moon_app.games
+    socket.disconnect()
+    assert moon_app.expire_rooms(now) == [watched]
+
+
+def test_rooms_a_tournament_or_the_matchmaker_waits_on_do_not_expire():
+    client = moon_app.app.test_client()
+    tournament = client.post("/tournament", json={"players": ["a", "b"], "bestOf": 1}).get_json()
+    in_tournament = tournament["rounds"][0][0]["room_id"]
+    a, b = moon_app.matchmaker.join(), moon_app.matchmaker.join()
+    moon_app.matchmaker.accept(a.id)
+    matched = moon_app.matchmaker.accept(b.id).room_id
+
+    now = time.monotonic()
+    for room_id in (in_tournament, matched):
+        moon_app.games[room_id]["last_active"] = now - moon_app.ROOM_IDLE_TIMEOUT
+    expired = moon_app.expire_rooms(now)
+    assert in_tournament not in expired and matched not in expired
+
+    moon_app.tournaments.rooms.pop(in_tournament)
+    assert in_tournament in moon_app.expire_rooms(now)
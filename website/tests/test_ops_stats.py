@@ -0,0 +1,102 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import json
+
+import app as moon_app
+from ops_stats import OpsStats, SecondRing
+from state_view import EncodedPayload
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_ring_windows_forget_old_seconds():
+    ring = SecondRing(size=5, bounds=(0.01, 0.1, float("inf")))
+    ring.add(100.2, 0.005)
+    ring.add(100.7, 0.05)
+    ring.add(101.5, 0.5)
+
+    window = ring.window(102.0, 2)
+    assert (window["count"], window["max"], window["buckets"]) == (3, 0.5, [1, 1, 1])
+    assert ring.quantile(window, 0.5) == 0.1 and ring.quantile(window, 1.0) == 0.5
+    assert ring.window(101.9, 1)["count"] == 2  # the current second isn't over yet
+
+    ring.add(105.1, 0.005)  # lands in second 100's slot, which is cleared first
+    assert ring.window(106.0, 4)["count"] == 1
+    assert ring.window(106.0, 10)["count"] == 1  # a window is at most size - 1 seconds
+
+
+def test_snapshot_rates_and_slowest_rooms_and_boards():
+    clock = FakeClock()
+    stats = OpsStats(size=10, slow_move=0.1, max_tracked=2, clock=clock)
+    for seconds in (0.01, 0.02, 0.03):
+        stats.record_move("fast", "board-a", 25, seconds)
+    stats.record_move("slow", "board-b", 400, 0.3)
+    stats.record_join()
+    stats.record_emit("state_updated", EncodedPayload({"events": []}))
+    clock.now += 1
+
+    snapshot = stats.snapshot(top=1, window=2)
+    assert (snapshot["moves_per_sec"], snapshot["moves_last_sec"], snapshot["slow_moves"]) == (2.0, 4, 1)
+    assert snapshot["move_ms"]["max"] == 300.0
+    assert snapshot["emit_bytes_per_sec"] == len('{"events":[]}') // 2
+    assert [r["id"] for r in snapshot["slowest_rooms"]] == [stats.room_label("slow")]
+    assert snapshot["slowest_boards"][0] == {"id": "board-b", "moves": 1, "mean_ms": 300.0, "max_ms": 300.0,
+                                             "slow": 1, "nodes": 400}
+
+    stats.record_move("third", "board-a", 25, 0.01)  # the least recently moved room is dropped
+    assert list(stats.rooms) == ["slow", "third"]
+
+    clock.now += 20  # the window has passed; totals stay
+    snapshot = stats.snapshot()
+    assert snapshot["moves_per_sec"] == 0 and snapshot["move_ms"]["p95"] is None
+    assert snapshot["totals"]["moves"] == 5
+
+
+def test_ops_stream_sends_server_sent_events_after_moves():
+    client = moon_app.app.test_client()
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    game = moon_app.games[room_id]
+    socket = moon_app.socketio.test_client(moon_app.app)
+    socket.emit("join_room", {"room_id": room_id})
+    totals = dict(moon_app.ops.totals)
+
+    player = game["current_player"]
+    card = next(c for c in game["deck_manager"].get_hand(player) if c is not None)
+    node_name = next(iter(game["graph"].nodes))
+    assert client.post(f"/place/{room_id}", json={"player": player, "node_name": node_name, "value": card}).get_json()["success"]
+    socket.disconnect()
+
+    token = moon_app.app.config["OPS_TOKEN"]
+    response = client.get(f"/ops/stream?count=1&top=1000&token={token}")
+    assert response.mimetype == "text/event-stream" and response.headers["Cache-Control"] == "no-cache"
+    retry, event = response.get_data(as_text=True).strip().split("\n\n")
+    assert retry.startswith("retry: ")
+    stats = json.loads(event[len("data: "):])
+    assert stats["totals"]["moves"] == totals["moves"] + 1
+    assert stats["totals"]["emits"] > totals["emits"] and stats["totals"]["emit_bytes"] > totals["emit_bytes"]
+    rooms = [r["id"] for r in stats["slowest_rooms"]]
+    assert moon_app.ops.room_label(room_id) in rooms and room_id not in rooms
+    assert game["replay"]["board_id"] in [b["id"] for b in stats["slowest_boards"]]
+    assert client.get(f"/ops?token={token}").status_code == 200
+
+
+def test_ops_routes_want_the_token_and_are_off_without_one():
+    client = moon_app.app.test_client()
+    assert client.get("/ops/stats").status_code == 403
+    assert client.get("/ops/stats?token=wrong").status_code == 403
+    token = moon_app.app.config["OPS_TOKEN"]
+    assert client.get(f"/ops/stats?token={token}").get_json()["rooms"] == len(moon_app.games)
+
+    plain = moon_app.create_app({"OPS_TOKEN": None})
+    assert plain.test_client().get("/ops/stats").status_code == 404
@@ -0,0 +1,109 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+from rate_limit import RateLimiter
+from graph_logic import Graph
+from chain_tracking import find_chains_through_node
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_refills_at_rate_up_to_burst_and_bounds_keys():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2, burst=3, max_keys=2, clock=clock)
+    assert [limiter.allow("a") for _ in range(3)] == [0, 0, 0]
+    assert limiter.allow("a") == 0.5  # one token comes back every half second
+
+    clock.now = 10  # refill never exceeds the burst
+    assert [limiter.allow("a") for _ in range(4)][-1] > 0
+
+    limiter.allow("b")
+    limiter.allow("c")
+    assert list(limiter.buckets) == ["b", "c"]  # "a" was least recently used
+    assert limiter.stats()["limited"] == 2
+
+
+def test_app_answers_429_with_retry_after_and_caps_uploads():
+    import app as moon_app
+    client = moon_app.app.test_client()
+
+    too_big = {"nodes": {f"n{i}": {"position": [i, 0], "neighbors": []} for i in range(1000)}}
+    response = client.post("/start_game", json={"boards": [too_big]})
+    assert response.status_code == 400 and "limit is" in response.get_json()["error"]
+    assert client.post("/start_game", json={"deckType": "finite", "copiesPerPhase": 10 ** 9}).status_code == 400
+    assert client.post("/start_game", json={"deckType": "finite", "copiesPerPhase": True}).status_code == 400
+    board = {**too_big, "nodes": {"a": {"position": [0, 0], "neighbors": []}},
+             "deckSettings": {"deckType": "finite", "copiesPerPhase": "4"}}
+    assert client.post("/start_game", json={"boards": [board]}).status_code == 400
+
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    moon_app.app.config["RATE_LIMITS"] = True
+    try:
+        statuses = [client.post(f"/debug/fill_board/{room_id}").status_code for _ in range(5)]
+        assert statuses[:3] == [200, 200, 200] and statuses[3] == 429
+        limited = client.post(f"/debug/fill_board/{room_id}")
+        assert int(limited.headers["Retry-After"]) >= 1
+    finally:
+        moon_app.app.config["RATE_LIMITS"] = False
+
+
+def test_chain_search_stays_within_budget_on_branching_boards():
+    # Layers of 4 nodes with the same phase, every node linked to the whole
+    # next layer: 4**7 maximal chains if nothing stopped the search
+    graph = Graph()
+    layers = [[graph.add_node(f"{depth}-{i}", (depth, i)) for i in range(4)] for depth in range(8)]
+    for layer, deeper in zip(layers, layers[1:]):
+        for a in layer:
+            for b in deeper:
+                graph.connect_nodes(a, b)
+    for depth, layer in enumerate(layers):
+        for node in layer:
+            node.add_value(depth)
+
+    chains = find_chains_through_node(layers[0][0], graph)
+    assert 0 < len(chains) <= 5000
+
+
+def test_resets_are_limited_per_room_and_proxied_clients_per_forwarded_ip():
+    import app as moon_app
+    app = moon_app.create_app({"RATE_LIMITS": True, "TRUSTED_PROXIES": 1})
+    client = app.test_client()
+    room_id = client.post("/start_game", json={}, headers={"X-Forwarded-For": "198.51.100.1"}).get_json()["room_id"]
+    statuses = [client.post(f"/reset/{room_id}", headers={"X-Player-ID": "player1"}).status_code for _ in range(6)]
+    assert statuses[:5] == [200] * 5 and statuses[5] == 429
+
+    # Behind one trusted proxy each forwarded client has its own bucket
+    other_room = client.post("/start_game", json={}, headers={"X-Forwarded-For": "198.51.100.2"}).get_json()["room_id"]
+    first = [client.post(f"/debug/fill_board/{other_room}", headers={"X-Forwarded-For": "198.51.100.3"}).status_code
+             for _ in range(4)]
+    assert first == [200, 200, 200, 429]
+    room_3 = client.post("/start_game", json={}, headers={"X-Forwarded-For": "198.51.100.2"}).get_json()["room_id"]
+    assert client.post(f"/debug/fill_board/{room_3}", headers={"X-Forwarded-For": "198.51.100.4"}).status_code == 200
+    assert client.post(f"/debug/fill_board/{room_3}", headers={"X-Forwarded-For": "198.51.100.3"}).status_code == 429
+
+
+def test_socket_new_board_requests_share_the_room_bucket():
+    import app as moon_app
+    client = moon_app.app.test_client()
+    board = moon_app.games[client.post("/start_game", json={}).get_json()["room_id"]]["graph"].to_dict()
+    room_id = client.post("/start_game", json={"boards": [board]}).get_json()["room_id"]
+    socket = moon_app.socketio.test_client(moon_app.app)
+    moon_app.app.config["RATE_LIMITS"] = True
+    try:
+        for _ in range(6):
+            socket.emit("new_random_board", {"room_id": room_id, "player": "player1"})
+    finally:
+        moon_app.app.config["RATE_LIMITS"] = False
+    errors = [e["args"][0] for e in socket.get_received() if e["name"] == "error"]
+    assert [e["message"] for e in errors] == ["Too many requests"]
+    socket.disconnect()
@@ -0,0 +1,114 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import random
+
+from ratings import SkipList, RatingStore, elo_update
+
+
+def test_skip_list_rank_and_slice_match_sorted_order():
+    rng = random.Random(7)
+    skip, present = SkipList(seed=1), set()
+    for _ in range(3000):
+        key = rng.randrange(500)
+        if key in present and rng.random() < 0.5:
+            assert skip.remove(key)
+            present.discard(key)
+        elif key not in present:
+            skip.insert(key)
+            present.add(key)
+
+    ordered = sorted(present)
+    assert len(skip) == len(ordered)
+    assert [skip.rank(k) for k in ordered] == list(range(1, len(ordered) + 1))
+    assert skip.rank(-1) is None and not skip.remove(-1)
+    assert skip.slice(1, len(ordered) + 5) == ordered
+    assert skip.slice(20, 10) == ordered[19:29]
+
+
+def test_elo_is_zero_sum_and_favours_the_upset():
+    a, b = elo_update(1500, 1500, 1)
+    assert (a, b) == (1516, 1484)
+    upset_a, _ = elo_update(1400, 1600, 1)
+    assert upset_a - 1400 > 16
+    draw_a, draw_b = elo_update(1600, 1400, 0.5)
+    assert draw_a < 1600 and draw_a + draw_b == 3000
+
+
+def test_results_update_leaderboard_once_and_persist(tmp_path):
+    path = str(tmp_path / "ratings.db")
+    store = RatingStore(path)
+    alice, bob, carol = (store.create_player(name)["player_id"] for name in ("alice", "bob", "carol"))
+
+    assert store.record_result("g1", alice, bob, {1: 12, 2: 7}) == 16
+    assert store.record_result("g1", alice, bob, {1: 12, 2: 7}) is None  # already rated
+    store.record_result("g2", carol, bob, {1: 5, 2: 5})
+
+    board = store.leaderboard()
+    assert [p["name"] for p in board] == ["alice", "carol", "bob"]
+    assert store.get(bob)["rank"] == 3 and store.get(bob)["losses"] == 1
+
+    reopened = RatingStore(path)
+    assert reopened.leaderboard() == board
+    assert reopened.leaderboard(limit=1, offset=1)[0]["name"] == "carol"
+
+
+def test_finished_game_between_seated_players_is_rated():
+    import app as moon_app
+    moon_app.rating_store = RatingStore(":memory:")
+    client = moon_app.app.test_client()
+
+    room_id = client.post("/start_game", json={"deckType": "finite", "copiesPerPhase": 4}).get_json()["room_id"]
+    players = [client.post("/players", json={"name": n}).get_json() for n in ("p1", "p2")]
+    ids = [p["player_id"] for p in players]
+    for seat, player in zip(("player1", "player2"), players):
+        assert client.post(f"/seat/{room_id}", json={"seat_token": player["seat_token"]},
+                           headers={"X-Player-ID": seat}).status_code == 200
+    # The public id doesn't seat anyone, and a held seat isn't handed to another player
+    assert client.post(f"/seat/{room_id}", json={"player_id": ids[0], "seat_token": ids[0]},
+                       headers={"X-Player-ID": "player1"}).status_code == 403
+    assert client.post(f"/seat/{room_id}", json={"seat_token": players[1]["seat_token"]},
+                       headers={"X-Player-ID": "player1"}).status_code == 409
+
+    game = moon_app.games[room_id]
+    result = {"game_over": False}
+    while not result["game_over"]:
+        player = game["current_player"]
+        card = next(c for c in game["deck_manager"].get_hand(player) if c is not None)
+        node = next(name for name, n in game["graph"].nodes.items() if n.value is None)
+        move = {"player": player, "node_name": node, "value": card}
+        # Each seat moves only with its own player's token
+        for token in (None, players[2 - player]["seat_token"]):
+            response = client.post(f"/place/{room_id}", json=move, headers={"X-Seat-Token": token} if token else {})
+            assert response.status_code == 403
+        result = client.post(f"/place/{room_id}", json=move,
+                             headers={"X-Seat-Token": players[player - 1]["seat_token"]}).get_json()
+
+    board = client.get("/leaderboard").get_json()
+    assert board["total"] == 2
+    assert sum(p["rating"] for p in board["players"]) == 3000
+    assert client.get(f"/players/{ids[0]}").get_json()["games"] == 1
+    assert "seat_token" not in client.get(f"/players/{ids[0]}").get_json()
+    assert all("seat_token" not in p for p in board["players"])
+
+
+def test_a_seat_that_has_moved_unclaimed_cannot_be_claimed():
+    import app as moon_app
+    moon_app.rating_store = RatingStore(":memory:")
+    client = moon_app.app.test_client()
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    game = moon_app.games[room_id]
+    player = game["current_player"]
+    card = next(c for c in game["deck_manager"].get_hand(player) if c is not None)
+    node = next(iter(game["graph"].nodes))
+    assert client.post(f"/place/{room_id}", json={"player": player, "node_name": node, "value": card}).get_json()["success"]
+
+    token = client.post("/players", json={"name": "late"}).get_json()["seat_token"]
+    assert client.post(f"/seat/{room_id}", json={"seat_token": token},
+                       headers={"X-Player-ID": f"player{player}"}).status_code == 409
+    assert client.post(f"/seat/{room_id}", json={"seat_token": token},
+                       headers={"X-Player-ID": f"player{3 - player}"}).status_code == 200
@@ -0,0 +1,141 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import asyncio
+import json
+
+from werkzeug.test import Client
+
+import app as moon_app
+from realtime import AsyncServerTransport, Engine
+from state_view import encode
+
+
+class RecordingTransport:
+    def __init__(self):
+        self.emitted = []
+        self.rooms = []
+
+    def emit(self, event, data, to=None):
+        self.emitted.append((event, data, to))
+
+    def enter_room(self, sid, room):
+        self.rooms.append((sid, room))
+
+
+class FakeAsyncServer:
+    def __init__(self):
+        self.sent = []
+
+    async def emit(self, event, data, to=None):
+        await asyncio.sleep(0.001 if data == 1 else 0)  # a slow first send mustn't be overtaken
+        self.sent.append(("emit", event, data, to))
+
+    async def enter_room(self, sid, room):
+        self.sent.append(("enter_room", sid, room))
+
+
+def test_join_game_is_the_same_for_either_server():
+    transport = RecordingTransport()
+    previous = moon_app.realtime
+    moon_app.use_transport(transport)
+    try:
+        room_id = moon_app.app.test_client().post("/start_game", json={}).get_json()["room_id"]
+        moon_app.join_game("sid-1", {"room_id": room_id})
+    finally:
+        moon_app.use_transport(previous)
+
+    assert transport.rooms == [("sid-1", room_id)]
+    [(event, payload)] = [(e, data) for e, data, to in transport.emitted if to == "sid-1"]
+    assert event == "state_updated"
+    assert payload["graph"] == moon_app.games[room_id]["graph"].to_dict()
+
+
+def test_reconnecting_client_gets_a_snapshot_with_the_updates_it_missed():
+    client = moon_app.app.test_client()
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    game = moon_app.games[room_id]
+    for _ in range(3):
+        player = game["current_player"]
+        card = next(c for c in game["deck_manager"].get_hand(player) if c is not None)
+        node = next(name for name, n in game["graph"].nodes.items() if n.value is None)
+        client.post(f"/place/{room_id}", json={"player": player, "node_name": node, "value": card})
+    version = game["sync"].version
+
+    transport = RecordingTransport()
+    previous = moon_app.realtime
+    moon_app.use_transport(transport)
+    try:
+        moon_app.join_game("sid-1", {"room_id": room_id, "last_version": version - 1})
+        moon_app.join_game("sid-2", {"room_id": room_id, "last_version": version - 3})
+        moon_app.join_game("sid-3", {"room_id": room_id, "last_version": version})
+        moon_app.join_game("sid-4", {"room_id": room_id, "last_version": [version]})
+    finally:
+        moon_app.use_transport(previous)
+
+    def received(sid):
+        return [json.loads(encode(data)) for _, data, to in transport.emitted if to == sid]
+
+    [one_missed], [many_missed] = received("sid-1"), received("sid-2")
+    assert one_missed["version"] == many_missed["version"] == version
+    assert [u["version"] for u in one_missed["missed"]] == [version]
+    assert [u["version"] for u in many_missed["missed"]] == [version - 2, version - 1, version]
+    assert all(u["last_move"] and "graph" not in u for u in many_missed["missed"])  # the moves, not whole states
+    assert many_missed["graph"] == json.loads(encode(game["graph"].to_dict()))
+    assert received("sid-3") == []  # up to date
+    [snapshot] = received("sid-4")  # not a version: a plain snapshot
+    assert "missed" not in snapshot and snapshot["version"] == version
+
+
+def test_async_transport_keeps_order_and_background_tasks_share_the_engine():
+    engine = Engine()
+    server = FakeAsyncServer()
+    transport = AsyncServerTransport(server, engine)
+    steps = []
+
+    def task():
+        steps.append("task")
+        transport.sleep(0.05)  # releases the engine while it waits
+        steps.append("task woke")
+
+    async def main():
+        runner = asyncio.ensure_future(transport.run())
+        await asyncio.sleep(0)
+        thread = transport.start_background_task(task)
+        await asyncio.sleep(0.01)
+        await asyncio.get_running_loop().run_in_executor(None, engine.run, steps.append, "request")
+
+        def send():
+            transport.enter_room("sid-1", "room")
+            for i in (1, 2, 3):
+                transport.emit("state_updated", i, to="room")
+        await asyncio.get_running_loop().run_in_executor(None, engine.run, send)
+        await asyncio.get_running_loop().run_in_executor(None, thread.join)
+        await asyncio.sleep(0.05)
+        runner.cancel()
+
+    asyncio.run(main())
+    assert steps == ["task", "request", "task woke"]
+    assert server.sent == [("enter_room", "sid-1", "room")] + [("emit", "state_updated", i, "room") for i in (1, 2, 3)]
+    assert not engine.lock.locked()
+
+
+def test_ops_stream_snapshots_under_the_engine_lock_but_sends_outside_it(monkeypatch):
+    engine = Engine()
+    locked = []
+    snapshot = moon_app.ops_snapshot
+    monkeypatch.setattr(moon_app, "ops_snapshot", lambda top: locked.append(engine.lock.locked()) or snapshot(top))
+    previous = moon_app.realtime
+    moon_app.use_transport(AsyncServerTransport(FakeAsyncServer(), engine))
+    try:
+        client = Client(engine.wrap_wsgi(moon_app.app.wsgi_app))
+        token = moon_app.app.config["OPS_TOKEN"]
+        body = client.get(f"/ops/stream?count=1&token={token}").get_data(as_text=True)
+    finally:
+        moon_app.use_transport(previous)
+    assert locked == [True] and "data: " in body
+    assert not engine.lock.locked()
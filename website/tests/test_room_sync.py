@@ -0,0 +1,51 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+from room_sync import RoomSync
+
+
+def test_reconnect_gets_only_missed_updates():
+    sync = RoomSync(backlog_size=4)
+    for i in range(3):
+        sync.record({"events": [i]})
+
+    assert [p["events"] for p in sync.since(1)] == [[1], [2]]
+    assert sync.since(3) == []
+    assert sync.since(None) is None
+    assert sync.since(7) is None  # version from before a restart
+    assert sync.since("1") is None and sync.since([1]) is None and sync.since(True) is None
+
+
+def test_trimmed_backlog_falls_back_to_snapshot():
+    sync = RoomSync(backlog_size=2)
+    for i in range(5):
+        sync.record({"events": [i]})
+
+    assert sync.since(2) is None
+    assert [p["version"] for p in sync.since(3)] == [4, 5]
+
+
+def test_snapshot_is_built_once_per_version():
+    sync = RoomSync()
+    builds = []
+
+    def build():
+        builds.append(sync.version)
+        return {"events": []}
+
+    first = sync.snapshot(build)
+    assert sync.snapshot(build) is first
+    sync.record({"events": ["placed"]})
+    assert sync.snapshot(build)["version"] == 1
+    assert builds == [0, 1]
+
+
+def test_backlog_keeps_only_the_compacted_update():
+    sync = RoomSync(backlog_size=4, compact=lambda update: dict(update, compacted=True))
+    payload = sync.record({"graph": "whole state", "events": ["placed"]}, {"events": ["placed"]})
+    assert payload["version"] == 1
+    assert sync.since(0) == [{"events": ["placed"], "version": 1, "compacted": True}]
@@ -25,7 +25,8 @@ def test_single_phase_pair_scoring():
     node2.add_value(4)
 
     # Player 1 places the second 4
-    points, claimed = tracker.update_score_for_pair(1, scorer, node2)
+    events = tracker.update_score_for_pair(1, scorer, node2)
+    points = sum(event["points"] for event in events)
 
     assert points == 1
     assert tracker.get_scores()[1] == 1
@@ -51,7 +52,8 @@ def test_reclaim_phase_pair_by_other_player():
     nodeB.add_neighbor(nodeC)
     nodeC.add_neighbor(nodeB)
     nodeC.add_value(4)
-    points, claimed = tracker.update_score_for_pair(2, scorer, nodeC)
+    events = tracker.update_score_for_pair(2, scorer, nodeC)
+    points = sum(event["points"] for event in events)
 
     assert points == 1
     assert tracker.get_scores()[2] == 1
@@ -79,7 +81,8 @@ def test_scoring_multiple_phase_pairs():
 
     # Player 1 places in the middle
     nodeB.add_value(4)
-    points, claimed = tracker.update_score_for_pair(1, scorer, nodeB)
+    events = tracker.update_score_for_pair(1, scorer, nodeB)
+    points = sum(event["points"] for event in events)
 
     assert points == 2
     assert tracker.get_scores()[1] == 2
@@ -0,0 +1,91 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import pytest
+
+from graph_logic import Graph
+from strategies.registry import evaluator_for_board
+from scoring_pool import ScoringFailed, ScoringPool, ScoringUnavailable
+
+
+def line_board(values):
+    graph = Graph()
+    names = [f"n{i}" for i in range(len(values))]
+    for i, name in enumerate(names):
+        graph.add_node(name, (i, 0))
+    for a, b in zip(names, names[1:]):
+        graph.connect_nodes(graph.nodes[a], graph.nodes[b])
+    for name, value in zip(names, values):
+        graph.nodes[name].value = value
+    return graph
+
+
+def normalized(events):
+    # `claimed` and `connections` come from sets, so their order isn't stable across processes
+    return [{**e, "claimed": sorted(e["claimed"]), "connections": sorted(map(tuple, e["connections"]))} for e in events]
+
+
+def test_worker_events_match_inline_scoring_and_timeouts_replace_the_worker():
+    graph = line_board([1, 2, 3, 4, 4])
+    expected = evaluator_for_board().evaluate(1, graph.nodes["n2"], graph)
+
+    pool = ScoringPool(processes=1, timeout=0.001)
+    try:
+        # Filling layers of 4 fully linked nodes makes long branching chains: far
+        # more than a millisecond of work. The worker's startup doesn't count.
+        dense = Graph()
+        layers = [[dense.add_node(f"{d}-{i}", (d, i)) for i in range(4)] for d in range(100)]
+        for layer, deeper in zip(layers, layers[1:]):
+            for a in layer:
+                for b in deeper:
+                    dense.connect_nodes(a, b)
+        placements = [(1, node.name, d % 8) for d, layer in enumerate(layers) for node in layer]
+        with pytest.raises(ScoringUnavailable):
+            pool.run("fill", dense.to_compact(), None, placements, key="room")
+        pool.timeout = 30
+        events = pool.run("score", graph.to_compact(), None, 1, "n2", key="room")
+        assert normalized(events) == normalized(expected)
+        with pytest.raises(ScoringFailed):
+            pool.run("score", graph.to_compact(), None, 1, "no-such-node", key="room")
+
+        stats = pool.stats()
+        assert (stats["timeouts"], stats["completed"], stats["failed"], stats["busy"], stats["queued"]) == (1, 1, 1, 0, 0)
+        assert stats["job_time"]["count"] == 2
+    finally:
+        for worker in pool.workers:
+            worker.stop()
+
+
+def test_one_job_per_room_at_a_time():
+    pool = ScoringPool(processes=0)
+    graph = line_board([0, 1, None])
+    pool.in_flight.add("busy-room")
+    with pytest.raises(ScoringUnavailable):
+        pool.run("fill", graph.to_compact(), None, [(1, "n2", 2)], key="busy-room")
+    [events] = pool.run("fill", graph.to_compact(), None, [(1, "n2", 2)], key="other-room")
+    assert [e["type"] for e in events] == ["lunar_cycle"]
+    assert pool.stats()["rejected"] == 1
+
+
+def test_failed_scoring_job_leaves_the_game_unchanged(monkeypatch):
+    import app as moon_app
+    client = moon_app.app.test_client()
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    game = moon_app.games[room_id]
+    player = game["current_player"]
+    hand = list(game["deck_manager"].get_hand(player))
+    version = game["sync"].version
+
+    def failing_run(*args, **kwargs):
+        raise ScoringFailed("Traceback: KeyError")
+
+    monkeypatch.setattr(moon_app.scoring_pool, "run", failing_run)
+    node = next(iter(game["graph"].nodes))
+    response = client.post(f"/place/{room_id}", json={"player": player, "node_name": node, "value": hand[0]})
+    assert response.status_code == 503 and "Traceback" not in response.get_json()["error"]
+    assert game["sync"].version == version and game["deck_manager"].get_hand(player) == hand
+    assert game["graph"].nodes[node].value is None and game["current_player"] == player
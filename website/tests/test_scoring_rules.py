@@ -0,0 +1,138 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import random
+import pytest
+from board_generator import SHAPES
+from graph_logic import Graph
+from score_tracker import ScoreTracker
+from strategies.phase_pair import PhasePair
+from strategies.full_moon_pair import FullMoonPair
+from strategies.lunar_cycle import LunarCycle
+from strategies.registry import ScoringEvaluator, build_rules, evaluator_for_board
+
+
+def make_line(values):
+    """A path graph A—B—C—... with the given values (None leaves a node empty)."""
+    graph = Graph()
+    names = [chr(ord("A") + i) for i in range(len(values))]
+    for i, name in enumerate(names):
+        graph.add_node(name, (i, 0))
+    for a, b in zip(names, names[1:]):
+        graph.connect_nodes(graph.nodes[a], graph.nodes[b])
+    for name, value in zip(names, values):
+        if value is not None:
+            graph.nodes[name].add_value(value)
+    return graph
+
+
+def test_evaluator_matches_sequential_modules():
+    graph = make_line([1, 2, 3, 7, 3])
+    node = graph.nodes["C"]
+
+    sequential = ScoreTracker()
+    expected = sequential.update_score_for_pair(1, PhasePair(), node)
+    expected += sequential.update_score_for_pair(1, FullMoonPair(), node)
+    expected += sequential.update_score_for_cycle(1, LunarCycle(), node, graph)
+
+    tracker = ScoreTracker()
+    events = tracker.score_placement(1, node, graph, ScoringEvaluator(build_rules()))
+
+    assert [e["type"] for e in events] == [e["type"] for e in expected]
+    assert tracker.get_scores() == sequential.get_scores()
+    assert tracker.get_all_claimed_cards() == sequential.get_all_claimed_cards()
+    assert tracker.full_moon_pairs == [("C", "D")]
+    assert tracker.lunar_cycle_chains == [["C", "B", "A"]]
+
+
+def test_board_can_disable_and_configure_rules():
+    graph = make_line([3, 7, 3])
+    node = graph.nodes["B"]
+
+    evaluator = evaluator_for_board({"scoringRules": {"full_moon_pair": {"points": 5}}})
+    events = evaluator.evaluate(2, node, graph)
+
+    assert [e["type"] for e in events] == ["full_moon_pair", "full_moon_pair"]
+    assert sum(e["points"] for e in events) == 10
+
+
+def test_rules_without_matching_neighbors_are_skipped():
+    class Exploding:
+        name = "exploding"
+
+        def wants(self, node, neighbor):
+            return False
+
+        def score(self, player, node, graph, neighbors):
+            raise AssertionError("should not be called")
+
+    graph = make_line([0, 2])
+    evaluator = ScoringEvaluator(build_rules() + [Exploding()])
+    assert evaluator.evaluate(1, graph.nodes["B"], graph) == []
+
+
+def test_candidates_match_evaluating_each_phase():
+    rng = random.Random(0)
+    evaluator = evaluator_for_board()
+    for _ in range(20):
+        graph = Graph.from_dict(SHAPES["hex"](4, rng))
+        nodes = list(graph.nodes.values())
+        for node in nodes:
+            node.value = rng.choice([None, *range(8)])
+        node = rng.choice(nodes)
+        node.value = None
+
+        candidates = evaluator.evaluate_candidates(1, node, graph)
+        for phase in range(8):
+            node.value = phase
+            assert candidates[phase] == evaluator.evaluate(1, node, graph)
+        node.value = None
+
+
+def test_candidates_share_one_chain_search_budget():
+    # Layers of 4 nodes, each linked to the whole next layer: every chain search from the middle
+    # would fill a placement's budget, so each phase is ranked on its share of one
+    graph = Graph()
+    layers = [[graph.add_node(f"{depth}-{i}", (depth, i)) for i in range(4)] for depth in range(12)]
+    for layer, deeper in zip(layers, layers[1:]):
+        for a in layer:
+            for b in deeper:
+                graph.connect_nodes(a, b)
+    for depth, layer in enumerate(layers):
+        for node in layer:
+            node.add_value(depth % 8)
+    node = layers[6][0]
+    node.value = None
+
+    evaluator = evaluator_for_board()
+    candidates = evaluator.assess_candidates(1, node, graph)
+    assert max(candidates.values(), key=lambda c: c.points).phase == 6
+    for phase in (0, 4, 6):
+        events = candidates[phase].events()
+        node.value = phase
+        full = evaluator.evaluate(1, node, graph)
+        node.value = None
+        assert candidates[phase].points < sum(e["points"] for e in full)
+        assert events == full  # searched again in full when played
+
+
+def test_unknown_rule_raises():
+    with pytest.raises(ValueError):
+        build_rules(["no_such_rule"])
+
+
+def test_bad_scoring_rules_are_rejected_before_a_room_is_dealt():
+    import app as moon_app
+    from board_generator import generate_board
+    client = moon_app.app.test_client()
+    for rules in (["bogus"], {"phase_pair": {"nope": 1}}, "phase_pair", {"phase_pair": {"points": "3"}},
+                  {"full_moon_pair": [2]}):
+        board = dict(generate_board("grid", 3, 0), scoringRules=rules)
+        response = client.post("/start_game", json={"boards": [board]})
+        assert response.status_code == 400 and "scoringRules" in response.get_json()["error"]
+        assert client.post("/matchmaking/join", json={"boards": [board]}).status_code == 400
+    assert client.post("/start_game", json=[1, 2]).status_code == 400
@@ -0,0 +1,83 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import json
+
+from spectators import SpectatorBroadcaster, spectator_room
+from state_view import encode
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.emitted = []
+        self.tasks = []
+
+    def emit(self, event, payload, to=None):
+        self.emitted.append((event, payload, to))
+
+    def start_background_task(self, target):
+        self.tasks.append(target)
+        return target
+
+    def sleep(self, seconds):
+        pass
+
+
+def test_nothing_is_queued_without_watchers():
+    socketio = FakeSocketIO()
+    broadcaster = SpectatorBroadcaster(socketio, interval=1.0)
+    broadcaster.publish("moon-a", {"events": []})
+    broadcaster.flush(now=10.0)
+    assert socketio.emitted == []
+
+
+def test_fast_updates_are_coalesced_and_rate_limited():
+    socketio = FakeSocketIO()
+    broadcaster = SpectatorBroadcaster(socketio, interval=1.0)
+    broadcaster.add_watcher("moon-a")
+    broadcaster.add_watcher("moon-a")
+    assert len(socketio.tasks) == 1
+
+    broadcaster.publish("moon-a", {"current_player": 2, "events": ["reset"], "new_game": True})
+    broadcaster.publish("moon-a", {"current_player": 1, "events": [{"type": "phase_pair"}]})
+    broadcaster.flush(now=10.0)
+
+    assert socketio.emitted == [("state_updated", {
+        "current_player": 1,
+        "events": ["reset", {"type": "phase_pair"}],
+        "new_game": True,
+    }, spectator_room("moon-a"))]
+
+    broadcaster.publish("moon-a", {"current_player": 2, "events": []})
+    broadcaster.flush(now=10.5)
+    assert len(socketio.emitted) == 1  # still inside the interval
+    broadcaster.flush(now=11.0)
+    assert socketio.emitted[-1][1]["current_player"] == 2
+
+
+def test_last_watcher_leaving_drops_pending_updates():
+    socketio = FakeSocketIO()
+    broadcaster = SpectatorBroadcaster(socketio, interval=1.0)
+    broadcaster.add_watcher("moon-a")
+    broadcaster.publish("moon-a", {"events": []})
+    broadcaster.remove_watcher("moon-a")
+    broadcaster.flush(now=10.0)
+    assert socketio.emitted == []
+
+
+def test_merged_update_keeps_the_state_it_was_published_with():
+    socketio = FakeSocketIO()
+    broadcaster = SpectatorBroadcaster(socketio, interval=1.0)
+    broadcaster.add_watcher("moon-a")
+    phase_pairs = [["a", "b"]]  # a tracker's own list, which later moves append to
+    broadcaster.publish("moon-a", {"connections": {"phase_pairs": []}, "events": ["placed"]})
+    broadcaster.publish("moon-a", {"connections": {"phase_pairs": phase_pairs}, "events": ["scored"]})
+    phase_pairs.append(["c", "d"])
+    broadcaster.flush(now=10.0)
+
+    [(_, payload, _)] = socketio.emitted
+    assert json.loads(encode(payload)) == {"connections": {"phase_pairs": [["a", "b"]]}, "events": ["placed", "scored"]}
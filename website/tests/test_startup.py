@@ -0,0 +1,76 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import subprocess
+
+
+WEBSITE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Generous enough for a slow CI box; a cold start over these times out scale-from-zero requests
+IMPORT_BUDGET_SECONDS = 1.5
+FIRST_REQUEST_BUDGET_SECONDS = 3.0
+
+
+def run_python(*args):
+    result = subprocess.run([sys.executable, *args], cwd=WEBSITE_DIR, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    return result
+
+
+def test_import_time_budget():
+    stderr = run_python("-X", "importtime", "-c", "import app").stderr
+    imported = {}
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            _, cumulative, name = line.split("|")
+            imported[name.strip()] = int(cumulative) / 1e6
+
+    assert imported["app"] < IMPORT_BUDGET_SECONDS
+    # Patching and optional subsystems wait for create_app() or first use
+    assert "eventlet" not in imported
+    assert "strategies.registry" not in imported
+
+
+def test_time_to_first_request():
+    script = (
+        "import json, app\n"
+        "client = app.create_app().test_client()\n"
+        "print(json.dumps(client.get('/readyz').get_json()))\n"
+    )
+    stdout = run_python("-c", script).stdout
+    ready = json.loads(stdout.strip().splitlines()[-1])
+    assert ready["ready"]
+    assert ready["startup"]["first_request"] < FIRST_REQUEST_BUDGET_SECONDS
+
+
+def test_optional_blueprints_follow_config():
+    import app as moon_app
+    client = moon_app.create_app({"DEBUG_ROUTES": False, "GRAPH_BUILDER": False}).test_client()
+    assert client.get("/graph_builder").status_code == 404
+    assert client.post("/debug/fill_board/moon-none").status_code == 404
+    assert client.get("/readyz").status_code == 200
+
+
+def test_debug_routes_are_off_by_default(monkeypatch):
+    import app as moon_app
+    monkeypatch.delenv("DEBUG_ROUTES")
+    client = moon_app.create_app().test_client()
+    assert client.get("/debug/memory").status_code == 404
+
+
+def test_debug_param_is_ignored_without_debug_routes():
+    import app as moon_app
+    client = moon_app.create_app({"DEBUG_ROUTES": False}).test_client()
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    game = moon_app.games[room_id]
+    player = game["current_player"]
+    card = next(c for c in range(8) if c not in game["deck_manager"].get_hand(player))
+    node = next(iter(game["graph"].nodes))
+    response = client.post(f"/place/{room_id}?debug=true", json={"player": player, "node_name": node, "value": card})
+    assert response.get_json()["error"] == "Card not in hand"
+    assert all(n.value is None for n in game["graph"].nodes.values())
+    state = client.get(f"/state/{room_id}?debug=true", headers={"X-Player-ID": "player1"}).get_json()
+    assert state["hand"] == game["deck_manager"].get_hand(1)
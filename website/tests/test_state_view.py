@@ -0,0 +1,67 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+import json
+import threading
+import time
+
+import app as moon_app
+from state_view import EncodedPayload, encode, state_view
+
+
+def test_payloads_built_on_a_base_encode_like_plain_json():
+    base = EncodedPayload({"graph": {"nodes": {"a": {"value": None}}}, "scores": {"1": 0, "2": 3}})
+    update = EncodedPayload({"events": ["reset"], "hand": [1, None]}, base=base)
+    update["version"] = 7
+    assert json.loads(update.text) == {**base, "events": ["reset"], "hand": [1, None], "version": 7}
+    assert update.text.startswith(base.text[:-1])
+
+    # overriding a base field falls back to encoding the whole payload
+    assert json.loads(EncodedPayload({"scores": {}}, base=base).text)["scores"] == {}
+    assert json.loads(encode({"state": update, "success": True}))["state"]["version"] == 7
+
+
+def test_state_view_is_built_once_per_room_version():
+    client = moon_app.app.test_client()
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    game = moon_app.games[room_id]
+    view = state_view(game)
+    assert state_view(game) is view
+
+    state = client.get(f"/state/{room_id}", headers={"X-Player-ID": "player1"}).get_json()
+    assert state["hand"] == game["deck_manager"].get_hand(1)
+    assert state["version"] == game["sync"].version
+
+    node_name = next(name for name, node in state["graph"]["nodes"].items() if node["value"] is None)
+    client.post(f"/place/{room_id}", json={"player": 1, "node_name": node_name, "value": state["hand"][0]})
+    assert state_view(game) is not view
+    assert state_view(game)["graph"]["nodes"][node_name]["value"] == state["hand"][0]
+
+
+def test_polls_get_304_until_the_room_changes_and_long_polls_wait_for_it():
+    client = moon_app.app.test_client()
+    room_id = client.post("/start_game", json={}).get_json()["room_id"]
+    headers = {"X-Player-ID": "player1"}
+    first = client.get(f"/state/{room_id}", headers=headers)
+    etag = first.headers["ETag"]
+    assert client.get(f"/state/{room_id}", headers={**headers, "If-None-Match": etag}).status_code == 304
+    assert client.get(f"/state/{room_id}", headers={"X-Player-ID": "player2", "If-None-Match": etag}).status_code == 200
+    final_etag = client.get(f"/final_scores/{room_id}").headers["ETag"]
+    assert client.get(f"/final_scores/{room_id}", headers={"If-None-Match": final_etag}).status_code == 304
+    scores_etag = client.get(f"/scores/{room_id}").headers["ETag"]
+
+    state = first.get_json()
+    node_name = next(name for name, node in state["graph"]["nodes"].items() if node["value"] is None)
+    mover = threading.Timer(0.2, client.post, (f"/place/{room_id}",),
+                            {"json": {"player": 1, "node_name": node_name, "value": state["hand"][0]}})
+    mover.start()
+    started = time.monotonic()
+    polled = client.get(f"/state/{room_id}?wait=5", headers={**headers, "If-None-Match": etag})
+    mover.join()
+    assert polled.status_code == 200 and 0.1 < time.monotonic() - started < 4
+    assert polled.get_json()["version"] == state["version"] + 1
+    assert client.get(f"/scores/{room_id}?wait=0.05", headers={"If-None-Match": scores_etag}).status_code == 200
@@ -0,0 +1,139 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+
+from itertools import combinations, count
+
+from tournament import TournamentManager, round_robin_schedule, swiss_pairings
+
+
+def make_manager():
+    ids = count(1)
+    created = []
+
+    def create_room(settings):
+        created.append(settings)
+        return f"room-{next(ids)}"
+
+    return TournamentManager(create_room), created
+
+
+def finish(manager, room_id, winner_seat):
+    scores = {1: 5, 2: 5}
+    if winner_seat:
+        scores[winner_seat] += 1
+    return manager.game_over(room_id, scores)
+
+
+def test_round_robin_meets_everyone_once():
+    rounds = round_robin_schedule(["a", "b", "c", "d", "e"])
+    pairs = [frozenset(p) for r in rounds for p in r if None not in p]
+    assert len(rounds) == 5
+    assert sorted(map(sorted, pairs)) == sorted(map(sorted, map(frozenset, combinations("abcde", 2))))
+    assert all(sum(None in p for p in r) == 1 for r in rounds)  # one bye per round
+
+
+def test_swiss_avoids_rematches():
+    played = {"a": {"b"}, "b": {"a"}, "c": set(), "d": set()}
+    assert swiss_pairings(["a", "b", "c", "d"], played) == [("a", "c"), ("b", "d")]
+
+
+def test_swiss_pairs_a_field_at_the_player_cap():
+    import app as moon_app
+    players = [f"p{i}" for i in range(moon_app.MAX_TOURNAMENT_PLAYERS)]
+    # Everyone has met both standings neighbours, and the last four need the search to back up
+    played = {p: set() for p in players}
+    for a, b in zip(players, players[1:]):
+        played[a].add(b)
+        played[b].add(a)
+    for a, b in combinations(players[-4:], 2):
+        played[a].add(b)
+        played[b].add(a)
+
+    pairs = swiss_pairings(players, played)
+    assert sorted(p for pair in pairs for p in pair) == sorted(players)
+    assert not any(b in played[a] for a, b in pairs)
+
+    client = moon_app.app.test_client()
+    response = client.post("/tournament", json={"players": players + ["one more"], "format": "swiss"})
+    assert response.status_code == 400
+
+
+def test_series_alternates_seats_and_advances_rounds_on_game_over():
+    manager, created = make_manager()
+    tournament = manager.create(["a", "b", "c", "d"], best_of=3, boards=[{"name": "x"}, {"name": "y"}])
+    assert tournament.total_rounds == 2 and len(created) == 2
+
+    first = tournament.rounds[0][0]
+    assert first.seats == {1: "a", 2: "b"}
+    room = first.room_id
+    finish(manager, room, 1)
+    assert finish(manager, room, 1) is None  # a room only counts once
+    assert first.seats == {1: first.b, 2: first.a}  # second game, seats swapped
+    assert created[-1]["boards"] != created[0]["boards"]  # next board in the pool
+    finish(manager, first.room_id, 2)  # first.a wins again from seat 2
+    assert first.finished and first.winner == first.a
+
+    other = tournament.rounds[0][1]
+    assert len(tournament.rounds) == 1
+    finish(manager, other.room_id, 1)
+    finish(manager, other.room_id, 2)
+    assert len(tournament.rounds) == 2  # round 2 dealt by the last game of round 1
+
+    # Winners meet winners, and nobody meets their round-one opponent again
+    winners = {first.a, other.a}
+    assert {frozenset((s.a, s.b)) for s in tournament.rounds[1]} & {frozenset((first.a, first.b)), frozenset((other.a, other.b))} == set()
+    assert any({s.a, s.b} == winners for s in tournament.rounds[1])
+    assert tournament.current_room(first.a)[0] in manager.rooms
+
+    for series in tournament.rounds[1]:
+        while not series.finished:
+            finish(manager, series.room_id, 1)
+    assert tournament.status == "finished" and not manager.rooms
+    assert tournament.standings()[0]["points"] == 2
+
+
+def test_app_deals_tournament_rooms_and_advances_from_place():
+    import app as moon_app
+    client = moon_app.app.test_client()
+    assert client.post("/tournament", json={"players": ["a"]}).status_code == 400
+
+    data = client.post("/tournament", json={"players": ["a", "b"], "bestOf": 1,
+                                            "deckType": "finite", "copiesPerPhase": 4}).get_json()
+    room_id = data["rounds"][0][0]["room_id"]
+    game = moon_app.games[room_id]
+    result = {"game_over": False}
+    while not result["game_over"]:
+        player = game["current_player"]
+        card = next(c for c in game["deck_manager"].get_hand(player) if c is not None)
+        node = next(name for name, n in game["graph"].nodes.items() if n.value is None)
+        result = client.post(f"/place/{room_id}", json={"player": player, "node_name": node, "value": card}).get_json()
+
+    state = client.get(f"/tournament/{data['tournament_id']}").get_json()
+    assert state["status"] == "finished"
+    assert state["rounds"][0][0]["games"][0]["room_id"] == room_id
+
+
+def test_games_with_debug_moves_are_dealt_again_not_recorded():
+    import app as moon_app
+    client = moon_app.app.test_client()
+    data = client.post("/tournament", json={"players": ["a", "b"], "bestOf": 1,
+                                            "deckType": "finite", "copiesPerPhase": 4}).get_json()
+    room_id = data["rounds"][0][0]["room_id"]
+    game = moon_app.games[room_id]
+    result = {"game_over": False}
+    debug = "?debug=true"
+    while not result["game_over"]:
+        player = game["current_player"]
+        card = next(c for c in game["deck_manager"].get_hand(player) if c is not None)
+        node = next(name for name, n in game["graph"].nodes.items() if n.value is None)
+        result = client.post(f"/place/{room_id}{debug}", json={"player": player, "node_name": node, "value": card}).get_json()
+        debug = ""
+
+    state = client.get(f"/tournament/{data['tournament_id']}").get_json()
+    series = state["rounds"][0][0]
+    assert state["status"] != "finished" and series["games"] == []
+    assert series["room_id"] not in (None, room_id) and series["room_id"] in moon_app.games
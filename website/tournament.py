@@ -0,0 +1,297 @@
+# tournament.py
+
+import math
+import uuid
+
+
+FORMATS = ("swiss", "round_robin")
+
+# Backtracking steps allowed when looking for a Swiss round without rematches
+PAIRING_BUDGET = 10000
+
+
+def round_robin_schedule(players):
+    """Every pairing exactly once, by the circle method. None in a pair is a bye."""
+    slots = list(players) + ([None] if len(players) % 2 else [])
+    half = len(slots) // 2
+    rounds = []
+    for _ in range(len(slots) - 1):
+        rounds.append([(slots[i], slots[-1 - i]) for i in range(half)])
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds
+
+
+def swiss_pairings(ranked, played, budget=PAIRING_BUDGET):
+    """
+    Pair players in standings order, each with the nearest player they
+    haven't met yet. Falls back to plain neighbour pairing if no rematch-free
+    round is found within the budget.
+    """
+    # Depth-first with an explicit stack, one (players left, partner index) per pair, so any field fits
+    stack = []
+    remaining, i = list(ranked), 1
+    while remaining:
+        if i >= len(remaining):
+            if not stack:
+                break
+            remaining, i = stack.pop()  # no partner left for the first player: try the last pair's next one
+            i += 1
+            continue
+        budget -= 1
+        if budget < 0:
+            break
+        if remaining[i] in played[remaining[0]]:
+            i += 1
+            continue
+        stack.append((remaining, i))
+        remaining, i = remaining[1:i] + remaining[i + 1:], 1
+
+    if remaining or not stack:
+        return [(ranked[i], ranked[i + 1]) for i in range(0, len(ranked) - 1, 2)]
+    return [(players[0], players[i]) for players, i in stack]
+
+
+class Series:
+    """A best-of-N match between two players. A series with `b` None is a bye."""
+
+    def __init__(self, a, b, best_of, round_index):
+        self.a = a
+        self.b = b
+        self.best_of = best_of
+        self.round_index = round_index
+        self.games = []      # {"room_id", "seats", "winner"} per finished game
+        self.wins = {a: 0, b: 0}
+        self.room_id = None  # room of the game being played
+        self.seats = None    # {1: player, 2: player} in that room
+
+    @property
+    def finished(self):
+        if self.b is None:
+            return True
+        needed = self.best_of // 2 + 1
+        return max(self.wins.values()) >= needed or len(self.games) >= self.best_of
+
+    @property
+    def winner(self):
+        if self.b is None:
+            return self.a
+        if not self.finished or self.wins[self.a] == self.wins[self.b]:
+            return None
+        return self.a if self.wins[self.a] > self.wins[self.b] else self.b
+
+    def next_seats(self):
+        """Players swap seats, and so who moves first, every game."""
+        return {1: self.a, 2: self.b} if len(self.games) % 2 == 0 else {1: self.b, 2: self.a}
+
+    def record(self, final_scores):
+        s1, s2 = final_scores[1], final_scores[2]
+        winner = self.seats[1] if s1 > s2 else self.seats[2] if s2 > s1 else None
+        self.games.append({"room_id": self.room_id, "seats": self.seats, "winner": winner})
+        if winner is not None:
+            self.wins[winner] += 1
+        self.room_id = self.seats = None
+
+    def to_dict(self):
+        return {
+            "players": [self.a, self.b],
+            "round": self.round_index + 1,
+            "best_of": self.best_of,
+            "wins": [self.wins[self.a], self.wins.get(self.b, 0)],
+            "games": [{**g, "seats": {str(k): v for k, v in g["seats"].items()}} for g in self.games],
+            "room_id": self.room_id,
+            "seats": {str(seat): player for seat, player in self.seats.items()} if self.seats else None,
+            "finished": self.finished,
+            "winner": self.winner,
+        }
+
+
+class Tournament:
+    def __init__(self, players, format="swiss", best_of=3, boards=None, rounds=None,
+                 deck_type="infinite", copies_per_phase=None):
+        if format not in FORMATS:
+            raise ValueError(f"Unknown format: {format}")
+        if len(players) < 2 or len(set(players)) != len(players):
+            raise ValueError("A tournament needs at least two distinct players")
+        if best_of < 1 or best_of % 2 == 0:
+            raise ValueError("best_of must be a positive odd number")
+
+        self.id = uuid.uuid4().hex[:10]
+        self.players = list(players)
+        self.format = format
+        self.best_of = best_of
+        self.boards = boards or []
+        self.deck_type = deck_type
+        self.copies_per_phase = copies_per_phase
+
+        if format == "round_robin":
+            self.schedule = round_robin_schedule(self.players)
+            self.total_rounds = len(self.schedule)
+        else:
+            self.schedule = None
+            default = max(1, math.ceil(math.log2(len(self.players))))
+            self.total_rounds = min(rounds or default, len(self.players) - 1 + len(self.players) % 2)
+
+        self.rounds = []  # list of lists of Series
+        self.status = "running"
+
+    def standings(self):
+        """
+        Players by series points (win 1, draw 0.5, bye 1), then Buchholz
+        (their opponents' points), then games won.
+        """
+        points = {p: 0.0 for p in self.players}
+        games_won = {p: 0 for p in self.players}
+        opponents = {p: [] for p in self.players}
+        for series in (s for r in self.rounds for s in r if s.finished):
+            if series.b is None:
+                points[series.a] += 1
+                continue
+            winner = series.winner
+            for player, other in ((series.a, series.b), (series.b, series.a)):
+                points[player] += 1 if winner == player else 0.5 if winner is None else 0
+                games_won[player] += series.wins[player]
+                opponents[player].append(other)
+
+        buchholz = {p: sum(points[o] for o in opponents[p]) for p in self.players}
+        ranked = sorted(self.players, key=lambda p: (-points[p], -buchholz[p], -games_won[p], self.players.index(p)))
+        return [
+            {"rank": i + 1, "player": p, "points": points[p], "buchholz": buchholz[p], "games_won": games_won[p]}
+            for i, p in enumerate(ranked)
+        ]
+
+    def pair_next_round(self):
+        """Series for the next round, or None once every round has been played."""
+        index = len(self.rounds)
+        if index >= self.total_rounds:
+            return None
+
+        if self.schedule is not None:
+            pairs = self.schedule[index]
+        else:
+            ranked = [row["player"] for row in self.standings()]
+            played = {p: set() for p in self.players}
+            byes = set()
+            for series in (s for r in self.rounds for s in r):
+                if series.b is None:
+                    byes.add(series.a)
+                else:
+                    played[series.a].add(series.b)
+                    played[series.b].add(series.a)
+            pairs = []
+            if len(ranked) % 2:
+                # The bye goes to the lowest-ranked player who hasn't had one
+                bye = next((p for p in reversed(ranked) if p not in byes), ranked[-1])
+                ranked.remove(bye)
+                pairs.append((bye, None))
+            pairs = swiss_pairings(ranked, played) + pairs
+
+        series = []
+        for a, b in pairs:
+            if a is None:
+                a, b = b, a
+            series.append(Series(a, b, self.best_of, index))
+        self.rounds.append(series)
+        return series
+
+    def current_room(self, player):
+        """(room_id, seat) of the game `player` should be playing now, or None."""
+        for series in self.rounds[-1] if self.rounds else []:
+            for seat, seated in (series.seats or {}).items():
+                if seated == player:
+                    return series.room_id, seat
+        return None
+
+    def board_for(self, series):
+        """Boards rotate through the pool by round and game number."""
+        if not self.boards:
+            return None
+        return self.boards[(series.round_index + len(series.games)) % len(self.boards)]
+
+    def to_dict(self):
+        return {
+            "tournament_id": self.id,
+            "format": self.format,
+            "best_of": self.best_of,
+            "status": self.status,
+            "round": len(self.rounds),
+            "total_rounds": self.total_rounds,
+            "standings": self.standings(),
+            "rounds": [[s.to_dict() for s in r] for r in self.rounds],
+        }
+
+
+class TournamentManager:
+    """
+    Runs tournaments from game-over events: `game_over(room_id, ...)` is
+    the only thing that moves a series on, so no tournament ever polls its
+    rooms. `create_room(settings)` deals a room and returns its id, as for
+    the matchmaker.
+    """
+
+    def __init__(self, create_room):
+        self.create_room = create_room
+        self.tournaments = {}
+        self.rooms = {}  # room_id -> (tournament, series) for games in progress
+
+    def create(self, players, **options):
+        tournament = Tournament(players, **options)
+        self.tournaments[tournament.id] = tournament
+        self._start_round(tournament)
+        return tournament
+
+    def get(self, tournament_id):
+        return self.tournaments.get(tournament_id)
+
+    def _start_round(self, tournament):
+        """Pair and deal the next round; rounds made only of byes are skipped."""
+        while True:
+            series_list = tournament.pair_next_round()
+            if series_list is None:
+                tournament.status = "finished"
+                return
+            started = [s for s in series_list if not s.finished]
+            for series in started:
+                self._start_game(tournament, series)
+            if started:
+                return
+
+    def _start_game(self, tournament, series):
+        board = tournament.board_for(series)
+        series.seats = series.next_seats()
+        series.room_id = self.create_room({
+            "boards": [board] if board else None,
+            "deck_type": tournament.deck_type,
+            "copies_per_phase": tournament.copies_per_phase,
+        })
+        self.rooms[series.room_id] = (tournament, series)
+
+    def replay_game(self, room_id):
+        """
+        Deal a tournament room's game again in a new room without recording
+        it. Returns (tournament, series), or None for any other room.
+        """
+        entry = self.rooms.pop(room_id, None)
+        if entry is None:
+            return None
+        tournament, series = entry
+        self._start_game(tournament, series)
+        return entry
+
+    def game_over(self, room_id, final_scores):
+        """
+        Record a finished game, then deal the series' next game or, once the
+        whole round is done, the next round. Returns (tournament, series)
+        for tournament rooms and None for any other room. Each room counts
+        once, even if its game is undone and finished again.
+        """
+        entry = self.rooms.pop(room_id, None)
+        if entry is None:
+            return None
+        tournament, series = entry
+        series.record(final_scores)
+
+        if not series.finished:
+            self._start_game(tournament, series)
+        elif all(s.finished for s in tournament.rounds[-1]):
+            self._start_round(tournament)
+        return tournament, series